@@ -340,6 +340,40 @@ class UpdateRetrieveAnnouncementTests(APITestCase):
         self.assertEqual(response.json()["description"], "Desc 1")
         self.assertEqual(response.json()["category"], "EVENT")
 
+    def test_retrieve_announcement_not_modified(self):
+        self.hr_admin_authenticator()
+        url = reverse(
+            "announcement:announcement-detail", kwargs={"pk": self.created_announce_id}
+        )
+        response = self.client.get(url, format="json")
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        announcement = Announcement.objects.get(id=self.created_announce_id)
+        announcement.title = "Updated Announce 1"
+        announcement.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], "Updated Announce 1")
+
+    def test_list_announcements_ignore_modified_since(self):
+        self.hr_admin_authenticator()
+        url = reverse("announcement:announcement-list")
+        response = self.client.get(url, format="json")
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        detail_url = reverse(
+            "announcement:announcement-detail", kwargs={"pk": self.created_announce_id}
+        )
+        last_modified = self.client.get(detail_url)["Last-Modified"]
+
+        Announcement.objects.get(id=self.created_announce_id).delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_employee_user_cannot_delete(self):
         self.employee_authenticator()
         url = reverse(
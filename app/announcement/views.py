@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from announcement.models import Announcement
+from core.mixins import ConditionalGetMixin
 
 from employee.models import Employee
 from announcement.serializers import (
@@ -19,7 +20,7 @@ from user.permissions import IsHRAdmin, IsSuperAdmin, IsEmployee
 from user.serializers import ListUserSerializer
 
 
-class AnnouncementViewSets(viewsets.ModelViewSet):
+class AnnouncementViewSets(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Announcement.objects.all()
     serializer_class = AnnouncementSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsHRAdmin]
@@ -32,6 +33,16 @@ class AnnouncementViewSets(viewsets.ModelViewSet):
     filterset_fields = ["status"]
     search_fields = ["title", "category"]
     ordering_fields = ["category", "created_at", "title", "created_by"]
+    conditional_actions = ("list", "retrieve", "employee_announcement")
+    conditional_relations = ("nodes", "created_by")
+
+    def get_conditional_queryset(self):
+        if self.action == "employee_announcement":
+            return self.get_employee_announcements()
+        return super().get_conditional_queryset()
+
+    def get_employee_announcements(self):
+        return self.queryset.filter(nodes__org_nodes=self.request.user.employee)
 
     def paginate_results(self, queryset):
         page = self.paginate_queryset(queryset)
@@ -54,10 +65,10 @@ class AnnouncementViewSets(viewsets.ModelViewSet):
         detail=False,
         url_name="employee-announcement",
         permission_classes=[IsEmployee],
-        url_path="employee-announcement"
+        url_path="employee-announcement",
     )
     def employee_announcement(self, request):
-        qs = self.queryset.filter(nodes__org_nodes=request.user.employee)
+        qs = self.get_employee_announcements()
         serializer = EmployeeAnnouncementSerializer(qs, many=True)
         return Response(
             data={"success": True, "data": serializer.data}, status=status.HTTP_200_OK
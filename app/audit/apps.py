@@ -1,6 +1,32 @@
-from django.apps import AppConfig
+from celery.signals import task_postrun, task_prerun
+from django.apps import AppConfig, apps
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save
 
 
 class AuditConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "audit"
+
+    def ready(self):
+        from core.models import AuditableModel
+        from .signals import (
+            close_task_buffer,
+            create_audit_entries_table,
+            open_task_buffer,
+            record_deleted_instance,
+            record_saved_instance,
+            snapshot_instance,
+        )
+
+        for model in apps.get_models():
+            if (
+                issubclass(model, AuditableModel)
+                and model._meta.label not in settings.AUDIT_EXCLUDED_MODELS
+            ):
+                post_init.connect(snapshot_instance, sender=model)
+                post_save.connect(record_saved_instance, sender=model)
+                post_delete.connect(record_deleted_instance, sender=model)
+        task_prerun.connect(open_task_buffer)
+        task_postrun.connect(close_task_buffer)
+        post_migrate.connect(create_audit_entries_table, sender=self)
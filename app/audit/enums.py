@@ -0,0 +1,5 @@
+AUDIT_ACTIONS = (
+    ("CREATE", "CREATE"),
+    ("UPDATE", "UPDATE"),
+    ("DELETE", "DELETE"),
+)
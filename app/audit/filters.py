@@ -0,0 +1,41 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+AUDIT_PARAMETERS = [
+    OpenApiParameter(
+        "model",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Audited model, e.g. employee.employee",
+    ),
+    OpenApiParameter(
+        "object_id",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Id of the object to list the entries of, with model",
+    ),
+    OpenApiParameter(
+        "actor",
+        OpenApiTypes.UUID,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Id of the user who made the changes",
+    ),
+    OpenApiParameter(
+        "since",
+        OpenApiTypes.DATETIME,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Only entries from this time, only the partitions after it are read",
+    ),
+    OpenApiParameter(
+        "until",
+        OpenApiTypes.DATETIME,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Only entries until this time",
+    ),
+]
@@ -0,0 +1,16 @@
+from .recorder import audit_context
+
+
+class AuditMiddleware:
+    """
+    Collects the audit entries of the changes the request commits and writes them in
+    one insert once the response is ready. The user is read when a change is recorded,
+    after the view authenticated it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_context(lambda: getattr(request, "user", None)):
+            return self.get_response(request)
@@ -1,3 +1,61 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+from .enums import AUDIT_ACTIONS
+
+
+class AuditEntryQuerySet(models.QuerySet):
+    def for_object(self, instance):
+        """The entries of an object, served by the (organisation, object, time) index."""
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=str(instance.pk),
+        )
+
+
+class AuditEntry(models.Model):
+    """
+    Field level changes of an AuditableModel row. The table is append-only and range
+    partitioned by month on created_at, it is created outside of the migrations (see
+    audit/partitions.py), Django only reads and inserts rows.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # kept when the organisation, actor or object is deleted
+    organisation = models.ForeignKey(
+        "organisation.Organisation",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    actor = models.ForeignKey(
+        "user.User",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    content_type = models.ForeignKey(
+        "contenttypes.ContentType",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    object_id = models.CharField(max_length=64)
+    action = models.CharField(max_length=10, choices=AUDIT_ACTIONS)
+    # {field: [old value, new value]}
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField()
+
+    objects = AuditEntryQuerySet.as_manager()
+
+    class Meta:
+        managed = False
+        db_table = "audit_auditentry"
+        ordering = ("-created_at", "-id")
+        verbose_name_plural = "audit entries"
+
+    def __str__(self):
+        return f"{self.action} {self.content_type_id}:{self.object_id}"
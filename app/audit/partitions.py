@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from core.partitions import add_months, create_monthly_partitions, get_month
+from .models import AuditEntry
+
+TABLE = AuditEntry._meta.db_table
+
+# the partition key has to be part of the primary key
+TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    organisation_id uuid NULL,
+    actor_id uuid NULL,
+    content_type_id integer NOT NULL,
+    object_id varchar(64) NOT NULL,
+    action varchar(10) NOT NULL,
+    changes jsonb NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+# created on every partition, present and future
+INDEX_SQL = (
+    f"CREATE INDEX IF NOT EXISTS audit_entry_object ON {TABLE} "
+    "(organisation_id, content_type_id, object_id, created_at DESC)",
+    f"CREATE INDEX IF NOT EXISTS audit_entry_organisation ON {TABLE} "
+    "(organisation_id, created_at DESC)",
+)
+
+APPEND_ONLY_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION audit_entry_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'audit entries cannot be updated or deleted';
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# old partitions are dropped as a whole, which row triggers don't block
+APPEND_ONLY_TRIGGER_SQL = (
+    "CREATE TRIGGER audit_entry_append_only BEFORE UPDATE OR DELETE ON {partition} "
+    "FOR EACH ROW EXECUTE FUNCTION audit_entry_append_only()"
+)
+
+
+def create_audit_partitions(using="default", months_ahead=None) -> list:
+    """
+    Creates the partitions of this month and the next AUDIT_PARTITION_MONTHS_AHEAD
+    months where missing. Returns the names of the partitions created.
+    """
+    if months_ahead is None:
+        months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD
+    month = get_month(timezone.now())
+    created = create_monthly_partitions(
+        TABLE, month, add_months(month, months_ahead), using
+    )
+    with connections[using].cursor() as cursor:
+        for partition in created:
+            cursor.execute(APPEND_ONLY_TRIGGER_SQL.format(partition=partition))
+    return created
+
+
+def create_audit_table(using="default"):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(TABLE_SQL)
+        for sql in INDEX_SQL:
+            cursor.execute(sql)
+        cursor.execute(APPEND_ONLY_FUNCTION_SQL)
+    create_audit_partitions(using)
@@ -0,0 +1,212 @@
+import copy
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import AuditEntry
+
+logger = logging.getLogger(__name__)
+
+# entries of the current request or task, written together when it ends
+_buffer = ContextVar("audit_buffer", default=None)
+
+
+class AuditBuffer:
+    def __init__(self, get_actor=None):
+        self.get_actor = get_actor or (lambda: None)
+        self.entries = []
+        self.closed = False
+
+    def add(self, entry):
+        if self.closed:
+            # committed after the request or task ended
+            write_entries([entry])
+        else:
+            self.entries.append(entry)
+
+    def flush(self):
+        self.closed = True
+        entries, self.entries = self.entries, []
+        write_entries(entries)
+
+
+def write_entries(entries):
+    """Inserts the entries in one statement, a failure is logged and not raised."""
+    if not entries:
+        return
+    try:
+        with transaction.atomic():
+            AuditEntry.objects.bulk_create(
+                entries, batch_size=settings.AUDIT_BATCH_SIZE
+            )
+    except DatabaseError:
+        logger.exception("Could not write %s audit entries", len(entries))
+
+
+def open_buffer(get_actor=None):
+    """Starts buffering the entries, returns the token close_buffer expects."""
+    return _buffer.set(AuditBuffer(get_actor))
+
+
+def close_buffer(token):
+    buffer = _buffer.get()
+    _buffer.reset(token)
+    if buffer is not None:
+        buffer.flush()
+
+
+@contextmanager
+def audit_context(get_actor=None):
+    """Buffers the entries of the changes committed in the block, see open_buffer."""
+    token = open_buffer(get_actor)
+    try:
+        yield _buffer.get()
+    finally:
+        close_buffer(token)
+
+
+class AuditJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # files may also be nested in JSON and array fields before they are saved
+        if isinstance(o, File):
+            return o.name
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def to_json(value):
+    return json.loads(json.dumps(value, cls=AuditJSONEncoder))
+
+
+def get_state(instance) -> dict:
+    """
+    The raw values of the loaded fields, converted only when they are compared.
+    JSON and array values are copied, they may be changed in place before a save.
+    """
+    excluded = settings.AUDIT_EXCLUDED_FIELDS
+    return {
+        field.attname: copy_mutable(instance.__dict__[field.attname])
+        for field in instance._meta.concrete_fields
+        if field.attname in instance.__dict__ and field.attname not in excluded
+    }
+
+
+def copy_mutable(value):
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def get_changes(previous, current) -> dict:
+    """{field: [old, new]} of the fields whose value differs."""
+    changes = {}
+    for field in previous.keys() | current.keys():
+        old, new = to_json(previous.get(field)), to_json(current.get(field))
+        if old != new:
+            changes[field] = [old, new]
+    return changes
+
+
+# rows without an organisation belong to the organisation of one of these
+ORGANISATION_OWNERS = (
+    "employee.Employee",
+    "organisation.OrganisationNode",
+    "workflow.ApprovalRequest",
+)
+
+
+def get_owner_organisation_id(instance):
+    """The organisation of the employee, node or approval request the row belongs to."""
+    for field in instance._meta.concrete_fields:
+        if not field.many_to_one or field.related_model._meta.label not in (
+            ORGANISATION_OWNERS
+        ):
+            continue
+        owner_id = getattr(instance, field.attname)
+        if owner_id is None:
+            continue
+        if field.is_cached(instance):
+            return getattr(instance, field.name).organisation_id
+        return (
+            field.related_model.objects.filter(pk=owner_id)
+            .values_list("organisation_id", flat=True)
+            .first()
+        )
+    return None
+
+
+def get_organisation_id(instance, actor):
+    if instance._meta.label == "organisation.Organisation":
+        return instance.pk
+    organisation_id = getattr(instance, "organisation_id", None)
+    if organisation_id is None:
+        # histories, leaves and other rows of an employee
+        organisation_id = get_owner_organisation_id(instance)
+    if organisation_id is None and actor is not None:
+        organisation_id = getattr(actor, "organisation_id", None)
+    return organisation_id
+
+
+def record(instance, action, changes):
+    """
+    Adds an entry to the buffer of the current request or task once the transaction
+    commits, entries of rolled back changes are dropped. Outside of a request or task
+    the entry is written on commit by itself.
+    """
+    buffer = _buffer.get()
+    actor = buffer.get_actor() if buffer is not None else None
+    if actor is not None and not actor.is_authenticated:
+        actor = None
+    entry = AuditEntry(
+        organisation_id=get_organisation_id(instance, actor),
+        actor_id=actor.pk if actor is not None else None,
+        content_type_id=ContentType.objects.get_for_model(instance).pk,
+        object_id=str(instance.pk),
+        action=action,
+        changes=changes,
+        created_at=timezone.now(),
+    )
+    if buffer is None:
+        transaction.on_commit(partial(write_entries, [entry]))
+    else:
+        transaction.on_commit(partial(buffer.add, entry))
+
+
+def snapshot(instance):
+    instance._audit_state = get_state(instance)
+
+
+def record_save(instance, created=False):
+    state = get_state(instance)
+    if created:
+        record(instance, "CREATE", get_changes({}, state))
+    else:
+        previous = getattr(instance, "_audit_state", {})
+        # fields deferred when the row was loaded can't be compared
+        changes = get_changes(
+            previous, {field: state[field] for field in previous if field in state}
+        )
+        if changes:
+            record(instance, "UPDATE", changes)
+    instance._audit_state = state
+
+
+def record_bulk_update(instances):
+    """Records the changes saved with bulk_update, which sends no signals."""
+    for instance in instances:
+        record_save(instance)
+
+
+def record_delete(instance):
+    record(instance, "DELETE", get_changes(get_state(instance), {}))
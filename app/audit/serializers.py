@@ -0,0 +1,64 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from rest_framework import serializers
+
+from core.models import AuditableModel
+from .models import AuditEntry
+
+
+class AuditEntrySerializer(serializers.ModelSerializer):
+    model = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AuditEntry
+        fields = [
+            "id",
+            "model",
+            "object_id",
+            "action",
+            "changes",
+            "actor",
+            "created_at",
+        ]
+
+    def get_model(self, obj):
+        # cached by ContentType, no query per entry
+        return (
+            ContentType.objects.get_for_id(obj.content_type_id)
+            .model_class()
+            ._meta.label_lower
+        )
+
+
+class AuditQuerySerializer(serializers.Serializer):
+    model = serializers.CharField(required=False)
+    object_id = serializers.CharField(required=False, max_length=64)
+    actor = serializers.UUIDField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate_model(self, label):
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError):
+            raise serializers.ValidationError("Unknown model.")
+        if (
+            not issubclass(model, AuditableModel)
+            or model._meta.label in settings.AUDIT_EXCLUDED_MODELS
+        ):
+            raise serializers.ValidationError("This model is not audited.")
+        return ContentType.objects.get_for_model(model)
+
+    def validate(self, attrs):
+        if "object_id" in attrs and "model" not in attrs:
+            raise serializers.ValidationError(
+                {"model": "Required to look up an object's entries."}
+            )
+        if (
+            attrs.get("since")
+            and attrs.get("until")
+            and attrs["since"] > attrs["until"]
+        ):
+            raise serializers.ValidationError({"until": "Must be after since."})
+        return attrs
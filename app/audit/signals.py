@@ -0,0 +1,29 @@
+from .partitions import create_audit_table
+from .recorder import close_buffer, open_buffer, record_delete, record_save, snapshot
+
+
+def snapshot_instance(sender, instance, **kwargs):
+    snapshot(instance)
+
+
+def record_saved_instance(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_save(instance, created)
+
+
+def record_deleted_instance(sender, instance, **kwargs):
+    record_delete(instance)
+
+
+def open_task_buffer(task, **kwargs):
+    task.request.audit_token = open_buffer()
+
+
+def close_task_buffer(task, **kwargs):
+    token = getattr(task.request, "audit_token", None)
+    if token is not None:
+        close_buffer(token)
+
+
+def create_audit_entries_table(sender, using="default", **kwargs):
+    create_audit_table(using)
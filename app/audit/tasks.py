@@ -0,0 +1,8 @@
+from core.celery import APP
+from .partitions import create_audit_partitions
+
+
+@APP.task(ignore_result=True)
+def create_audit_entry_partitions():
+    """Keeps AUDIT_PARTITION_MONTHS_AHEAD months of partitions ready for new entries."""
+    create_audit_partitions()
@@ -1,3 +1,142 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.partitions import get_month, get_partition_name
+from employee.models import Employee, EmployeeEmploymentHistory
+from organisation.models import Organisation
+from .models import AuditEntry
+from .recorder import audit_context
+
+
+class AuditLogTests(APITestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        self.user = get_user_model().objects.create_user(
+            organisation=self.org,
+            email="hradmin@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+
+    def create_employee(self, firstname="Ray"):
+        return Employee.objects.create(
+            organisation=self.org,
+            firstname=firstname,
+            lastname="Inc",
+            work_email=f"{firstname.lower()}@prunedge.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+
+    def login(self):
+        url = reverse("user:login")
+        data = {"email": "hradmin@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_changes_are_buffered_and_written_together(self):
+        with audit_context(lambda: self.user) as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                employee = self.create_employee()
+            with self.captureOnCommitCallbacks(execute=True):
+                employee = Employee.objects.get(pk=employee.pk)
+                employee.job_title = "Lead"
+                employee.save()
+                # nothing changed, nothing recorded
+                employee.save()
+            self.assertEqual(len(buffer.entries), 2)
+            self.assertFalse(AuditEntry.objects.exists())
+
+        entries = list(AuditEntry.objects.for_object(employee).order_by("id"))
+        self.assertEqual([entry.action for entry in entries], ["CREATE", "UPDATE"])
+        self.assertEqual(entries[1].changes, {"job_title": ["Engineer", "Lead"]})
+        self.assertEqual(entries[1].organisation_id, self.org.id)
+        self.assertEqual(entries[1].actor_id, self.user.id)
+        self.assertNotIn("updated_at", entries[0].changes)
+
+    def test_rows_of_an_employee_get_its_organisation(self):
+        employee = self.create_employee()
+        # a task, no actor to take the organisation from
+        with audit_context():
+            with self.captureOnCommitCallbacks(execute=True):
+                history = EmployeeEmploymentHistory.objects.create(
+                    employee_id=employee.pk, job_title="Intern", company_name="Prun"
+                )
+        [entry] = AuditEntry.objects.for_object(history)
+        self.assertEqual(entry.organisation_id, self.org.id)
+
+    def test_in_place_changes_of_json_fields_are_recorded(self):
+        with audit_context() as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                organisation = Organisation.objects.get(pk=self.org.pk)
+                organisation.levels["1"] = "Department"
+                organisation.save()
+            self.assertEqual(len(buffer.entries), 1)
+        [entry] = AuditEntry.objects.for_object(organisation)
+        self.assertEqual(entry.changes["levels"][1], {"1": "Department"})
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        employee = self.create_employee()
+        with audit_context() as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        employee.job_title = "Lead"
+                        employee.save()
+                        raise ValueError
+                except ValueError:
+                    pass
+            self.assertEqual(buffer.entries, [])
+
+    def test_entries_are_partitioned_and_append_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = self.create_employee()
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        entry = AuditEntry.objects.filter(action="DELETE").get()
+        self.assertEqual(entry.changes["firstname"], ["Ray", None])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM audit_auditentry WHERE id = %s",
+                [entry.id],
+            )
+            partition = cursor.fetchone()[0]
+        self.assertEqual(
+            partition,
+            get_partition_name("audit_auditentry", get_month(timezone.now())),
+        )
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            AuditEntry.objects.filter(pk=entry.pk).update(action="UPDATE")
+
+    def test_history_endpoint_lists_an_objects_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = self.create_employee()
+            self.create_employee("Ada")
+        self.login()
+        url = reverse("audit:auditentry-list")
+        response = self.client.get(
+            url, {"model": "employee.employee", "object_id": str(employee.id)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["model"], "employee.employee")
+        self.assertEqual(results[0]["action"], "CREATE")
+
+        response = self.client.get(url, {"model": "audit.auditentry"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
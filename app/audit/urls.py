@@ -0,0 +1,13 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from .views import AuditEntryViewSets
+
+app_name = "audit"
+
+router = DefaultRouter()
+
+router.register("", AuditEntryViewSets)
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -1,3 +1,36 @@
-from django.shortcuts import render
+from drf_spectacular.utils import extend_schema
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
 
-# Create your views here.
+from core.pagination import LatestFirstCursorPagination
+from user.permissions import IsHRAdmin
+from .filters import AUDIT_PARAMETERS
+from .models import AuditEntry
+from .serializers import AuditEntrySerializer, AuditQuerySerializer
+
+
+@extend_schema(parameters=AUDIT_PARAMETERS)
+class AuditEntryViewSets(viewsets.ModelViewSet):
+    queryset = AuditEntry.objects.all()
+    serializer_class = AuditEntrySerializer
+    permission_classes = [IsAuthenticated, IsHRAdmin]
+    http_method_names = ["get"]
+    # the log keeps growing, pages are read from the index without counting it
+    pagination_class = LatestFirstCursorPagination
+
+    def get_queryset(self):
+        if self.action != "list":
+            return self.queryset.filter(organisation=self.request.user.organisation)
+        serializer = AuditQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = {
+            "organisation": self.request.user.organisation,
+            "content_type": serializer.validated_data.get("model"),
+            "object_id": serializer.validated_data.get("object_id"),
+            "actor": serializer.validated_data.get("actor"),
+            "created_at__gte": serializer.validated_data.get("since"),
+            "created_at__lte": serializer.validated_data.get("until"),
+        }
+        return self.queryset.filter(
+            **{lookup: value for lookup, value in filters.items() if value is not None}
+        )
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class ClaimConfig(AppConfig):
     default_auto_field = "django.db.models.UUIDField"
     name = "claim"
+
+    def ready(self):
+        from .models import Expense
+        from .signals import backfill_expense_rollups, refresh_expense_rollups
+
+        post_save.connect(refresh_expense_rollups, sender=Expense)
+        post_delete.connect(refresh_expense_rollups, sender=Expense)
+        post_migrate.connect(backfill_expense_rollups, sender=self)
@@ -4,3 +4,10 @@ CLAIM_STATUS_OPTIONS = (
     ("DENIED", "DENIED"),
     ("PAID", "PAID"),
 )
+
+CLAIM_ANALYTICS_GROUP_OPTIONS = (
+    ("status", "status"),
+    ("month", "month"),
+    ("organisation_node", "organisation_node"),
+    ("job_grade", "job_grade"),
+)
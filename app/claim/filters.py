@@ -0,0 +1,36 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+from .enums import CLAIM_ANALYTICS_GROUP_OPTIONS, CLAIM_STATUS_OPTIONS
+
+
+CLAIM_ANALYTICS_PARAMETERS = [
+    OpenApiParameter(
+        "group_by",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=True,
+        enum=[option for option, _ in CLAIM_ANALYTICS_GROUP_OPTIONS],
+    ),
+    OpenApiParameter(
+        "status",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=False,
+        enum=[option for option, _ in CLAIM_STATUS_OPTIONS],
+    ),
+    OpenApiParameter(
+        "start_month",
+        OpenApiTypes.DATE,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="First day of the first month included",
+    ),
+    OpenApiParameter(
+        "end_month",
+        OpenApiTypes.DATE,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="First day of the last month included",
+    ),
+]
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from claim.rollups import rebuild_rollups
+from organisation.models import Organisation
+
+
+class Command(BaseCommand):
+    help = "Recomputes the expense claim rollups used by the analytics endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organisation", help="Only rebuild this organisation's")
+
+    def handle(self, *args, **options):
+        organisation = None
+        if options["organisation"]:
+            organisation = Organisation.objects.get(pk=options["organisation"])
+        rebuild_rollups(organisation)
+        self.stdout.write("Expense rollups rebuilt")
@@ -8,6 +8,14 @@ class Expense(AuditableModel):
     employee = models.ForeignKey(
         "employee.Employee", on_delete=models.CASCADE, related_name="emp_claims"
     )
+    # copied from the employee so tenant queries can use the indexes below
+    organisation = models.ForeignKey(
+        "organisation.Organisation",
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        editable=False,
+    )
     title = models.CharField(max_length=200)
     description = models.TextField()
     start_date = models.DateField()
@@ -29,5 +37,44 @@ class Expense(AuditableModel):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.organisation_id is None:
+            self.organisation_id = self.employee.organisation_id
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["organisation", "status", "created_at"]),
+            models.Index(fields=["organisation", "created_at"]),
+        ]
+
+
+class ExpenseRollup(models.Model):
+    """
+    Totals of an employee's claims per month and status, kept up to date as claims
+    change (see claim.rollups) so reports don't scan the claims.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    organisation = models.ForeignKey(
+        "organisation.Organisation", on_delete=models.CASCADE, related_name="+"
+    )
+    employee = models.ForeignKey(
+        "employee.Employee", on_delete=models.CASCADE, related_name="+"
+    )
+    month = models.DateField()
+    status = models.CharField(max_length=20, choices=CLAIM_STATUS_OPTIONS)
+    total_amount = models.DecimalField(decimal_places=2, max_digits=16, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "month", "status"], name="unique_expense_rollup"
+            )
+        ]
+        indexes = [models.Index(fields=["organisation", "month"])]
+
+    def __str__(self):
+        return f"{self.employee_id} {self.month} {self.status}"
@@ -0,0 +1,141 @@
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Expense, ExpenseRollup
+
+REFRESH_SQL = """
+WITH affected (employee_id, month) AS (VALUES {values}),
+totals AS (
+    SELECT (array_agg(e.organisation_id))[1] AS organisation_id, a.employee_id,
+        a.month, e.status, SUM(e.total_amount) AS total_amount, COUNT(*) AS count
+    FROM {expense} e
+    JOIN affected a ON e.employee_id = a.employee_id
+        AND e.created_at >= a.month::timestamp AT TIME ZONE %s
+        AND e.created_at < (a.month + interval '1 month')::timestamp AT TIME ZONE %s
+    GROUP BY a.employee_id, a.month, e.status
+),
+emptied AS (
+    UPDATE {table} r SET total_amount = 0, count = 0
+    FROM affected a
+    WHERE r.employee_id = a.employee_id AND r.month = a.month
+        AND NOT EXISTS (
+            SELECT 1 FROM totals t
+            WHERE t.employee_id = r.employee_id AND t.month = r.month
+                AND t.status = r.status
+        )
+)
+INSERT INTO {table} (organisation_id, employee_id, month, status, total_amount, count)
+SELECT * FROM totals
+ON CONFLICT (employee_id, month, status) DO UPDATE
+SET total_amount = EXCLUDED.total_amount, count = EXCLUDED.count
+"""
+
+LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext(key)) FROM unnest(%s::text[]) AS key"
+
+
+def get_rollup_key(expense):
+    """Returns the (employee_id, month) whose rollup rows the claim counts towards."""
+    created_at = expense.created_at
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return (expense.employee_id, created_at.date().replace(day=1))
+
+
+def refresh_rollups(expenses):
+    """
+    Recomputes the rollup rows of the claims' employees and months from the claims
+    themselves, in a single upsert. The rows are recomputed under a transaction-level
+    lock per employee and month, so concurrent saves can't overwrite each other's
+    totals with stale ones whatever state the saved instances were loaded in.
+    """
+    keys = sorted({get_rollup_key(expense) for expense in expenses})
+    if not keys:
+        return
+    values = ", ".join(["(%s::uuid, %s::date)"] * len(keys))
+    sql = REFRESH_SQL.format(
+        values=values,
+        expense=Expense._meta.db_table,
+        table=ExpenseRollup._meta.db_table,
+    )
+    tzname = timezone.get_current_timezone_name()
+    params = [str(value) for key in keys for value in key] + [tzname, tzname]
+    with transaction.atomic(), connection.cursor() as cursor:
+        # locks in a consistent order so concurrent refreshes can't deadlock
+        cursor.execute(
+            LOCK_SQL,
+            [[f"expense_rollup:{employee}:{month}" for employee, month in keys]],
+        )
+        cursor.execute(sql, params)
+
+
+def rebuild_rollups(organisation=None):
+    """Recomputes the rollups from the claims, e.g. after a bulk import."""
+    expenses = Expense.objects.all()
+    rollups = ExpenseRollup.objects.all()
+    if organisation:
+        expenses = expenses.filter(organisation=organisation)
+        rollups = rollups.filter(organisation=organisation)
+    totals = (
+        expenses.annotate(month=TruncMonth("created_at", output_field=DateField()))
+        .values("organisation", "employee", "month", "status")
+        .annotate(total=Sum("total_amount"), claims=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        ExpenseRollup.objects.bulk_create(
+            (
+                ExpenseRollup(
+                    organisation_id=row["organisation"],
+                    employee_id=row["employee"],
+                    month=row["month"],
+                    status=row["status"],
+                    total_amount=row["total"],
+                    count=row["claims"],
+                )
+                for row in totals.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+ANALYTICS_GROUPS = {
+    "status": ("status", None),
+    "month": ("month", None),
+    "organisation_node": (
+        "employee__organisation_nodes",
+        "employee__organisation_nodes__name",
+    ),
+    "job_grade": ("employee__job_grade", "employee__job_grade__name"),
+}
+
+
+def get_claim_totals(
+    organisation, group_by, status=None, start_month=None, end_month=None
+) -> list:
+    """Returns the claims' total_amount and count per group, read from the rollups."""
+    rollups = ExpenseRollup.objects.filter(organisation=organisation, count__gt=0)
+    if status:
+        rollups = rollups.filter(status=status)
+    if start_month:
+        rollups = rollups.filter(month__gte=start_month.replace(day=1))
+    if end_month:
+        rollups = rollups.filter(month__lte=end_month)
+    key, name = ANALYTICS_GROUPS[group_by]
+    fields = [key, name] if name else [key]
+    totals = (
+        rollups.values(*fields)
+        .annotate(total=Sum("total_amount"), claims=Sum("count"))
+        .order_by(key)
+    )
+    return [
+        {
+            "key": row[key],
+            "name": row[name] if name else row[key],
+            "total_amount": row["total"],
+            "count": row["claims"],
+        }
+        for row in totals
+    ]
@@ -1,11 +1,21 @@
 from rest_framework import serializers
+from core.serializers import FileURLListSerializer
+from core.uploads import UploadedFileField
+from .enums import CLAIM_ANALYTICS_GROUP_OPTIONS, CLAIM_STATUS_OPTIONS
 from .models import Expense
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
+    documents = serializers.ListField(
+        child=UploadedFileField(kind="expense_claim", max_length=100),
+        required=False,
+        allow_null=True,
+    )
+
     class Meta:
         model = Expense
         fields = "__all__"
+        list_serializer_class = FileURLListSerializer
         extra_kwargs = {
             "employee": {"read_only": True},
             "reviewed_by": {"read_only": True},
@@ -17,3 +27,23 @@ class ApproveExpenseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Expense
         fields = ["id", "status"]
+
+
+class ClaimAnalyticsQuerySerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(choices=CLAIM_ANALYTICS_GROUP_OPTIONS)
+    status = serializers.ChoiceField(choices=CLAIM_STATUS_OPTIONS, required=False)
+    start_month = serializers.DateField(required=False)
+    end_month = serializers.DateField(required=False)
+
+
+class BulkExpenseReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=500
+    )
+    status = serializers.ChoiceField(
+        choices=[option for option in CLAIM_STATUS_OPTIONS if option[0] != "PENDING"]
+    )
+
+    def validate_ids(self, ids):
+        # keeps the order of the results
+        return list(dict.fromkeys(ids))
@@ -0,0 +1,21 @@
+from django.db.models import OuterRef, Subquery
+
+from .rollups import rebuild_rollups, refresh_rollups
+
+
+def refresh_expense_rollups(sender, instance, **kwargs):
+    refresh_rollups([instance])
+
+
+def backfill_expense_rollups(sender, **kwargs):
+    """Fills in the columns added for reporting on claims created before them."""
+    from employee.models import Employee
+    from .models import Expense, ExpenseRollup
+
+    Expense.objects.filter(organisation__isnull=True).update(
+        organisation=Subquery(
+            Employee.objects.filter(pk=OuterRef("employee")).values("organisation")[:1]
+        )
+    )
+    if Expense.objects.exists() and not ExpenseRollup.objects.exists():
+        rebuild_rollups()
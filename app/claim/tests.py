@@ -6,11 +6,14 @@ from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import override_settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from employee.models import Employee
 from organisation.models import Organisation
 from tempfile import NamedTemporaryFile, gettempdir
 from PIL import Image
 from . import models
+from .rollups import rebuild_rollups
 from django.conf import settings
 
 TEST_DIR = "test_data"
@@ -122,6 +125,42 @@ class EmployeeClaimCreateTests(APITestCase):
         # check number of documents returned
         self.assertEqual(len(response.json()["documents"]), 2)
 
+    @override_settings(**overriden_settings_value)
+    def test_can_create_claim_with_uploaded_document_keys(self):
+        url = reverse("claims:expense-list")
+        user = get_user_model().objects.get(email="ridwan.yusuf@prunedge.com")
+        key = default_storage.save(
+            f"expense_claim/{user.id}/upload/receipt.png", ContentFile(b"receipt")
+        )
+        data = {
+            "title": "Sample Title",
+            "description": "Sample Descript.",
+            "start_date": "2019-04-30",
+            "end_date": "2020-04-30",
+            "total_amount": 5000,
+            "documents": [key],
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(models.Expense.objects.get().documents[0].name, key)
+
+    @override_settings(**overriden_settings_value)
+    def test_cannot_record_document_key_uploaded_by_another_user(self):
+        url = reverse("claims:expense-list")
+        key = default_storage.save(
+            "expense_claim/another-user/upload/receipt.png", ContentFile(b"receipt")
+        )
+        data = {
+            "title": "Sample Title",
+            "description": "Sample Descript.",
+            "start_date": "2019-04-30",
+            "end_date": "2020-04-30",
+            "total_amount": 5000,
+            "documents": [key],
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class EmployeeClaimPermissionTests(APITestCase):
     @override_settings(USE_TZ=False)
@@ -428,3 +467,107 @@ class EmployeeExpenseClaimRetrieveTests(APITestCase):
         response = self.client.get(url, format="json")
         self.assertEqual(response.json()["total"], 3)
         self.assertEqual(len(response.json()["results"]), 3)
+
+
+class ClaimAnalyticsTests(APITestCase):
+    def setUp(self):
+        org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        user = get_user_model().objects.create_user(
+            organisation=org,
+            email="ridwan.yusuf@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+        employee = Employee.objects.create(
+            user=user,
+            organisation=org,
+            firstname="Ray",
+            lastname="Inc",
+            work_email="ray@prunedge.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+        self.expenses = [
+            models.Expense.objects.create(
+                employee=employee,
+                title="Title",
+                description="Description",
+                start_date="2020-04-30",
+                end_date="2022-04-30",
+                total_amount=amount,
+            )
+            for amount in (100, 250, 400)
+        ]
+        url = reverse("user:login")
+        data = {"email": "ridwan.yusuf@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def get_totals(self, group_by):
+        url = reverse("claims:expense-analytics")
+        response = self.client.get(url, {"group_by": group_by})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            row["key"]: (float(row["total_amount"]), row["count"])
+            for row in response.json()["data"]
+        }
+
+    def test_totals_follow_claim_changes(self):
+        approved = models.Expense.objects.get(id=self.expenses[1].id)
+        approved.status = "APPROVED"
+        approved.save()
+        self.expenses[0].delete()
+
+        self.assertEqual(
+            self.get_totals("status"),
+            {"APPROVED": (250.0, 1), "PENDING": (400.0, 1)},
+        )
+        self.assertEqual(list(self.get_totals("month").values()), [(650.0, 2)])
+
+    def test_totals_follow_deferred_and_stale_instances(self):
+        deferred = models.Expense.objects.only("id", "status").get(
+            id=self.expenses[0].id
+        )
+        deferred.status = "APPROVED"
+        deferred.save()
+        stale = self.expenses[0]
+        stale.total_amount = 150
+        stale.save(update_fields=["total_amount"])
+
+        self.assertEqual(
+            self.get_totals("status"),
+            {"APPROVED": (150.0, 1), "PENDING": (650.0, 2)},
+        )
+
+    def test_rebuilt_rollups_match_incremental_ones(self):
+        self.expenses[2].total_amount = 500
+        self.expenses[2].save()
+        totals = self.get_totals("status")
+        rebuild_rollups()
+        self.assertEqual(self.get_totals("status"), totals)
+        self.assertEqual(totals, {"PENDING": (850.0, 3)})
+
+    def test_bulk_review_updates_claims_and_totals(self):
+        url = reverse("claims:expense-bulk-review")
+        ids = [str(expense.id) for expense in self.expenses[:2]]
+        ids.append(str(self.expenses[0].employee_id))
+        response = self.client.post(
+            url, {"ids": ids, "status": "APPROVED"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]
+        self.assertEqual([result["success"] for result in results], [True, True, False])
+        self.assertEqual(
+            self.get_totals("status"),
+            {"APPROVED": (350.0, 2), "PENDING": (400.0, 1)},
+        )
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.utils import timezone
+
+from audit.recorder import record_bulk_update
+from workflow.engine import close_approvals, get_workflow
+from .models import Expense
+from .rollups import refresh_rollups
+
+
+@transaction.atomic
+def bulk_review_expenses(ids, status, reviewer) -> list:
+    """
+    Sets the status of the reviewer's organisation's claims in one transaction.
+    Claims locked by a concurrent review are skipped and reported as such.
+    Returns a result per id.
+    """
+    expenses = {
+        expense.id: expense
+        for expense in Expense.objects.select_for_update(skip_locked=True).filter(
+            id__in=ids, organisation=reviewer.organisation
+        )
+    }
+    now = timezone.now()
+    results = []
+    reviewed = []
+    for id in ids:
+        expense = expenses.get(id)
+        if expense is None:
+            detail = "Claim not found or being reviewed."
+        elif expense.status == status:
+            detail = f"Claim is already {status.lower()}."
+        else:
+            expense.status = status
+            expense.reviewed_by = reviewer
+            expense.updated_at = now
+            reviewed.append(expense)
+            detail = None
+        results.append({"id": id, "success": detail is None, "detail": detail})
+
+    Expense.objects.bulk_update(reviewed, ["status", "reviewed_by", "updated_at"])
+    record_bulk_update(reviewed)
+    state = get_workflow("claim").statuses.get(status)
+    if state is not None:
+        close_approvals("claim", [expense.id for expense in reviewed], state)
+    refresh_rollups(reviewed)
+    return results
@@ -5,10 +5,19 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from employee.models import Employee
+from employee.filters import ReportingLineFilter
 from django.shortcuts import get_object_or_404
-from user.permissions import IsNotSuperAdmin
+from user.permissions import IsNotSuperAdmin, IsHRAdmin
+from .filters import CLAIM_ANALYTICS_PARAMETERS
 from .models import Expense
-from .serializers import ExpenseSerializer, ApproveExpenseSerializer
+from .rollups import get_claim_totals
+from .serializers import (
+    ExpenseSerializer,
+    ApproveExpenseSerializer,
+    ClaimAnalyticsQuerySerializer,
+    BulkExpenseReviewSerializer,
+)
+from .utils import bulk_review_expenses
 
 
 class ExpenseViewSets(viewsets.ModelViewSet):
@@ -19,6 +28,7 @@ class ExpenseViewSets(viewsets.ModelViewSet):
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
+        ReportingLineFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["status"]
@@ -28,9 +38,7 @@ class ExpenseViewSets(viewsets.ModelViewSet):
     def get_queryset(self):
         """Returns expenses for currently authenticated user's company."""
 
-        return Expense.objects.filter(
-            employee__organisation=self.request.user.organisation
-        )
+        return Expense.objects.filter(organisation=self.request.user.organisation)
 
     def perform_create(self, serializer):
         employee = get_object_or_404(Employee, user=self.request.user.id)
@@ -54,3 +62,34 @@ class ExpenseViewSets(viewsets.ModelViewSet):
             {"success": False, "errors": serializer.errors},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        permission_classes=[IsHRAdmin],
+        serializer_class=BulkExpenseReviewSerializer,
+        url_path="bulk-status",
+    )
+    def bulk_review(self, request, pk=None):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_review_expenses(
+            serializer.validated_data["ids"],
+            serializer.validated_data["status"],
+            request.user,
+        )
+        return Response({"success": True, "data": results}, status=status.HTTP_200_OK)
+
+    @extend_schema(parameters=CLAIM_ANALYTICS_PARAMETERS)
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsHRAdmin],
+        url_path="analytics",
+    )
+    def analytics(self, request, pk=None):
+        """Totals of the organisation's claims grouped by status, month, node or job grade."""
+        serializer = ClaimAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = get_claim_totals(request.user.organisation, **serializer.validated_data)
+        return Response({"success": True, "data": data}, status=status.HTTP_200_OK)
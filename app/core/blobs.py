@@ -0,0 +1,77 @@
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import models
+from django.utils import timezone
+
+from .fields import ArrayFileField
+from .images import IMAGE_FIELDS
+from .storage_backends import BLOB_LOCATION, ContentAddressedStorageMixin
+
+
+def get_file_fields():
+    """Yields every FileField and ArrayFileField, the columns blobs are referenced from."""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, (models.FileField, ArrayFileField)):
+                yield model, field
+
+
+def get_blob_references() -> Counter:
+    """Returns how many times each blob is referenced across all file columns."""
+    references = Counter()
+    for model, field in get_file_fields():
+        values = model._base_manager.values_list(field.attname, flat=True)
+        for value in values.iterator():
+            names = value if isinstance(field, ArrayFileField) else [value]
+            references.update(
+                name
+                for name in names or []
+                if name and name.startswith(f"{BLOB_LOCATION}/")
+            )
+    # image variants are only referenced from their JSON field
+    for label, _, variants_field in IMAGE_FIELDS:
+        values = apps.get_model(label)._base_manager.values_list(
+            variants_field, flat=True
+        )
+        for variants in values.iterator():
+            references.update(
+                name
+                for name in variants.values()
+                if name.startswith(f"{BLOB_LOCATION}/")
+            )
+    return references
+
+
+def list_blobs(storage):
+    try:
+        directories, _ = storage.listdir(BLOB_LOCATION)
+    except FileNotFoundError:
+        return
+    for directory in directories:
+        _, files = storage.listdir(f"{BLOB_LOCATION}/{directory}")
+        for file in files:
+            yield f"{BLOB_LOCATION}/{directory}/{file}"
+
+
+def collect_unreferenced_blobs(grace_period, dry_run=False, storage=None) -> list:
+    """
+    Deletes the blobs no row references. Blobs younger than the grace period are
+    kept since the row pointing at them may not be committed yet.
+    Returns the names of the deleted blobs.
+    """
+    storage = storage or default_storage
+    if not isinstance(storage, ContentAddressedStorageMixin):
+        return []
+    references = get_blob_references()
+    cutoff = timezone.now() - grace_period
+    deleted = []
+    for name in list_blobs(storage):
+        if references[name] or storage.get_modified_time(name) > cutoff:
+            continue
+        if not dry_run:
+            # bypasses the mixin, which never deletes blobs
+            super(ContentAddressedStorageMixin, storage).delete(name)
+        deleted.append(name)
+    return deleted
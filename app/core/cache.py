@@ -0,0 +1,24 @@
+from django_redis.client import DefaultClient
+
+from .metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class MetricsClient(DefaultClient):
+    """django-redis client recording cache hits and misses."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        if value is _MISSING:
+            CACHE_REQUESTS.labels(result="miss").inc()
+            return default
+        CACHE_REQUESTS.labels(result="hit").inc()
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        values = super().get_many(keys, version=version, client=client)
+        hits = len(values)
+        CACHE_REQUESTS.labels(result="hit").inc(hits)
+        CACHE_REQUESTS.labels(result="miss").inc(len(keys) - hits)
+        return values
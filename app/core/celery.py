@@ -1,8 +1,11 @@
 from django.apps import apps, AppConfig
 from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_save
 from django_redis import get_redis_connection
 import os
 from celery import Celery
+from celery.signals import worker_init
 
 if not settings.configured:
     # set the default Django settings module for the 'celery' program.
@@ -22,6 +25,22 @@ class CeleryConfig(AppConfig):
         installed_apps = [app_config.name for app_config in apps.get_app_configs()]
         APP.autodiscover_tasks(installed_apps, force=True)
 
+        from .db import (
+            close_unusable_connections,
+            configure_worker_connections,
+            mark_connections_used,
+        )
+
+        request_started.connect(close_unusable_connections)
+        request_finished.connect(mark_connections_used)
+        # prefork children inherit the connection settings from the main worker process
+        worker_init.connect(configure_worker_connections)
+
+        from .images import IMAGE_FIELDS, queue_image_variants
+
+        for label, _, _ in IMAGE_FIELDS:
+            post_save.connect(queue_image_variants, sender=apps.get_model(label))
+
     def tearDown(self):
         get_redis_connection("default").flushall()
         print("Cache Flushed!!")
@@ -0,0 +1,137 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_DB = "default"
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_routing_state = ContextVar("routing_state", default=None)
+_replica_lag_checks = {}
+
+
+def close_unusable_connections(**kwargs):
+    """
+    Health check persistent connections before they are reused by a request.
+    Connections dropped by the server (restart, failover, idle timeout in PgBouncer)
+    are closed here so the request opens a fresh one instead of failing. Only
+    connections idle for DB_CONN_HEALTH_CHECK_IDLE_SECONDS are pinged, busy ones
+    were just used successfully.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        last_used_at = getattr(connection, "last_used_at", None)
+        if (
+            last_used_at is not None
+            and now - last_used_at < settings.DB_CONN_HEALTH_CHECK_IDLE_SECONDS
+        ):
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+def mark_connections_used(**kwargs):
+    """Records when the open connections were last used, at the end of a request."""
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.last_used_at = now
+
+
+def configure_worker_connections(**kwargs):
+    """Apply the Celery specific connection lifetime to every database alias."""
+    for connection in connections.all():
+        connection.settings_dict["CONN_MAX_AGE"] = settings.DB_WORKER_CONN_MAX_AGE
+
+
+class RoutingState:
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+@contextmanager
+def route_reads_to_replicas(use_primary=False):
+    """
+    Sends the reads made inside the block to the read replicas. Any write pins the
+    remaining reads of the block to the primary.
+    Usage:
+        with route_reads_to_replicas():
+            build_report()
+    """
+    state = RoutingState(use_primary)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+def is_replica_fresh(alias) -> bool:
+    """Checks the replication lag of a replica, at most once per REPLICA_LAG_CHECK_INTERVAL."""
+    if not settings.REPLICA_MAX_LAG_SECONDS:
+        return True
+    now = time.monotonic()
+    checked_at, fresh = _replica_lag_checks.get(alias, (None, True))
+    if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return fresh
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = cursor.fetchone()[0]
+        fresh = lag is None or lag <= settings.REPLICA_MAX_LAG_SECONDS
+    except DatabaseError as e:
+        logger.warning("Replica %s is unavailable: %s", alias, e)
+        fresh = False
+    _replica_lag_checks[alias] = (now, fresh)
+    return fresh
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes reads to the read replicas inside route_reads_to_replicas blocks,
+    everything else goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state.use_primary:
+            return PRIMARY_DB
+        if connections[PRIMARY_DB].in_atomic_block:
+            return PRIMARY_DB
+        replicas = [
+            alias for alias in settings.DATABASE_REPLICAS if is_replica_fresh(alias)
+        ]
+        if not replicas:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.use_primary = True
+            state.wrote = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
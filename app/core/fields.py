@@ -1,4 +1,8 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
 from django import forms
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ValidationError
 from django.db.models.fields.files import FieldFile, File
@@ -77,6 +81,29 @@ def to_file_object(field, instance, file):
         return file
 
 
+def save_files_sequentially(files):
+    for file_copy in files:
+        file_copy.save(file_copy.name, file_copy, save=False)
+
+
+def save_files(files):
+    """
+    Uploads files to storage in parallel. Files sharing a name are saved by the
+    same thread, otherwise the storage could pick the same available name for them.
+    """
+    if len(files) < 2:
+        save_files_sequentially(files)
+        return
+    files_by_name = defaultdict(list)
+    for file_copy in files:
+        files_by_name[file_copy.name].append(file_copy)
+    with ThreadPoolExecutor(
+        max_workers=min(len(files_by_name), settings.FILE_UPLOAD_WORKERS)
+    ) as executor:
+        # list() re-raises the first upload error
+        list(executor.map(save_files_sequentially, files_by_name.values()))
+
+
 class ArrayFileDescriptor(object):
     def __init__(self, field):
         self.field = field
@@ -88,15 +115,27 @@ class ArrayFileDescriptor(object):
                 % (self.field.name, owner.__name__)
             )
         try:
-            return [
+            files = instance.__dict__[self.field.name]
+            # the wrapped files are cached for as long as the stored list is unchanged
+            cached = instance.__dict__.get(self.cache_name)
+            if cached is not None and cached[0] is files:
+                return cached[1]
+            wrapped = [
                 to_file_object(self.field.base_field, instance, file)
-                for file in instance.__dict__[self.field.name]
+                for file in files
             ]
+            instance.__dict__[self.cache_name] = (files, wrapped)
+            return wrapped
         except Exception as ex:
             return []
 
     def __set__(self, instance, value):
         instance.__dict__[self.field.name] = value
+        instance.__dict__.pop(self.cache_name, None)
+
+    @property
+    def cache_name(self):
+        return f"_{self.field.name}_files"
 
 
 class ArrayFileField(ArrayField):
@@ -117,10 +156,7 @@ class ArrayFileField(ArrayField):
             for file in super(ArrayField, self).pre_save(instance, add)
         ]
 
-        for file_copy in files:
-            if file_copy and not file_copy._committed:
-                file_copy.save(file_copy.name, file_copy, save=False)
-
+        save_files([file for file in files if file and not file._committed])
         return files
 
     def formfield(self, **kwargs):
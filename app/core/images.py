@@ -0,0 +1,122 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+# WebP derivatives generated for every uploaded image, resized to fit the box
+IMAGE_VARIANTS = {
+    "thumb": (96, 96),
+    "small": (320, 320),
+    "large": (1024, 1024),
+}
+VARIANT_QUALITY = 80
+
+# sent with the instance once its variants are saved, which bypasses post_save
+image_variants_generated = Signal()
+
+# model, image field and the JSON field the variant names are kept in
+IMAGE_FIELDS = (
+    ("employee.Employee", "image", "image_variants"),
+    ("user.User", "image", "image_variants"),
+    ("organisation.Organisation", "logo", "logo_variants"),
+)
+
+
+def get_variants_field(model, field_name):
+    for label, image_field, variants_field in IMAGE_FIELDS:
+        if model._meta.label == label and image_field == field_name:
+            return variants_field
+
+
+def get_variant_format():
+    """WebP, or JPEG where Pillow was built without libwebp."""
+    Image.init()
+    return ("WEBP", "webp") if "WEBP" in Image.SAVE else ("JPEG", "jpg")
+
+
+def get_variant_name(name, variant) -> str:
+    root, _ = os.path.splitext(name)
+    return f"{root}_{variant}.{get_variant_format()[1]}"
+
+
+def render_variants(file) -> dict:
+    """Returns the encoded bytes of every variant of an image file."""
+    image_format = get_variant_format()[0]
+    with file.open("rb"):
+        image = ImageOps.exif_transpose(Image.open(file))
+        has_alpha = "A" in image.getbands() and image_format == "WEBP"
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    variants = {}
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        output = BytesIO()
+        resized.save(output, image_format, quality=VARIANT_QUALITY)
+        variants[variant] = output.getvalue()
+    return variants
+
+
+def generate_image_variants(instance, field_name) -> dict:
+    """
+    Stores the variants of the instance's image alongside the original and records
+    their names, unless the image was replaced in the meantime.
+    """
+    file = getattr(instance, field_name)
+    variants = {}
+    if file:
+        variants["source"] = file.name
+        for variant, content in render_variants(file).items():
+            name = get_variant_name(file.name, variant)
+            if file.storage.exists(name):
+                file.storage.delete(name)
+            variants[variant] = file.storage.save(name, ContentFile(content))
+        unchanged = Q(**{field_name: file.name})
+    else:
+        unchanged = Q(**{f"{field_name}__isnull": True}) | Q(**{field_name: ""})
+    variants_field = get_variants_field(type(instance), field_name)
+    # bumps updated_at, the ETags of the responses embedding the variants change
+    type(instance).objects.filter(unchanged, pk=instance.pk).update(
+        **{variants_field: variants, "updated_at": timezone.now()}
+    )
+    setattr(instance, variants_field, variants)
+    image_variants_generated.send(sender=type(instance), instance=instance)
+    return variants
+
+
+def needs_image_variants(instance, field_name) -> bool:
+    file = getattr(instance, field_name)
+    variants = getattr(instance, get_variants_field(type(instance), field_name))
+    return (file.name or None) != variants.get("source")
+
+
+def queue_image_variants(sender, instance, **kwargs):
+    from .outbox import dispatch_on_commit
+    from .tasks import generate_image_variants_task
+
+    for label, field_name, _ in IMAGE_FIELDS:
+        if sender._meta.label == label and needs_image_variants(instance, field_name):
+            dispatch_on_commit(
+                generate_image_variants_task, label, str(instance.pk), field_name
+            )
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Represents the variants of an image as urls, empty until they are generated."""
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+        request = self.context.get("request")
+        urls = {}
+        for variant in IMAGE_VARIANTS:
+            if variant not in value:
+                continue
+            url = default_storage.url(value[variant])
+            urls[variant] = request.build_absolute_uri(url) if request else url
+        return urls
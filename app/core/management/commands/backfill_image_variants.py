@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, generate_image_variants, needs_image_variants
+from core.tasks import generate_image_variants_task
+
+
+class Command(BaseCommand):
+    help = "Generates the thumbnails and WebP variants of images uploaded before them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Generate the variants here instead of queueing Celery tasks",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that already exist",
+        )
+
+    def handle(self, *args, **options):
+        for label, field_name, _ in IMAGE_FIELDS:
+            queryset = (
+                apps.get_model(label)
+                .objects.exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+            )
+            total = 0
+            for instance in queryset.iterator():
+                if not (options["force"] or needs_image_variants(instance, field_name)):
+                    continue
+                if options["sync"]:
+                    generate_image_variants(instance, field_name)
+                else:
+                    generate_image_variants_task.delay(
+                        label, str(instance.pk), field_name
+                    )
+                total += 1
+            self.stdout.write(f"{label}.{field_name}: {total} images")
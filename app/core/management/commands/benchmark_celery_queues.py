@@ -0,0 +1,84 @@
+import time
+from contextlib import ExitStack
+from statistics import mean
+
+from celery.contrib.testing.worker import start_worker
+from django.core.management.base import BaseCommand
+
+from core.celery import APP
+
+INTERACTIVE_QUEUE = "benchmark.interactive"
+BULK_QUEUE = "benchmark.bulk"
+
+latencies = []
+
+
+@APP.task(ignore_result=True)
+def benchmark_bulk_job(duration):
+    time.sleep(duration)
+
+
+@APP.task(ignore_result=True)
+def benchmark_interactive_job(sent_at):
+    latencies.append(time.time() - sent_at)
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues a bulk backlog followed by interactive tasks and reports how long the "
+        "interactive tasks waited, first with a single shared queue and then with "
+        "a dedicated queue and worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bulk-tasks", type=int, default=100)
+        parser.add_argument(
+            "--bulk-duration",
+            type=float,
+            default=0.02,
+            help="Seconds each bulk task takes",
+        )
+        parser.add_argument("--interactive-tasks", type=int, default=10)
+
+    def handle(self, *args, **options):
+        for label, interactive_queue in (
+            ("shared queue", BULK_QUEUE),
+            ("dedicated queue", INTERACTIVE_QUEUE),
+        ):
+            waited = self.run(interactive_queue, options)
+            self.stdout.write(
+                f"{label}: interactive tasks waited {mean(waited) * 1000:.0f}ms "
+                f"on average, {max(waited) * 1000:.0f}ms at most"
+            )
+
+    def run(self, interactive_queue, options):
+        latencies.clear()
+        with APP.connection_for_write() as connection:
+            for queue in (BULK_QUEUE, INTERACTIVE_QUEUE):
+                APP.amqp.queues[queue].bind(connection.default_channel).purge()
+
+        for _ in range(options["bulk_tasks"]):
+            benchmark_bulk_job.apply_async(
+                (options["bulk_duration"],), queue=BULK_QUEUE
+            )
+        for _ in range(options["interactive_tasks"]):
+            benchmark_interactive_job.apply_async(
+                (time.time(),), queue=interactive_queue
+            )
+
+        # each worker prefetches one task at a time, as the production workers do
+        queues = {BULK_QUEUE} | {interactive_queue}
+        with ExitStack() as stack:
+            for queue in queues:
+                stack.enter_context(
+                    start_worker(
+                        APP,
+                        queues=[queue],
+                        prefetch_multiplier=1,
+                        perform_ping_check=False,
+                        shutdown_timeout=60,
+                    )
+                )
+            while len(latencies) < options["interactive_tasks"]:
+                time.sleep(0.01)
+        return list(latencies)
@@ -0,0 +1,64 @@
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays requests through the WSGI handler and reports how many database "
+        "connections were opened with and without persistent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/v1/organisation/check-tenant/?subdomain=benchmark",
+            help="Path requested on every iteration",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE used for the persistent connections run",
+        )
+
+    def handle(self, *args, **options):
+        for conn_max_age in (0, options["conn_max_age"]):
+            opened, elapsed = self.run(
+                options["path"], options["requests"], conn_max_age
+            )
+            self.stdout.write(
+                f"CONN_MAX_AGE={conn_max_age}: {options['requests']} requests, "
+                f"{opened} connections opened, "
+                f"{options['requests'] / elapsed:.1f} requests/s"
+            )
+
+    def run(self, path, total_requests, conn_max_age):
+        connections.close_all()
+        for connection in connections.all():
+            connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        handler = WSGIHandler()
+        environ = RequestFactory().get(path, HTTP_HOST="localhost").environ
+        start = time.perf_counter()
+        try:
+            for _ in range(total_requests):
+                response = handler(dict(environ), lambda status, headers: None)
+                # request_finished is sent on close, as a WSGI server would do
+                response.close()
+        finally:
+            connection_created.disconnect(count_connection)
+        elapsed = time.perf_counter() - start
+        connections.close_all()
+        return len(opened), elapsed
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.blobs import collect_unreferenced_blobs
+
+
+class Command(BaseCommand):
+    help = "Deletes the deduplicated media blobs no longer referenced by any row."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=settings.MEDIA_BLOB_GRACE_HOURS,
+            help="Keep blobs uploaded less than this many hours ago",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="List the blobs without deleting"
+        )
+
+    def handle(self, *args, **options):
+        deleted = collect_unreferenced_blobs(
+            timedelta(hours=options["grace_hours"]), dry_run=options["dry_run"]
+        )
+        for name in deleted:
+            self.stdout.write(name)
+        self.stdout.write(f"{len(deleted)} unreferenced blobs")
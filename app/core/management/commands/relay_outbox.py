@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.outbox import relay_outbox_messages
+
+
+class Command(BaseCommand):
+    help = "Publishes the Celery tasks written to the transactional outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the outbox once and exit"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            published = relay_outbox_messages(options["batch_size"])
+            if published:
+                self.stdout.write(f"Published {published} messages")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
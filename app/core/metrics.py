@@ -0,0 +1,121 @@
+import hmac
+import ipaddress
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent processing a request",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL queries per request",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERY_COUNT = Histogram(
+    "http_request_db_queries",
+    "Number of SQL queries executed per request",
+    ["route", "method"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body",
+    ["route", "method"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups grouped by result",
+    ["result"],
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class QueryTimer:
+    """
+    Execute wrapper counting the queries run on a connection and the time spent on them.
+    Usage:
+        with connection.execute_wrapper(QueryTimer()):
+            ...
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def get_route_name(request) -> str:
+    """Returns a low cardinality label for the resolved view of a request."""
+    resolver_match = getattr(request, "resolver_match", None)
+    if not resolver_match:
+        return UNMATCHED_ROUTE
+    return resolver_match.view_name or resolver_match.route or UNMATCHED_ROUTE
+
+
+def get_registry():
+    """
+    Returns the registry to expose. When PROMETHEUS_MULTIPROC_DIR is set (gunicorn with
+    several workers) the samples written by every worker are merged on scrape.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def is_metrics_client(request) -> bool:
+    """
+    Scrapers either send METRICS_TOKEN as a bearer token or connect from one of
+    METRICS_ALLOWED_NETWORKS. REMOTE_ADDR is the direct peer, so behind a proxy the
+    token is the way to reach the endpoint.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if token and hmac.compare_digest(
+        authorization.encode(), f"Bearer {token}".encode()
+    ):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+def metrics_view(request):
+    if not is_metrics_client(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
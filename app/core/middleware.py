@@ -1,10 +1,24 @@
 import json
+import time
+from contextlib import ExitStack
 
 from django.conf import settings
+from django.db import connections
 from django.http import JsonResponse, HttpResponse
 
+from rest_framework.permissions import SAFE_METHODS
 from sentry_sdk import capture_exception
 
+from .db import PRIMARY_PIN_COOKIE, route_reads_to_replicas
+from .metrics import (
+    QueryTimer,
+    get_route_name,
+    REQUEST_LATENCY,
+    REQUEST_DB_TIME,
+    REQUEST_QUERY_COUNT,
+    RESPONSE_SIZE,
+)
+
 
 class CaptureExceptionMiddleware:
     def __init__(self, get_response):
@@ -44,3 +58,58 @@ class ValidationErrorMiddleware:
             response.content = json.dumps(data)
 
         return response
+
+
+class MetricsMiddleware:
+    """Records per route latency, SQL query count and time, and response size."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_timer))
+            response: HttpResponse = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        route = get_route_name(request)
+        method = request.method
+        REQUEST_LATENCY.labels(route, method, response.status_code).observe(duration)
+        REQUEST_DB_TIME.labels(route, method).observe(query_timer.duration)
+        REQUEST_QUERY_COUNT.labels(route, method).observe(query_timer.count)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route, method).observe(len(response.content))
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Reads of safe requests go to the read replicas. After a write the client gets a
+    cookie pinning its reads to the primary for REPLICA_PIN_SECONDS, so it reads its
+    own writes while the replicas catch up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        use_primary = (
+            request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE in request.COOKIES
+        )
+        with route_reads_to_replicas(use_primary) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,103 @@
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .utils.etags import get_etag
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Answers If-None-Match and If-Modified-Since with 304 on the conditional actions
+    before the handler runs, so unchanged rows are neither loaded nor serialized.
+    Validators are read with one aggregate over the action's queryset: max updated_at
+    and row count for lists, the object's updated_at for detail actions, along with
+    those of the conditional_relations the serializer nests. Detail actions check
+    the object's permissions first. Only detail actions send Last-Modified: a row
+    deleted or filtered out of a list doesn't move its latest updated_at, only the
+    ETag's count sees it. Actions whose response isn't a plain queryset override
+    get_validators.
+    """
+
+    conditional_actions = ("list", "retrieve")
+    # related rows embedded in the responses, whose changes must change the ETag
+    conditional_relations = ()
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset
+
+    def get_validators(self):
+        """Returns the (etag, last_modified) of the action's response."""
+        aggregates = {
+            "updated_at": Max("updated_at"),
+            "count": Count("pk", distinct=True),
+        }
+        for relation in self.conditional_relations:
+            # joined rows are counted as they are: the count is only compared
+            aggregates[f"{relation}_updated_at"] = Max(f"{relation}__updated_at")
+            aggregates[f"{relation}_count"] = Count(relation)
+        validators = self.get_conditional_queryset().aggregate(**aggregates)
+        last_modified = max(
+            (
+                validators[name]
+                for name in aggregates
+                if name.endswith("updated_at") and validators[name]
+            ),
+            default=None,
+        )
+        return (
+            get_etag(*(validators[name] for name in aggregates)),
+            last_modified,
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if (
+            request.method in ("GET", "HEAD")
+            and self.action in self.conditional_actions
+        ):
+            if self.detail:
+                # 404 and 403 before 304, a validator must not leak the object
+                self.get_object()
+            etag, last_modified = self.get_validators()
+            if not self.detail:
+                last_modified = None
+            self.validators = etag, last_modified
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified and int(last_modified.timestamp()),
+            )
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "validators", None)
+        if validators and (
+            200 <= response.status_code < 300 or response.status_code == 304
+        ):
+            etag, last_modified = validators
+            if etag:
+                response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+            # responses depend on the user, shared caches must not keep them
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,62 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from .celery import APP
+from .models import OutboxMessage
+
+
+def dispatch_on_commit(task, *args, **kwargs):
+    """
+    Sends a Celery task once the current transaction commits. Inside an atomic block
+    the task is written to the outbox in the same transaction, so it never runs for
+    data that was rolled back and is not lost if the process dies before publishing.
+    Outside of a transaction the task is sent straight away.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        return task.delay(*args, **kwargs)
+    message = OutboxMessage.objects.create(
+        task_name=task.name, args=list(args), kwargs=kwargs
+    )
+    transaction.on_commit(
+        partial(publish_outbox_message, message.pk, task, args, kwargs)
+    )
+
+
+def publish_outbox_message(message_id, task, args, kwargs):
+    """Fast path run on commit, skipped when the relay already published the message."""
+    with transaction.atomic():
+        deleted, _ = OutboxMessage.objects.filter(pk=message_id).delete()
+        if deleted:
+            task.delay(*args, **kwargs)
+
+
+def relay_outbox_messages(batch_size=None) -> int:
+    """
+    Publishes the messages left in the outbox in batches over a single broker
+    connection. Rows are locked with SKIP LOCKED so several relays can run at once.
+    Returns the number of messages published.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    published = 0
+    while True:
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not messages:
+                break
+            with APP.producer_or_acquire() as producer:
+                for message in messages:
+                    APP.send_task(
+                        message.task_name,
+                        args=message.args,
+                        kwargs=message.kwargs,
+                        producer=producer,
+                    )
+            OutboxMessage.objects.filter(
+                pk__in=[message.pk for message in messages]
+            ).delete()
+        published += len(messages)
+    return published
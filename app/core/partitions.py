@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+from django.db import connections
+
+PARTITION_SQL = (
+    "CREATE TABLE {partition} PARTITION OF {table} "
+    "FOR VALUES FROM ('{start}') TO ('{end}')"
+)
+
+PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.oid = to_regclass(%s)
+"""
+
+
+def get_month(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, months) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def get_partition_name(table, month) -> str:
+    return f"{table}_{month:%Y%m}"
+
+
+def create_monthly_partitions(table, start, end, using="default") -> list:
+    """
+    Creates the missing monthly range partitions of the table from the month of start
+    to the month of end, both included. Returns the names of the partitions created.
+    """
+    created = []
+    month = get_month(start)
+    with connections[using].cursor() as cursor:
+        while month <= end:
+            partition = get_partition_name(table, month)
+            cursor.execute("SELECT to_regclass(%s)", [partition])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    PARTITION_SQL.format(
+                        partition=partition,
+                        table=table,
+                        start=month.isoformat(),
+                        end=add_months(month, 1).isoformat(),
+                    )
+                )
+                created.append(partition)
+            month = add_months(month, 1)
+    return created
+
+
+def get_partitions(table, using="default") -> dict:
+    """{month: partition name} of the table's monthly partitions."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, [table])
+        names = [name for (name,) in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        suffix = name[len(table) + 1 :]
+        if name.startswith(f"{table}_") and len(suffix) == 6 and suffix.isdigit():
+            partitions[datetime.strptime(suffix, "%Y%m").date()] = name
+    return partitions
+
+
+def drop_monthly_partitions(table, before, using="default", archive_schema="") -> list:
+    """
+    Detaches the monthly partitions of the table older than the month of before and
+    drops them, or moves them to archive_schema where they stay readable. Dropping a
+    partition frees its space at once, unlike deleting its rows.
+    Returns the names of the partitions removed.
+    """
+    removed = []
+    with connections[using].cursor() as cursor:
+        for month, partition in sorted(get_partitions(table, using).items()):
+            if month >= get_month(before):
+                break
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+            if archive_schema:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+                cursor.execute(f"ALTER TABLE {partition} SET SCHEMA {archive_schema}")
+            else:
+                cursor.execute(f"DROP TABLE {partition}")
+            removed.append(partition)
+    return removed
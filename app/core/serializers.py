@@ -0,0 +1,57 @@
+from django.core.files.storage import default_storage
+from django.db import models
+from rest_framework import serializers
+
+from .storage_backends import get_urls
+from .uploads import UPLOAD_CONTENT_TYPES, UPLOAD_KINDS, UploadedFileField
+
+
+class PresignedUploadFileSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=200)
+    content_type = serializers.CharField(max_length=100)
+
+
+class PresignedUploadSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=UPLOAD_KINDS)
+    files = PresignedUploadFileSerializer(many=True, allow_empty=False)
+
+    def validate_files(self, files):
+        if len(files) > 10:
+            raise serializers.ValidationError(
+                "At most 10 files can be uploaded at once."
+            )
+        return files
+
+    def validate(self, attrs):
+        allowed = UPLOAD_CONTENT_TYPES[attrs["kind"]]
+        if any(file["content_type"] not in allowed for file in attrs["files"]):
+            raise serializers.ValidationError(
+                {"files": f"Allowed content types are {', '.join(allowed)}."}
+            )
+        return attrs
+
+
+class FileURLListSerializer(serializers.ListSerializer):
+    """
+    Gets the urls of the files (UploadedFileField, or lists of them) of every item
+    in one batch from the storage instead of one at a time.
+    """
+
+    def get_file_names(self, instances):
+        for name, field in self.child.fields.items():
+            many = isinstance(field, serializers.ListField)
+            if not isinstance(field.child if many else field, UploadedFileField):
+                continue
+            for instance in instances:
+                value = getattr(instance, field.source, None)
+                for file in (value or []) if many else [value]:
+                    if file:
+                        yield file.name
+
+    def to_representation(self, data):
+        instances = data.all() if isinstance(data, models.Manager) else data
+        instances = list(instances)
+        self.context["file_urls"] = get_urls(
+            default_storage, self.get_file_names(instances)
+        )
+        return super().to_representation(instances)
@@ -1,6 +1,101 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+BLOB_LOCATION = "blobs"
 
 
 class MediaStorage(S3Boto3Storage):
     location = "media"
     file_overwrite = False
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if parameters or expire or http_method:
+            return super().url(name, parameters, expire, http_method)
+        return self.urls([name])[name]
+
+    def urls(self, names) -> dict:
+        """
+        Returns the url of each file. Signed urls (AWS_QUERYSTRING_AUTH) are cached
+        for SIGNED_URL_CACHE_SECONDS, so the files of a page are signed once and
+        looked up in one round trip afterwards.
+        """
+        names = set(names)
+        if not self.querystring_auth:
+            return {name: super(MediaStorage, self).url(name) for name in names}
+
+        keys = {name: f"signed-url:{self.bucket_name}:{name}" for name in names}
+        cached = cache.get_many(list(keys.values()))
+        urls = {}
+        signed = {}
+        for name, key in keys.items():
+            if key not in cached:
+                cached[key] = signed[key] = super(MediaStorage, self).url(name)
+            urls[name] = cached[key]
+        if signed:
+            cache.set_many(signed, settings.SIGNED_URL_CACHE_SECONDS)
+        return urls
+
+
+class ContentAddressedStorageMixin:
+    """
+    Stores files under the SHA-256 of their content, so a file uploaded twice
+    (e.g. the same receipt attached to several claims) is kept once. Blobs can be
+    shared by several rows, they are deleted by collect_media_blobs once nothing
+    references them instead of when a row is deleted.
+    """
+
+    def get_blob_name(self, name, content) -> str:
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        _, extension = os.path.splitext(name)
+        digest = digest.hexdigest()
+        return f"{BLOB_LOCATION}/{digest[:2]}/{digest}{extension.lower()}"
+
+    def get_available_name(self, name, max_length=None):
+        # the name is derived from the content in _save, no need to look it up
+        return name
+
+    def _save(self, name, content):
+        name = self.get_blob_name(name, content)
+        if self.exists(name):
+            # the blob may be old and unreferenced, restarting its grace period keeps
+            # collect_media_blobs from deleting it before the new row commits
+            self.touch(name)
+            return name
+        return super()._save(name, content)
+
+    def touch(self, name):
+        """Sets the modified time of the stored file to now."""
+        os.utime(self.path(name))
+
+    def delete(self, name):
+        if not name.startswith(f"{BLOB_LOCATION}/"):
+            super().delete(name)
+
+
+class DeduplicatedMediaStorage(ContentAddressedStorageMixin, MediaStorage):
+    def touch(self, name):
+        # S3 only updates LastModified when an object is written, copy it onto itself
+        obj = self.bucket.Object(self._normalize_name(clean_name(name)))
+        params = {"ContentType": obj.content_type, **self.get_object_parameters(name)}
+        if self.default_acl:
+            params["ACL"] = self.default_acl
+        obj.copy_from(
+            CopySource={"Bucket": self.bucket_name, "Key": obj.key},
+            MetadataDirective="REPLACE",
+            **params,
+        )
+
+
+def get_urls(storage, names) -> dict:
+    """Returns the url of each file, in one batch where the storage supports it."""
+    if hasattr(storage, "urls"):
+        return storage.urls(names)
+    return {name: storage.url(name) for name in set(names)}
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+
+from .blobs import collect_unreferenced_blobs
+from .celery import APP
+from .images import generate_image_variants
+
+
+@APP.task(ignore_result=True)
+def generate_image_variants_task(model_label, pk, field_name):
+    instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+    if instance:
+        generate_image_variants(instance, field_name)
+
+
+@APP.task(ignore_result=True)
+def collect_media_blobs():
+    collect_unreferenced_blobs(timedelta(hours=settings.MEDIA_BLOB_GRACE_HOURS))
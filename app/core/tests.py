@@ -0,0 +1,438 @@
+import base64
+import json
+import os
+import shutil
+from datetime import timedelta
+import tempfile
+from io import BytesIO
+from unittest import mock
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.core.signals import request_finished, request_started
+from celery.signals import worker_init
+from storages.backends.s3boto3 import S3Boto3Storage
+from claim.models import Expense
+from employee.serializers import (
+    EmployeeEducationHistorySerializer,
+    EmployeeUpdateSerializer,
+)
+from organisation.models import Organisation
+from .db import PRIMARY_PIN_COOKIE, PrimaryReplicaRouter, route_reads_to_replicas
+from .blobs import collect_unreferenced_blobs
+from .images import generate_image_variants, get_variant_format
+from .metrics import QueryTimer
+from .models import OutboxMessage
+from .outbox import dispatch_on_commit, relay_outbox_messages
+from .middleware import ReplicaRoutingMiddleware
+from .storage_backends import ContentAddressedStorageMixin, MediaStorage
+from .uploads import UPLOAD_KEY_MAX_LENGTH
+
+
+class MetricsTests(APITestCase):
+    def test_metrics_endpoint_exposes_request_metrics(self):
+        self.client.get(
+            reverse("organization:organisation-check-tenant"), {"subdomain": "edge"}
+        )
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn("http_request_duration_seconds", content)
+        self.assertIn('route="organization:organisation-check-tenant"', content)
+        self.assertIn("http_request_db_queries", content)
+
+    @override_settings(METRICS_TOKEN="scrape")
+    def test_metrics_endpoint_is_internal(self):
+        url = reverse("metrics")
+        response = self.client.get(url, REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(
+            url, REMOTE_ADDR="203.0.113.7", HTTP_AUTHORIZATION="Bearer wrong"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(
+            url, REMOTE_ADDR="203.0.113.7", HTTP_AUTHORIZATION="Bearer scrape"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_query_timer_counts_queries(self):
+        query_timer = QueryTimer()
+        with connection.execute_wrapper(query_timer):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.execute("SELECT 2")
+        self.assertEqual(query_timer.count, 2)
+        self.assertGreater(query_timer.duration, 0)
+
+
+class FakeConnection:
+    def __init__(self, usable=True, in_atomic_block=False):
+        self.connection = object()
+        self.in_atomic_block = in_atomic_block
+        self.usable = usable
+        self.checks = 0
+        self.closed = False
+        self.settings_dict = {"CONN_MAX_AGE": 60}
+
+    def is_usable(self):
+        self.checks += 1
+        return self.usable
+
+    def close(self):
+        self.closed = True
+
+
+@override_settings(DB_CONN_HEALTH_CHECKS=True, DB_CONN_HEALTH_CHECK_IDLE_SECONDS=10)
+class ConnectionHealthCheckTests(SimpleTestCase):
+    def start_request(self, *fake_connections):
+        with mock.patch("core.db.connections") as mock_connections:
+            mock_connections.all.return_value = fake_connections
+            request_started.send(sender=self.__class__)
+
+    def test_request_started_closes_unusable_connections(self):
+        broken, healthy = FakeConnection(usable=False), FakeConnection()
+        in_transaction = FakeConnection(usable=False, in_atomic_block=True)
+        self.start_request(broken, healthy, in_transaction)
+        self.assertTrue(broken.closed)
+        self.assertFalse(healthy.closed)
+        self.assertEqual(in_transaction.checks, 0)
+
+    def test_recently_used_connections_are_not_pinged(self):
+        fake_connection = FakeConnection()
+        with mock.patch("core.db.connections") as mock_connections:
+            mock_connections.all.return_value = [fake_connection]
+            request_finished.send(sender=self.__class__)
+        self.start_request(fake_connection)
+        self.assertEqual(fake_connection.checks, 0)
+
+        fake_connection.last_used_at -= 11
+        self.start_request(fake_connection)
+        self.assertEqual(fake_connection.checks, 1)
+
+    @override_settings(DB_WORKER_CONN_MAX_AGE=600)
+    def test_worker_init_applies_worker_connection_lifetime(self):
+        fake_connection = FakeConnection()
+        with mock.patch("core.db.connections") as mock_connections:
+            mock_connections.all.return_value = [fake_connection]
+            worker_init.send(sender=None)
+        self.assertEqual(fake_connection.settings_dict["CONN_MAX_AGE"], 600)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"], REPLICA_MAX_LAG_SECONDS=0)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_primary_outside_routing_block(self):
+        self.assertEqual(self.router.db_for_read(Organisation), "default")
+
+    def test_reads_use_replica_until_a_write(self):
+        with route_reads_to_replicas() as state:
+            self.assertEqual(self.router.db_for_read(Organisation), "replica_0")
+            self.assertEqual(self.router.db_for_write(Organisation), "default")
+            self.assertEqual(self.router.db_for_read(Organisation), "default")
+        self.assertTrue(state.wrote)
+
+    def test_write_request_pins_client_to_primary(self):
+        def get_response(request):
+            self.router.db_for_write(Organisation)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(RequestFactory().post("/"))
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_from_primary(self):
+        reads = []
+
+        def get_response(request):
+            reads.append(self.router.db_for_read(Organisation))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(RequestFactory().get("/"))
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+        middleware(request)
+        self.assertEqual(reads, ["replica_0", "default"])
+
+
+class OutboxTests(TestCase):
+    def test_task_sent_after_commit(self):
+        task = mock.Mock()
+        task.name = "user.tasks.send_new_user_email"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            dispatch_on_commit(task, {"email": "user@prunedge.com"})
+            self.assertEqual(OutboxMessage.objects.count(), 1)
+            task.delay.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        task.delay.assert_called_once_with({"email": "user@prunedge.com"})
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_task_discarded_on_rollback(self):
+        task = mock.Mock()
+        task.name = "user.tasks.send_new_user_email"
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    dispatch_on_commit(task, {"email": "user@prunedge.com"})
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(len(callbacks), 0)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @mock.patch("core.outbox.APP.send_task")
+    def test_relay_publishes_pending_messages(self, mock_send_task):
+        OutboxMessage.objects.bulk_create(
+            [
+                OutboxMessage(task_name="user.tasks.send_new_user_email", args=[index])
+                for index in range(5)
+            ]
+        )
+        self.assertEqual(relay_outbox_messages(batch_size=2), 5)
+        self.assertEqual(mock_send_task.call_count, 5)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(
+    DEFAULT_FILE_STORAGE="core.storage_backends.MediaStorage",
+    AWS_S3_ENDPOINT_URL="http://localhost:9000",
+    AWS_STORAGE_BUCKET_NAME="hrpay",
+    AWS_ACCESS_KEY_ID="minio",
+    AWS_SECRET_ACCESS_KEY="minio123",
+)
+class PresignedUploadTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="ridwan.yusuf@prunedge.com", password="passer", verified=True
+        )
+        response = self.client.post(
+            reverse("user:login"),
+            {"email": "ridwan.yusuf@prunedge.com", "password": "passer"},
+            format="json",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + response.json()["access"]
+        )
+
+    def test_returns_presigned_urls_under_user_prefix(self):
+        data = {
+            "kind": "expense_claim",
+            "files": [
+                {"filename": "receipt 1.png", "content_type": "image/png"},
+                {"filename": "receipt 2.pdf", "content_type": "application/pdf"},
+            ],
+        }
+        response = self.client.post(reverse("presigned-uploads"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        uploads = response.json()["data"]
+        self.assertEqual(len(uploads), 2)
+        self.assertTrue(uploads[0]["key"].startswith(f"expense_claim/{self.user.id}/"))
+        self.assertTrue(uploads[0]["key"].endswith("receipt_1.png"))
+        self.assertTrue(uploads[0]["url"].startswith("http://localhost:9000/hrpay"))
+        self.assertEqual(uploads[0]["method"], "POST")
+        fields = uploads[1]["fields"]
+        self.assertEqual(fields["key"], f"media/{uploads[1]['key']}")
+        self.assertEqual(fields["Content-Type"], "application/pdf")
+        policy = json.loads(base64.b64decode(fields["policy"]))
+        self.assertIn(
+            ["content-length-range", 1, settings.UPLOAD_MAX_SIZE],
+            policy["conditions"],
+        )
+        self.assertIn({"Content-Type": "application/pdf"}, policy["conditions"])
+
+    def test_keys_fit_the_file_fields(self):
+        filename = "certificate-of-completion-advanced-project-management-2022.pdf"
+        data = {
+            "kind": "employee_file",
+            "files": [{"filename": filename, "content_type": "application/pdf"}],
+        }
+        response = self.client.post(reverse("presigned-uploads"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        key = response.json()["data"][0]["key"]
+        self.assertLessEqual(len(key), UPLOAD_KEY_MAX_LENGTH)
+        self.assertTrue(key.startswith(f"employees/{self.user.id}/"))
+        self.assertTrue(key.endswith(".pdf"))
+
+        request = RequestFactory().post("/")
+        request.user = self.user
+        field = EmployeeEducationHistorySerializer(context={"request": request}).fields[
+            "file"
+        ]
+        too_long = f"employees/{self.user.id}/{'a' * 12}/{filename}"
+        with self.assertRaises(ValidationError):
+            field.run_validation(too_long)
+
+    def test_rejects_content_types_not_allowed_for_the_kind(self):
+        data = {
+            "kind": "employee_image",
+            "files": [{"filename": "a.pdf", "content_type": "application/pdf"}],
+        }
+        response = self.client.post(reverse("presigned-uploads"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("files", response.json()["errors"])
+
+    @override_settings(
+        DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+        MEDIA_ROOT=tempfile.mkdtemp(),
+        UPLOAD_MAX_SIZE=1024,
+    )
+    def test_uploaded_keys_are_checked_before_they_are_recorded(self):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        fields = EmployeeUpdateSerializer(context={"request": request}).fields
+        prefix = f"images/{self.user.id}/upload"
+        output = BytesIO()
+        Image.new("RGB", (10, 10), "white").save(output, "PNG")
+        image = default_storage.save(f"{prefix}/a.png", ContentFile(output.getvalue()))
+        self.assertEqual(fields["image"].run_validation(image), image)
+
+        fake = default_storage.save(f"{prefix}/b.png", ContentFile(b"<html>"))
+        large = default_storage.save(f"{prefix}/c.png", ContentFile(b"0" * 2048))
+        document = default_storage.save(f"{prefix}/d.pdf", ContentFile(b"%PDF"))
+        for key in (fake, large, document):
+            with self.assertRaises(ValidationError):
+                fields["image"].run_validation(key)
+
+    def test_rejects_unknown_kind(self):
+        data = {
+            "kind": "other",
+            "files": [{"filename": "a.png", "content_type": "image/png"}],
+        }
+        response = self.client.post(reverse("presigned-uploads"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+)
+class ImageVariantsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def create_organisation(self):
+        output = BytesIO()
+        Image.new("RGB", (2000, 1000), "white").save(output, "PNG")
+        return Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            logo=SimpleUploadedFile("logo.png", output.getvalue()),
+        )
+
+    @mock.patch("core.tasks.generate_image_variants_task.delay")
+    def test_variants_queued_when_image_uploaded(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            organisation = self.create_organisation()
+        mock_delay.assert_called_once_with(
+            "organisation.Organisation", str(organisation.id), "logo"
+        )
+
+    @mock.patch("core.tasks.generate_image_variants_task.delay")
+    def test_generates_resized_variants(self, mock_delay):
+        organisation = self.create_organisation()
+        variants = generate_image_variants(organisation, "logo")
+        self.assertEqual(variants["source"], organisation.logo.name)
+        with organisation.logo.storage.open(variants["thumb"]) as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, get_variant_format()[0])
+            self.assertEqual(image.size, (96, 48))
+        organisation.refresh_from_db()
+        self.assertEqual(organisation.logo_variants, variants)
+
+
+class DeduplicatedFileSystemStorage(ContentAddressedStorageMixin, FileSystemStorage):
+    pass
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    DEFAULT_FILE_STORAGE="core.tests.DeduplicatedFileSystemStorage",
+)
+class DeduplicatedStorageTests(TestCase):
+    def test_same_content_stored_once(self):
+        first = default_storage.save("expense_claim/a.pdf", ContentFile(b"receipt"))
+        second = default_storage.save("employees/b.PDF", ContentFile(b"receipt"))
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("blobs/") and first.endswith(".pdf"))
+        default_storage.delete(first)
+        self.assertTrue(default_storage.exists(first))
+
+    def test_reused_blob_survives_collection(self):
+        name = default_storage.save("expense_claim/a.pdf", ContentFile(b"receipt"))
+        old = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(default_storage.path(name), (old, old))
+        # uploaded again by a row that isn't committed yet
+        default_storage.save("expense_claim/b.pdf", ContentFile(b"receipt"))
+        self.assertEqual(collect_unreferenced_blobs(timedelta(days=1)), [])
+        self.assertTrue(default_storage.exists(name))
+
+    def test_collects_unreferenced_blobs(self):
+        organisation = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            logo=SimpleUploadedFile("logo.png", b"logo"),
+        )
+        orphan = default_storage.save("logos/old.png", ContentFile(b"old logo"))
+        deleted = collect_unreferenced_blobs(timedelta(0))
+        self.assertIn(orphan, deleted)
+        self.assertNotIn(organisation.logo.name, deleted)
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(organisation.logo.name))
+
+
+class FileURLTests(SimpleTestCase):
+    def test_array_file_descriptor_caches_files(self):
+        expense = Expense(documents=["expense_claim/a.pdf", "expense_claim/b.pdf"])
+        self.assertIs(expense.documents, expense.documents)
+        expense.documents = ["expense_claim/c.pdf"]
+        self.assertEqual(
+            [file.name for file in expense.documents], ["expense_claim/c.pdf"]
+        )
+
+    @override_settings(
+        AWS_QUERYSTRING_AUTH=True,
+        AWS_S3_CUSTOM_DOMAIN=None,
+        AWS_STORAGE_BUCKET_NAME="hrpay",
+    )
+    @mock.patch.object(
+        S3Boto3Storage,
+        "url",
+        autospec=True,
+        side_effect=lambda storage, name, *args: f"https://signed/{name}",
+    )
+    def test_signed_urls_cached(self, mock_url):
+        cache.delete_many(["signed-url:hrpay:a.pdf", "signed-url:hrpay:b.pdf"])
+        storage = MediaStorage()
+        self.assertEqual(
+            storage.urls(["a.pdf", "b.pdf", "a.pdf"]),
+            {"a.pdf": "https://signed/a.pdf", "b.pdf": "https://signed/b.pdf"},
+        )
+        self.assertEqual(storage.url("b.pdf"), "https://signed/b.pdf")
+        self.assertEqual(mock_url.call_count, 2)
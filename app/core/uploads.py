@@ -0,0 +1,178 @@
+import mimetypes
+import os
+import secrets
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+from PIL import Image
+from rest_framework import serializers
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+# storage prefix of each kind of file a client can upload directly, matching
+# the upload_to of the model fields they end up in
+UPLOAD_LOCATIONS = {
+    "expense_claim": "expense_claim/",
+    "employee_file": "employees/",
+    "employee_image": "images/",
+    "user_image": "users/",
+}
+UPLOAD_KINDS = tuple((kind, kind) for kind in UPLOAD_LOCATIONS)
+# the model FileFields keys are saved to are varchar(100)
+UPLOAD_KEY_MAX_LENGTH = 100
+
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+DOCUMENT_CONTENT_TYPES = IMAGE_CONTENT_TYPES + (
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+)
+# content types a client may upload directly per kind
+UPLOAD_CONTENT_TYPES = {
+    "expense_claim": DOCUMENT_CONTENT_TYPES,
+    "employee_file": DOCUMENT_CONTENT_TYPES,
+    "employee_image": IMAGE_CONTENT_TYPES,
+    "user_image": IMAGE_CONTENT_TYPES,
+}
+
+# form fields of the presigned POST for the object parameters, the client must send
+# them with the file
+SIGNED_FIELDS = {
+    "ContentType": "Content-Type",
+    "ACL": "acl",
+    "CacheControl": "Cache-Control",
+}
+
+
+def get_upload_prefix(kind, user) -> str:
+    """Keys are namespaced by user so a client can only record its own uploads."""
+    return f"{UPLOAD_LOCATIONS[kind]}{user.id}/"
+
+
+def get_upload_key(kind, filename, user, max_length=UPLOAD_KEY_MAX_LENGTH) -> str:
+    """
+    A unique key under the user's prefix, with the filename's stem shortened so the
+    key fits the FileField it ends up in.
+    """
+    prefix = f"{get_upload_prefix(kind, user)}{secrets.token_hex(6)}/"
+    stem, extension = os.path.splitext(get_valid_filename(filename))
+    available = max_length - len(prefix) - len(extension)
+    if available < 1:
+        raise serializers.ValidationError({"filename": "The filename is too long."})
+    return f"{prefix}{stem[:available]}{extension}"
+
+
+def create_presigned_upload(kind, filename, content_type, user) -> dict:
+    """
+    Returns the key and a presigned POST for uploading a file straight to storage.
+    The policy pins the key and content type and caps the size at UPLOAD_MAX_SIZE.
+    """
+    storage = default_storage
+    if not isinstance(storage, S3Boto3Storage):
+        raise serializers.ValidationError(
+            {"storage": "Direct uploads are not supported by the configured storage"}
+        )
+    key = get_upload_key(kind, filename, user)
+
+    params = {"ContentType": content_type}
+    params.update(storage.get_object_parameters(key))
+    if storage.default_acl:
+        params["ACL"] = storage.default_acl
+    fields = {
+        SIGNED_FIELDS[param]: value
+        for param, value in params.items()
+        if param in SIGNED_FIELDS
+    }
+    post = storage.bucket.meta.client.generate_presigned_post(
+        storage.bucket_name,
+        storage._normalize_name(clean_name(key)),
+        Fields=fields,
+        Conditions=[
+            *({field: value} for field, value in fields.items()),
+            ["content-length-range", 1, settings.UPLOAD_MAX_SIZE],
+        ],
+        ExpiresIn=settings.UPLOAD_URL_EXPIRY,
+    )
+    return {"key": key, "url": post["url"], "method": "POST", "fields": post["fields"]}
+
+
+def get_uploaded_file(key):
+    """Returns the size and content type of the uploaded file, None without it."""
+    storage = default_storage
+    if isinstance(storage, S3Boto3Storage):
+        try:
+            head = storage.bucket.meta.client.head_object(
+                Bucket=storage.bucket_name,
+                Key=storage._normalize_name(clean_name(key)),
+            )
+        except ClientError:
+            return None
+        return head["ContentLength"], head.get("ContentType")
+    if not storage.exists(key):
+        return None
+    return storage.size(key), mimetypes.guess_type(key)[0]
+
+
+def verify_uploaded_key(kind, key, user, max_length=UPLOAD_KEY_MAX_LENGTH) -> str:
+    if not key.startswith(get_upload_prefix(kind, user)) or ".." in key:
+        raise serializers.ValidationError("Invalid upload key.")
+    if len(key) > max_length:
+        raise serializers.ValidationError(
+            f"Ensure the upload key has no more than {max_length} characters."
+        )
+    uploaded = get_uploaded_file(key)
+    if uploaded is None:
+        raise serializers.ValidationError("The file has not been uploaded.")
+    size, content_type = uploaded
+    if size > settings.UPLOAD_MAX_SIZE:
+        raise serializers.ValidationError(
+            f"Ensure the file has no more than {settings.UPLOAD_MAX_SIZE} bytes."
+        )
+    if content_type not in UPLOAD_CONTENT_TYPES[kind]:
+        raise serializers.ValidationError("The file type is not allowed.")
+    return key
+
+
+class UploadedFileField(serializers.FileField):
+    """
+    Accepts either a file sent with the request or the key of a file the client
+    uploaded directly through a presigned url (see create_presigned_upload).
+    """
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            return verify_uploaded_key(
+                self.kind,
+                data,
+                self.context["request"].user,
+                self.max_length or UPLOAD_KEY_MAX_LENGTH,
+            )
+        return super().to_internal_value(data)
+
+    def to_representation(self, value):
+        # urls signed in one batch by FileURLListSerializer
+        urls = self.context.get("file_urls")
+        if not value or urls is None or value.name not in urls:
+            return super().to_representation(value)
+        request = self.context.get("request")
+        url = urls[value.name]
+        return request.build_absolute_uri(url) if request else url
+
+
+class UploadedImageField(UploadedFileField, serializers.ImageField):
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if isinstance(data, str):
+            # the uploaded file must be an image Pillow can read, as a sent one
+            try:
+                with default_storage.open(value) as file:
+                    Image.open(file).verify()
+            except Exception:
+                self.fail("invalid_image")
+        return value
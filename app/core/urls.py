@@ -5,6 +5,8 @@ from drf_spectacular.views import (
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
+from .metrics import metrics_view
+from .views import PresignedUploadView
 
 urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -12,6 +14,7 @@ urlpatterns = [
     path('api/v1/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     path('api/v1/api-auth/', include('rest_framework.urls')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('__debug__/', include('debug_toolbar.urls')),
     path('api/v1/auth/', include('user.urls')),
     path('api/v1/organisation/', include('organisation.urls')),
@@ -20,4 +23,7 @@ urlpatterns = [
     path('api/v1/employees/', include('employee.urls')),
     path('api/v1/announcement/', include('announcement.urls')),
     path('api/v1/notification/', include('notification.urls')),
+    path('api/v1/audit/', include('audit.urls')),
+    path('api/v1/workflow/', include('workflow.urls')),
+    path('api/v1/uploads/', PresignedUploadView.as_view(), name='presigned-uploads'),
 ]
@@ -0,0 +1,9 @@
+import hashlib
+
+
+def get_etag(*parts) -> str:
+    """Returns a quoted ETag derived from values such as max(updated_at) and count."""
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    )
+    return f'"{digest.hexdigest()}"'
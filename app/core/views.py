@@ -0,0 +1,28 @@
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .serializers import PresignedUploadSerializer
+from .uploads import create_presigned_upload
+
+
+class PresignedUploadView(generics.GenericAPIView):
+    """
+    Returns presigned urls the client PUTs files to. The returned keys are then
+    sent in place of the files, e.g. in the documents of an expense claim.
+    """
+
+    serializer_class = PresignedUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        kind = serializer.validated_data["kind"]
+        uploads = [
+            create_presigned_upload(
+                kind, file["filename"], file["content_type"], request.user
+            )
+            for file in serializer.validated_data["files"]
+        ]
+        return Response({"success": True, "data": uploads}, status=status.HTTP_200_OK)
@@ -1,6 +1,54 @@
 from django.apps import AppConfig
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_migrate,
+)
 
 
 class EmployeeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "employee"
+
+    def ready(self):
+        from core.images import image_variants_generated
+        from .models import (
+            Employee,
+            EmployeeCertificateHistory,
+            EmployeeEducationHistory,
+            EmployeeEmploymentHistory,
+            EmployeeProfessionalMembership,
+        )
+        from .signals import (
+            create_search_extension,
+            create_search_indexes,
+            refresh_history_profile,
+            refresh_node_profiles,
+            refresh_profile,
+            refresh_reporting_lines,
+            refresh_typeahead_entry,
+            remove_typeahead_entry,
+        )
+
+        pre_migrate.connect(create_search_extension, sender=self)
+        post_migrate.connect(create_search_indexes, sender=self)
+        post_save.connect(refresh_typeahead_entry, sender=Employee)
+        post_delete.connect(remove_typeahead_entry, sender=Employee)
+        post_save.connect(refresh_reporting_lines, sender=Employee)
+        post_delete.connect(refresh_reporting_lines, sender=Employee)
+        post_save.connect(refresh_profile, sender=Employee)
+        post_delete.connect(refresh_profile, sender=Employee)
+        image_variants_generated.connect(refresh_profile, sender=Employee)
+        m2m_changed.connect(
+            refresh_node_profiles, sender=Employee.organisation_nodes.through
+        )
+        for model in (
+            EmployeeEmploymentHistory,
+            EmployeeEducationHistory,
+            EmployeeCertificateHistory,
+            EmployeeProfessionalMembership,
+        ):
+            post_save.connect(refresh_history_profile, sender=model)
+            post_delete.connect(refresh_history_profile, sender=model)
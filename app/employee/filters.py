@@ -0,0 +1,104 @@
+from django.conf import settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Employee
+from .search import search_employees
+
+
+class EmployeeSearchFilter(BaseFilterBackend):
+    """
+    Ranked search over the names, work email, employee_id and job title of the
+    employees of the user's organisation, see employee.search.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return queryset
+        if request.user.organisation_id:
+            queryset = queryset.filter(organisation=request.user.organisation_id)
+        return search_employees(queryset, term)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Name, email, employee id or job title",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class ReportingLineFilter(BaseFilterBackend):
+    """
+    Keeps the rows of the employees reporting, directly or not, to the employee given
+    as under_manager. Views name the employee field with reporting_line_field.
+    """
+
+    manager_param = "under_manager"
+
+    def filter_queryset(self, request, queryset, view):
+        manager_id = request.query_params.get(self.manager_param)
+        if not manager_id:
+            return queryset
+        try:
+            manager = Employee.objects.filter(
+                id=manager_id, organisation=request.user.organisation_id
+            ).first()
+        except DjangoValidationError:
+            raise serializers.ValidationError(
+                {self.manager_param: "Must be a valid UUID."}
+            )
+        if manager is None:
+            return queryset.none()
+        field = getattr(view, "reporting_line_field", "employee")
+        return queryset.filter(
+            **{f"{field}__in": Employee.objects.reports_of(manager).values("id")}
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.manager_param,
+                "required": False,
+                "in": "query",
+                "description": "Id of the employee the listed employees report to",
+                "schema": {"type": "string", "format": "uuid"},
+            }
+        ]
+
+
+TYPEAHEAD_PARAMETERS = [
+    OpenApiParameter(
+        "q",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=True,
+        description="Start of the employee's first name, last name or full name",
+    ),
+    OpenApiParameter(
+        "limit",
+        OpenApiTypes.INT,
+        OpenApiParameter.QUERY,
+        required=False,
+        description=f"10 by default, at most {settings.TYPEAHEAD_MAX_RESULTS}",
+    ),
+]
+
+REPORTS_PARAMETERS = [
+    OpenApiParameter(
+        "max_depth",
+        OpenApiTypes.INT,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Levels below the employee to include, all by default",
+    ),
+]
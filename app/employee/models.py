@@ -1,5 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from core.models import AuditableModel
+from django.db.models.expressions import RawSQL
+from .reporting import get_chain_sql, get_reports_sql
+from .search import SEARCH_VECTOR
 from .enums import (
     EMPLOYEE_STATUS_OPTIONS,
     INVITATION_STATUS_OPTIONS,
@@ -16,6 +20,23 @@ def year_choices():
     return [(year, year) for year in range(1900, datetime.date.today().year + 1)]
 
 
+class EmployeeQuerySet(models.QuerySet):
+    def direct_reports(self, employee):
+        if not employee.user_id:
+            return self.none()
+        return self.filter(
+            manager=employee.user_id, organisation=employee.organisation_id
+        )
+
+    def reports_of(self, employee, max_depth=None):
+        """Direct and indirect reports of the employee, down to max_depth levels."""
+        return self.filter(id__in=RawSQL(*get_reports_sql(employee, max_depth)))
+
+    def chain_of_command(self, employee):
+        """The employee's manager, their manager and so on."""
+        return self.filter(id__in=RawSQL(*get_chain_sql(employee)))
+
+
 class Employee(AuditableModel):
     user = models.OneToOneField(
         "user.User", null=True, blank=True, on_delete=models.PROTECT
@@ -32,7 +53,9 @@ class Employee(AuditableModel):
     work_email = models.EmailField()
     personal_email = models.EmailField(null=True, blank=True)
     job_title = models.CharField(max_length=200)
-    employee_status = models.CharField(max_length=20, choices=EMPLOYEE_STATUS_OPTIONS, default="UNVERIFIED")
+    employee_status = models.CharField(
+        max_length=20, choices=EMPLOYEE_STATUS_OPTIONS, default="UNVERIFIED"
+    )
     employment_status = models.CharField(
         max_length=20, choices=EMPLOYMENT_STATUS_OPTIONS, default="PROBATION"
     )
@@ -53,6 +76,7 @@ class Employee(AuditableModel):
         "organisation.JobGrade", on_delete=models.SET_NULL, null=True
     )
     image = models.ImageField(upload_to="images/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     hire_date = models.DateField(null=True, blank=True)
     gender = models.CharField(max_length=20, choices=GENDER_OPTIONS, default="ALL")
     is_active = models.BooleanField(default=True)
@@ -73,6 +97,11 @@ class Employee(AuditableModel):
     )
     can_update_profile = models.BooleanField(default=True)
 
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [GinIndex(SEARCH_VECTOR, name="employee_search_vector")]
+
     def __str__(self):
         return self.firstname + "-" + self.lastname
 
@@ -0,0 +1,133 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from core.images import IMAGE_VARIANTS
+from core.storage_backends import get_urls
+from core.utils.etags import get_etag
+from .models import Employee
+from .serializers import EmployeeDetailSerializer
+
+PROFILE_KEY = "employee-profile:{user_id}"
+
+# nested in the me profile, prefetched with it and invalidating it when they change
+PROFILE_RELATIONS = (
+    "employment_histories",
+    "education_histories",
+    "certificate_histories",
+    "professional_memberships",
+)
+# histories with a file, cached as its storage name
+FILE_RELATIONS = (
+    "education_histories",
+    "certificate_histories",
+    "professional_memberships",
+)
+
+
+def with_storage_names(employee, data) -> dict:
+    """
+    Replaces the urls of the serialized profile by the storage names of the files,
+    signed urls expire and absolute ones depend on the request.
+    """
+    data["image"] = employee.image.name or None
+    data["image_variants"] = {
+        variant: name
+        for variant, name in employee.image_variants.items()
+        if variant in IMAGE_VARIANTS
+    }
+    for relation in FILE_RELATIONS:
+        for row, obj in zip(data[relation], getattr(employee, relation).all()):
+            row["file"] = obj.file.name or None
+    return data
+
+
+def with_file_urls(data, request) -> dict:
+    """A copy of the cached profile with its files resolved to urls in one batch."""
+    files = [data["image"], *data["image_variants"].values()] + [
+        row["file"] for relation in FILE_RELATIONS for row in data[relation]
+    ]
+    urls = {
+        name: request.build_absolute_uri(url)
+        for name, url in get_urls(default_storage, filter(None, files)).items()
+    }
+    return {
+        **data,
+        "image": urls.get(data["image"]),
+        "image_variants": {
+            variant: urls[name] for variant, name in data["image_variants"].items()
+        },
+        **{
+            relation: [{**row, "file": urls.get(row["file"])} for row in data[relation]]
+            for relation in FILE_RELATIONS
+        },
+    }
+
+
+def load_profile(user):
+    """
+    Serializes the user's employee with its histories in a fixed number of queries,
+    returns {data, etag, updated_at} or None when the user has no employee. Files
+    are kept as storage names, with_file_urls resolves them when served.
+    """
+    employee = (
+        Employee.objects.filter(user=user)
+        .prefetch_related("organisation_nodes", *PROFILE_RELATIONS)
+        .first()
+    )
+    if employee is None:
+        return None
+    data = with_storage_names(
+        employee, EmployeeDetailSerializer(instance=employee).data
+    )
+    updated_at = max(
+        [employee.updated_at]
+        + [
+            obj.updated_at
+            for relation in PROFILE_RELATIONS
+            for obj in getattr(employee, relation).all()
+        ]
+    )
+    return {
+        "data": data,
+        "etag": get_etag(json.dumps(data, cls=DjangoJSONEncoder)),
+        "updated_at": updated_at,
+    }
+
+
+def get_profile(user):
+    """
+    The profile of the me endpoint, cached per user for PROFILE_CACHE_SECONDS until
+    the employee, one of its histories or its nodes change.
+    """
+    if not settings.PROFILE_CACHE_SECONDS:
+        return load_profile(user)
+    key = PROFILE_KEY.format(user_id=user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        profile = load_profile(user)
+        if profile is not None:
+            cache.set(key, profile, settings.PROFILE_CACHE_SECONDS)
+    return profile
+
+
+def invalidate_profiles(employee_ids):
+    """Drops the cached profiles of the employees once the transaction commits."""
+    user_ids = list(
+        Employee.objects.filter(pk__in=employee_ids, user__isnull=False).values_list(
+            "user_id", flat=True
+        )
+    )
+    if user_ids:
+        keys = [PROFILE_KEY.format(user_id=user_id) for user_id in user_ids]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_profile(user_id):
+    if user_id is not None:
+        key = PROFILE_KEY.format(user_id=user_id)
+        transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,106 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+# Employee.manager points at the manager's User, whose employee is the row with that
+# user_id. Both walks stay within the organisation and stop on cycles.
+REPORTS_SQL = """
+WITH RECURSIVE reports (id, user_id, depth, path) AS (
+    SELECT id, user_id, 1, ARRAY[%s::uuid, id]
+    FROM {table}
+    WHERE manager_id = %s::uuid AND organisation_id = %s::uuid
+  UNION ALL
+    SELECT e.id, e.user_id, r.depth + 1, r.path || e.id
+    FROM {table} e
+    JOIN reports r ON e.manager_id = r.user_id
+    WHERE e.organisation_id = %s::uuid AND e.id <> ALL(r.path) AND r.depth < %s
+)
+SELECT {columns} FROM reports
+"""
+
+CHAIN_SQL = """
+WITH RECURSIVE chain (id, manager_id, depth, path) AS (
+    SELECT id, manager_id, 0, ARRAY[id]
+    FROM {table}
+    WHERE id = %s::uuid
+  UNION ALL
+    SELECT m.id, m.manager_id, c.depth + 1, c.path || m.id
+    FROM {table} m
+    JOIN chain c ON m.user_id = c.manager_id
+    WHERE m.organisation_id = %s::uuid AND m.id <> ALL(c.path)
+)
+SELECT {columns} FROM chain WHERE depth > 0
+"""
+
+# no organisation is that deep, bounds the walk when no max_depth is given
+MAX_DEPTH = 100
+
+REPORTING_VERSION_KEY = "reporting-lines-version:{organisation_id}"
+REPORTING_KEY = (
+    "reporting-lines:{organisation_id}:{version}:{direction}:{employee}:{max_depth}"
+)
+
+
+def get_reports_sql(employee, max_depth=None, columns="id"):
+    """The recursive query of the direct and indirect reports of the employee."""
+    table = apps.get_model("employee", "Employee")._meta.db_table
+    organisation_id = str(employee.organisation_id)
+    params = [
+        str(employee.pk),
+        str(employee.user_id) if employee.user_id else None,
+        organisation_id,
+        organisation_id,
+        max_depth or MAX_DEPTH,
+    ]
+    return REPORTS_SQL.format(table=table, columns=columns), params
+
+
+def get_chain_sql(employee, columns="id"):
+    """The recursive query of the employee's managers, up to the top of the chain."""
+    table = apps.get_model("employee", "Employee")._meta.db_table
+    params = [str(employee.pk), str(employee.organisation_id)]
+    return CHAIN_SQL.format(table=table, columns=columns), params
+
+
+def get_reporting_lines(employee, direction, max_depth=None) -> dict:
+    """
+    Returns {employee id: depth} of the employee's reports ("reports") or chain of
+    command ("chain"), from one recursive query. Results are cached per organisation
+    for REPORTING_LINES_CACHE_SECONDS until an employee of the organisation changes.
+    """
+    if direction == "reports":
+        sql, params = get_reports_sql(employee, max_depth, columns="id, depth")
+    else:
+        sql, params = get_chain_sql(employee, columns="id, depth")
+
+    def read():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return {str(id): depth for id, depth in cursor.fetchall()}
+
+    if not settings.REPORTING_LINES_CACHE_SECONDS:
+        return read()
+    organisation_id = employee.organisation_id
+    version = cache.get(REPORTING_VERSION_KEY.format(organisation_id=organisation_id))
+    key = REPORTING_KEY.format(
+        organisation_id=organisation_id,
+        version=version or 0,
+        direction=direction,
+        employee=employee.pk,
+        max_depth=max_depth,
+    )
+    lines = cache.get(key)
+    if lines is None:
+        lines = read()
+        cache.set(key, lines, settings.REPORTING_LINES_CACHE_SECONDS)
+    return lines
+
+
+def invalidate_reporting_lines(organisation_id):
+    def invalidate():
+        key = REPORTING_VERSION_KEY.format(organisation_id=organisation_id)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,117 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connections
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest, Replace
+
+SEARCH_CONFIG = "simple"
+
+# indexed as an expression (see Employee.Meta.indexes), queries must use the same one
+SEARCH_VECTOR = (
+    SearchVector("firstname", "lastname", weight="A", config=SEARCH_CONFIG)
+    # "ray@prunedge.com" is a single email token and "EMP-003" a word and a negative
+    # number, split them so every part matches the words of a query
+    + SearchVector(
+        "middlename",
+        Replace(F("employee_id"), Value("-"), Value(" ")),
+        Replace(F("work_email"), Value("@"), Value(" ")),
+        weight="B",
+        config=SEARCH_CONFIG,
+    )
+    + SearchVector("job_title", weight="C", config=SEARCH_CONFIG)
+)
+
+# fuzzy matched with pg_trgm where the extension is installed
+TRIGRAM_FIELDS = ("firstname", "lastname", "work_email", "employee_id", "job_title")
+TRIGRAM_INDEX_SQL = "CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({columns})"
+TRIGRAM_INDEXES = (
+    ("employee.Employee", "employee_employee_trgm", TRIGRAM_FIELDS),
+    # AuthViewsets searches these with SearchFilter, pg_trgm indexes speed up ILIKE
+    ("user.User", "user_user_trgm", ("email", "firstname", "lastname", "phone")),
+)
+
+
+def has_trigram(using="default") -> bool:
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    if not hasattr(connection, "has_pg_trgm"):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            connection.has_pg_trgm = cursor.fetchone() is not None
+    return connection.has_pg_trgm
+
+
+def create_trigram_extension(using="default"):
+    """Installs pg_trgm if the server ships it, search falls back to full text only."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    connection.__dict__.pop("has_pg_trgm", None)
+
+
+def create_trigram_indexes(apps, using="default"):
+    if not has_trigram(using):
+        return
+    with connections[using].cursor() as cursor:
+        for label, name, fields in TRIGRAM_INDEXES:
+            model = apps.get_model(label)
+            columns = ", ".join(
+                f"{model._meta.get_field(field).column} gin_trgm_ops"
+                for field in fields
+            )
+            cursor.execute(
+                TRIGRAM_INDEX_SQL.format(
+                    name=name, table=model._meta.db_table, columns=columns
+                )
+            )
+
+
+def get_search_query(term):
+    """Matches every word of the term as a prefix, e.g. "ray in" finds Ray Inc."""
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_employees(queryset, term):
+    """
+    Filters the employees matching the term, best matches first. Full text matches
+    are ranked with ts_rank over the indexed vector, trigram similarity adds typo
+    tolerant matches and boosts close ones where pg_trgm is installed.
+    """
+    query = get_search_query(term)
+    if query is None:
+        return queryset
+    queryset = queryset.annotate(search_vector=SEARCH_VECTOR)
+    condition = Q(search_vector=query)
+    rank = SearchRank(F("search_vector"), query)
+    if has_trigram(queryset.db):
+        condition |= reduce(
+            or_, [Q(**{f"{field}__trigram_similar": term}) for field in TRIGRAM_FIELDS]
+        )
+        rank = rank + Greatest(
+            *[TrigramSimilarity(field, term) for field in TRIGRAM_FIELDS]
+        )
+    return (
+        queryset.filter(condition)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "firstname", "lastname")
+    )
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import (
     Employee,
@@ -15,14 +16,18 @@ from user.models import User
 from django.db import transaction
 from datetime import datetime
 from user.utils import create_token_and_send_user_email
-from organisation.models import OrganisationNode, JobGrade
+from organisation.config import get_levels
+from organisation.models import OrganisationNode
 from organisation.utils import get_all_children_nodes, is_org_level_sequential
 from organisation.serializers import (
+    JobGradeField,
     JobGradeListSerializer,
     EmployeeOrganisationNodeSerializer,
 )
 from leave.utils import assign_default_leave_policies_to_employees
 from user.enums import USER_ROLE
+from core.uploads import UploadedFileField, UploadedImageField
+from core.images import ImageVariantsField
 
 
 class EmployeeCreateSerializer(serializers.Serializer):
@@ -31,9 +36,7 @@ class EmployeeCreateSerializer(serializers.Serializer):
     work_email = serializers.EmailField(max_length=300, required=True)
     employee_id = serializers.CharField(max_length=300, required=True)
     job_title = serializers.CharField(max_length=300, required=True)
-    job_grade = serializers.PrimaryKeyRelatedField(
-        queryset=JobGrade.objects.all(), required=True
-    )
+    job_grade = JobGradeField(required=True)
     employment_category = serializers.ChoiceField(
         choices=EMPLOYEE_STATUS_OPTIONS, required=True
     )
@@ -53,7 +56,7 @@ class EmployeeCreateSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         organisation: Organisation = self.context["request"].user.organisation
-        org_levels: dict = organisation.levels
+        org_levels: dict = get_levels(organisation.pk)
         email: str = attrs.get("work_email")
         division = attrs.get("division")
         department = attrs.get("department")
@@ -146,6 +149,7 @@ class EmployeeJobSerializer(serializers.ModelSerializer):
 class EmployeeListSerializer(serializers.ModelSerializer):
     job_grade = JobGradeListSerializer()
     organisation_nodes = EmployeeOrganisationNodeSerializer(many=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Employee
@@ -153,6 +157,8 @@ class EmployeeListSerializer(serializers.ModelSerializer):
 
 
 class EmployeeUpdateSerializer(serializers.ModelSerializer):
+    image = UploadedImageField(kind="employee_image", required=False, allow_null=True)
+
     class Meta:
         model = Employee
         fields = "__all__"
@@ -172,6 +178,8 @@ class EmployeeEmploymentHistorySerializer(serializers.ModelSerializer):
 
 
 class EmployeeEducationHistorySerializer(serializers.ModelSerializer):
+    file = UploadedFileField(kind="employee_file")
+
     # percentage_completion = serializers.SerializerMethodField()
     # is_completed  = serializers.BooleanField(default=False)
 
@@ -189,6 +197,8 @@ class EmployeeEducationHistorySerializer(serializers.ModelSerializer):
 
 
 class EmployeeCertificateHistorySerializer(serializers.ModelSerializer):
+    file = UploadedFileField(kind="employee_file")
+
     class Meta:
         model = EmployeeCertificateHistory
         fields = "__all__"
@@ -198,6 +208,8 @@ class EmployeeCertificateHistorySerializer(serializers.ModelSerializer):
 
 
 class EmployeeProfessionalMembershipSerializer(serializers.ModelSerializer):
+    file = UploadedFileField(kind="employee_file")
+
     class Meta:
         model = EmployeeProfessionalMembership
         fields = "__all__"
@@ -211,6 +223,7 @@ class EmployeeDetailSerializer(serializers.ModelSerializer):
     education_histories = EmployeeEducationHistorySerializer(many=True)
     certificate_histories = EmployeeCertificateHistorySerializer(many=True)
     professional_memberships = EmployeeProfessionalMembershipSerializer(many=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Employee
@@ -279,3 +292,25 @@ class EmployeePensionTaxBankUpdateSerializer(serializers.Serializer):
         except EmployeeTax.DoesNotExist:
             EmployeeTax.objects.update_or_create(employee=employee, **tax_details)
         return validated_data
+
+
+class TypeaheadQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.TYPEAHEAD_MAX_RESULTS, default=10
+    )
+
+
+class ReportingLineSerializer(serializers.ModelSerializer):
+    depth = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Employee
+        fields = ["id", "firstname", "lastname", "job_title", "manager", "depth"]
+
+    def get_depth(self, obj):
+        return self.context["depths"][str(obj.id)]
+
+
+class ReportsQuerySerializer(serializers.Serializer):
+    max_depth = serializers.IntegerField(min_value=1, required=False)
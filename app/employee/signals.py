@@ -0,0 +1,44 @@
+from .search import create_trigram_extension, create_trigram_indexes
+from .profile import invalidate_profile, invalidate_profiles
+from .reporting import invalidate_reporting_lines
+from .typeahead import update_typeahead_entry
+
+
+def create_search_extension(sender, using, **kwargs):
+    create_trigram_extension(using)
+
+
+def create_search_indexes(sender, apps, using, **kwargs):
+    # not part of Meta.indexes, they depend on pg_trgm being available
+    create_trigram_indexes(apps, using)
+
+
+def refresh_typeahead_entry(sender, instance, **kwargs):
+    update_typeahead_entry(instance)
+
+
+def remove_typeahead_entry(sender, instance, **kwargs):
+    update_typeahead_entry(instance, deleted=True)
+
+
+def refresh_reporting_lines(sender, instance, **kwargs):
+    invalidate_reporting_lines(instance.organisation_id)
+
+
+def refresh_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
+
+
+def refresh_history_profile(sender, instance, **kwargs):
+    invalidate_profiles([instance.employee_id])
+
+
+def refresh_node_profiles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_profile(instance.user_id)
+    elif action == "pre_clear":
+        invalidate_profiles(instance.org_nodes.values_list("id", flat=True))
+    else:
+        invalidate_profiles(pk_set)
@@ -1,3 +1,416 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from organisation.models import Organisation, OrganisationNode
+from .models import (
+    Employee,
+    EmployeeEducationHistory,
+    EmployeeEmploymentHistory,
+    EmployeeProfessionalMembership,
+)
+from .profile import PROFILE_KEY
+
+
+class EmployeeProfileConditionalTests(APITestCase):
+    def setUp(self):
+        org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        user = get_user_model().objects.create_user(
+            organisation=org,
+            email="ridwan.yusuf@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["EMPLOYEE"],
+        )
+        self.employee = Employee.objects.create(
+            user=user,
+            organisation=org,
+            firstname="Ray",
+            lastname="Inc",
+            work_email="ray@prunedge.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+        url = reverse("user:login")
+        data = {"email": "ridwan.yusuf@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_me_not_modified_until_profile_changes(self):
+        url = reverse("employee:employee-me")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            # the user, the validators come with the cached profile
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EmployeeEmploymentHistory.objects.create(
+                employee=self.employee, job_title="Intern", company_name="Prunedge"
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["employment_histories"]), 1)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_me_profile_is_loaded_in_a_fixed_number_of_queries(self):
+        url = reverse("employee:employee-me")
+        with self.captureOnCommitCallbacks(execute=True):
+            for job_title in ["Intern", "Analyst", "Engineer"]:
+                EmployeeEmploymentHistory.objects.create(
+                    employee=self.employee, job_title=job_title, company_name="Prun"
+                )
+            EmployeeProfessionalMembership.objects.create(
+                employee=self.employee, membership_name="NSE"
+            )
+        with self.assertNumQueries(7):
+            # the user, then the employee, its nodes and each kind of history
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["employment_histories"]), 3)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["professional_memberships"]), 1)
+
+        node = OrganisationNode.objects.create(
+            organisation=self.employee.organisation, name="Backend"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.organisation_nodes.add(node)
+        response = self.client.get(url)
+        self.assertEqual(response.json()["organisation_nodes"], [str(node.id)])
+
+    @override_settings(
+        DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage"
+    )
+    def test_me_profile_caches_file_names(self):
+        self.employee.image = "images/ray.png"
+        self.employee.image_variants = {"thumb": "images/ray-thumb.webp"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.save()
+            EmployeeEducationHistory.objects.create(
+                employee=self.employee,
+                institution_name="Unilag",
+                course_of_study="Physics",
+                file="employees/degree.pdf",
+            )
+        url = reverse("employee:employee-me")
+        body = self.client.get(url).json()
+        self.assertEqual(body["image"], "http://testserver/images/ray.png")
+        self.assertEqual(
+            body["image_variants"],
+            {"thumb": "http://testserver/images/ray-thumb.webp"},
+        )
+        self.assertEqual(
+            body["education_histories"][0]["file"],
+            "http://testserver/employees/degree.pdf",
+        )
+        # the urls are built for the host of each request
+        body = self.client.get(url, HTTP_HOST="localhost").json()
+        self.assertEqual(body["image"], "http://localhost/images/ray.png")
+        profile = cache.get(PROFILE_KEY.format(user_id=self.employee.user_id))
+        self.assertEqual(profile["data"]["image"], "images/ray.png")
+
+    def test_list_modified_when_nested_rows_change(self):
+        url = reverse("employee:employee-list")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        node = OrganisationNode.objects.create(
+            organisation=self.employee.organisation, name="Backend"
+        )
+        self.employee.organisation_nodes.add(node)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        node.name = "Platform"
+        node.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [employee] = response.json()["results"]
+        self.assertEqual(employee["organisation_nodes"][0]["name"], "Platform")
+
+
+class EmployeeSearchTests(APITestCase):
+    def setUp(self):
+        orgs = [
+            Organisation.objects.create(
+                name=name,
+                sector="PRIVATE",
+                type="MULTIPLE",
+                size=10,
+                package="CORE HR",
+                subdomain=f"{name.lower()}.hrms.com",
+                status="ACTIVE",
+            )
+            for name in ("Prun", "Other")
+        ]
+        get_user_model().objects.create_user(
+            organisation=orgs[0],
+            email="hradmin@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+        employees = [
+            (orgs[0], "Raymond", "Okafor", "Backend Engineer", "EMP-001"),
+            (orgs[0], "Ada", "Raymonds", "Accountant", "EMP-002"),
+            (orgs[0], "Bola", "Inc", "Designer", "EMP-003"),
+            (orgs[1], "Raymond", "Other", "Backend Engineer", "EMP-004"),
+        ]
+        for org, firstname, lastname, job_title, employee_id in employees:
+            Employee.objects.create(
+                organisation=org,
+                firstname=firstname,
+                lastname=lastname,
+                work_email=f"{firstname.lower()}@{org.name.lower()}.com",
+                job_title=job_title,
+                employee_id=employee_id,
+                employment_status="FULL TIME",
+            )
+        url = reverse("user:login")
+        data = {"email": "hradmin@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        self.url = reverse("employee:employee-list")
+
+    def search(self, term):
+        response = self.client.get(self.url, {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (employee["firstname"], employee["lastname"])
+            for employee in response.json()["results"]
+        ]
+
+    def test_search_ranks_name_matches_within_organisation(self):
+        # first name matches outrank last name ones, the other organisation is excluded
+        self.assertEqual(
+            self.search("raymond"), [("Raymond", "Okafor"), ("Ada", "Raymonds")]
+        )
+
+    def test_search_matches_prefixes_of_every_word(self):
+        self.assertEqual(self.search("ray oka"), [("Raymond", "Okafor")])
+        self.assertEqual(self.search("backend"), [("Raymond", "Okafor")])
+        self.assertEqual(self.search("emp-003"), [("Bola", "Inc")])
+        self.assertEqual(self.search("bola@prun"), [("Bola", "Inc")])
+
+
+class EmployeeTypeaheadTests(APITestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        get_user_model().objects.create_user(
+            organisation=self.org,
+            email="hradmin@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+        self.employees = [
+            Employee.objects.create(
+                organisation=self.org,
+                firstname=firstname,
+                lastname=lastname,
+                work_email=f"{firstname.lower()}@prunedge.com",
+                job_title="Engineer",
+                employment_status="FULL TIME",
+            )
+            for firstname, lastname in [
+                ("Raymond", "Okafor"),
+                ("Ada", "Raymonds"),
+                ("Chloé", "Obi"),
+            ]
+        ]
+        url = reverse("user:login")
+        data = {"email": "hradmin@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        self.url = reverse("employee:employee-autocomplete")
+
+    def names(self, q, **params):
+        response = self.client.get(self.url, {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [entry["name"] for entry in response.json()["data"]]
+
+    def test_autocomplete_matches_name_prefixes(self):
+        # whole words come before longer ones starting with the query
+        self.assertEqual(self.names("ray"), ["Raymond Okafor", "Ada Raymonds"])
+        self.assertEqual(self.names("raymond o"), ["Raymond Okafor"])
+        self.assertEqual(self.names("chloe"), ["Chloé Obi"])
+        self.assertEqual(self.names("ray", limit=1), ["Raymond Okafor"])
+        response = self.client.get(self.url, {"q": "oka"})
+        self.assertEqual(
+            response.json()["data"],
+            [
+                {
+                    "id": str(self.employees[0].id),
+                    "user": None,
+                    "name": "Raymond Okafor",
+                    "job_title": "Engineer",
+                    "avatar_thumb": None,
+                }
+            ],
+        )
+
+    def test_autocomplete_follows_employee_changes(self):
+        self.assertEqual(self.names("oka"), ["Raymond Okafor"])
+        employee = self.employees[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.lastname = "Bello"
+            employee.save()
+        self.assertEqual(self.names("oka"), [])
+        self.assertEqual(self.names("bel"), ["Raymond Bello"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        self.assertEqual(self.names("ray"), ["Ada Raymonds"])
+
+
+
+class EmployeeReportingLineTests(APITestCase):
+    def setUp(self):
+        org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        get_user_model().objects.create_user(
+            organisation=org,
+            email="hradmin@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+        # ceo <- cto <- lead <- engineer, and a designer under the ceo
+        self.employees = {}
+        manager = None
+        for name in ["ceo", "cto", "lead", "engineer", "designer"]:
+            if name == "designer":
+                manager = self.employees["ceo"].user
+            user = get_user_model().objects.create_user(
+                organisation=org,
+                email=f"{name}@prunedge.com",
+                password="passer",
+                verified=True,
+                roles=["EMPLOYEE"],
+            )
+            self.employees[name] = Employee.objects.create(
+                user=user,
+                manager=manager,
+                organisation=org,
+                firstname=name.title(),
+                lastname="Inc",
+                work_email=f"{name}@prunedge.com",
+                job_title=name,
+                employment_status="FULL TIME",
+            )
+            manager = user
+        url = reverse("user:login")
+        data = {"email": "hradmin@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def get_lines(self, action, name, **params):
+        url = reverse(f"employee:employee-{action}", args=[self.employees[name].id])
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        rows = body["data"] if "data" in body else body["results"]
+        return [(row["job_title"], row["depth"]) for row in rows]
+
+    def test_direct_reports(self):
+        self.assertEqual(
+            self.get_lines("direct-reports", "ceo"), [("cto", 1), ("designer", 1)]
+        )
+        self.assertEqual(self.get_lines("direct-reports", "engineer"), [])
+
+    def test_reports_include_indirect_reports_closest_first(self):
+        lines = self.get_lines("reports", "ceo")
+        self.assertEqual(
+            sorted(lines),
+            [("cto", 1), ("designer", 1), ("engineer", 3), ("lead", 2)],
+        )
+        self.assertEqual([depth for _, depth in lines], [1, 1, 2, 3])
+        self.assertEqual(
+            self.get_lines("reports", "ceo", max_depth=2),
+            sorted(lines)[:2] + [("lead", 2)],
+        )
+
+    def test_chain_of_command(self):
+        self.assertEqual(
+            self.get_lines("chain-of-command", "engineer"),
+            [("lead", 1), ("cto", 2), ("ceo", 3)],
+        )
+        self.assertEqual(self.get_lines("chain-of-command", "ceo"), [])
+
+    def test_cached_chain_skips_deleted_employees(self):
+        self.get_lines("chain-of-command", "engineer")
+        # deleted before the cached line is dropped on commit
+        self.employees["cto"].delete()
+        self.assertEqual(
+            self.get_lines("chain-of-command", "engineer"), [("lead", 1), ("ceo", 3)]
+        )
+
+    def test_cached_lines_follow_manager_changes(self):
+        self.assertEqual(
+            self.get_lines("chain-of-command", "engineer"),
+            [("lead", 1), ("cto", 2), ("ceo", 3)],
+        )
+        engineer = self.employees["engineer"]
+        engineer.manager = self.employees["designer"].user
+        with self.captureOnCommitCallbacks(execute=True):
+            engineer.save()
+        self.assertEqual(
+            self.get_lines("chain-of-command", "engineer"),
+            [("designer", 1), ("ceo", 2)],
+        )
+
+    def test_manager_cycle_terminates(self):
+        ceo = self.employees["ceo"]
+        ceo.manager = self.employees["engineer"].user
+        with self.captureOnCommitCallbacks(execute=True):
+            ceo.save()
+        # the walk stops at the ceo instead of listing them as their own report
+        self.assertEqual(len(self.get_lines("reports", "ceo")), 4)
+
+    def test_list_filtered_under_manager(self):
+        url = reverse("employee:employee-list")
+        response = self.client.get(url, {"under_manager": self.employees["cto"].id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(row["job_title"] for row in response.json()["results"]),
+            ["engineer", "lead"],
+        )
+        response = self.client.get(url, {"under_manager": "not-a-uuid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,150 @@
+import json
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from core.storage_backends import get_urls
+from .models import Employee
+
+# sorted set of "<term>\0<employee id>" members, all scored 0 so they are ordered
+# lexicographically and prefixes are looked up with ZRANGEBYLEX
+TYPEAHEAD_INDEX_KEY = "typeahead:{organisation_id}:index"
+# employee id -> compact entry returned by the endpoint
+TYPEAHEAD_ENTRIES_KEY = "typeahead:{organisation_id}:entries"
+
+ENTRY_FIELDS = ("id", "user_id", "firstname", "lastname", "job_title", "image_variants")
+
+
+def get_keys(organisation_id):
+    return (
+        cache.make_key(TYPEAHEAD_INDEX_KEY.format(organisation_id=organisation_id)),
+        cache.make_key(TYPEAHEAD_ENTRIES_KEY.format(organisation_id=organisation_id)),
+    )
+
+
+def normalize(text) -> str:
+    """Lower cases and strips accents and extra spaces, "Chloé  Obi" -> "chloe obi"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+def to_entry(id, user_id, firstname, lastname, job_title, image_variants) -> dict:
+    return {
+        "id": str(id),
+        "user": str(user_id) if user_id else None,
+        "name": f"{firstname} {lastname}",
+        "job_title": job_title,
+        "avatar_thumb": image_variants.get("thumb"),
+    }
+
+
+def get_terms(entry) -> set:
+    """The full name and each of its words, so "oka" and "ray oka" find Ray Okafor."""
+    name = normalize(entry["name"])
+    terms = set(name.split())
+    terms.add(name)
+    return terms
+
+
+def get_members(entry) -> list:
+    return [f"{term}\0{entry['id']}".encode() for term in get_terms(entry)]
+
+
+def build_typeahead_index(organisation_id, redis=None):
+    """Rebuilds the organisation's index from one query and swaps it in atomically."""
+    redis = redis or get_redis_connection("default")
+    index_key, entries_key = get_keys(organisation_id)
+    rows = Employee.objects.filter(
+        organisation=organisation_id, is_active=True
+    ).values_list(*ENTRY_FIELDS)
+    entries = [to_entry(*row) for row in rows]
+
+    pipeline = redis.pipeline()
+    pipeline.delete(f"{index_key}:build", f"{entries_key}:build")
+    for entry in entries:
+        pipeline.zadd(f"{index_key}:build", dict.fromkeys(get_members(entry), 0))
+        pipeline.hset(f"{entries_key}:build", entry["id"], json.dumps(entry))
+    if entries:
+        pipeline.rename(f"{index_key}:build", index_key)
+        pipeline.rename(f"{entries_key}:build", entries_key)
+    else:
+        # an empty index still marks the organisation as indexed
+        pipeline.delete(index_key, entries_key)
+        pipeline.zadd(index_key, {b"": 0})
+    pipeline.expire(index_key, settings.TYPEAHEAD_INDEX_SECONDS)
+    pipeline.expire(entries_key, settings.TYPEAHEAD_INDEX_SECONDS)
+    pipeline.execute()
+
+
+def update_typeahead_entry(employee, deleted=False):
+    """Replaces (or removes) the employee's members once the transaction commits."""
+    # read now, Django clears the pk of deleted instances
+    id = str(employee.pk)
+    index_key, entries_key = get_keys(employee.organisation_id)
+    entry = None
+    if employee.is_active and not deleted:
+        entry = to_entry(*[getattr(employee, field) for field in ENTRY_FIELDS])
+
+    def update():
+        redis = get_redis_connection("default")
+        if not redis.exists(index_key):
+            # built with the employee on the next lookup
+            return
+        pipeline = redis.pipeline()
+        previous = redis.hget(entries_key, id)
+        if previous:
+            pipeline.zrem(index_key, *get_members(json.loads(previous)))
+            pipeline.hdel(entries_key, id)
+        if entry:
+            pipeline.zadd(index_key, dict.fromkeys(get_members(entry), 0))
+            pipeline.hset(entries_key, id, json.dumps(entry))
+        pipeline.execute()
+
+    transaction.on_commit(update)
+
+
+def search_typeahead(organisation_id, query, limit) -> list:
+    """Returns the entries of up to limit employees with a name starting with query."""
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    redis = get_redis_connection("default")
+    index_key, entries_key = get_keys(organisation_id)
+    if not redis.exists(index_key):
+        build_typeahead_index(organisation_id, redis)
+
+    ids = []
+    offset = 0
+    # an employee matches once per term, read a few pages to fill the limit
+    while len(ids) < limit:
+        members = redis.zrangebylex(
+            index_key,
+            b"[" + prefix.encode(),
+            b"[" + prefix.encode() + b"\xff",
+            start=offset,
+            num=limit * 2,
+        )
+        for member in members:
+            id = member.rsplit(b"\0", 1)[1].decode()
+            if id not in ids:
+                ids.append(id)
+        if len(members) < limit * 2:
+            break
+        offset += len(members)
+    ids = ids[:limit]
+    if not ids:
+        return []
+
+    entries = [json.loads(entry) for entry in redis.hmget(entries_key, ids) if entry]
+    thumbs = get_urls(
+        default_storage,
+        [entry["avatar_thumb"] for entry in entries if entry["avatar_thumb"]],
+    )
+    for entry in entries:
+        entry["avatar_thumb"] = thumbs.get(entry["avatar_thumb"])
+    return entries
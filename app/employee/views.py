@@ -11,6 +11,9 @@ from .serializers import (
     EmployeeCertificateHistorySerializer,
     EmployeeProfessionalMembershipSerializer,
     EmployeePensionTaxBankUpdateSerializer,
+    TypeaheadQuerySerializer,
+    ReportingLineSerializer,
+    ReportsQuerySerializer,
 )
 from .models import (
     Employee,
@@ -22,8 +25,24 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from user.permissions import IsSuperAdmin, IsHRAdmin, IsEmployee
 from rest_framework.decorators import action
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
+from core.mixins import ConditionalGetMixin
+from drf_spectacular.utils import extend_schema
+from .filters import (
+    EmployeeSearchFilter,
+    ReportingLineFilter,
+    REPORTS_PARAMETERS,
+    TYPEAHEAD_PARAMETERS,
+)
+from .profile import get_profile, with_file_urls
+from .reporting import get_reporting_lines
+from .typeahead import search_typeahead
+
+
+def get_employees_by_id(ids) -> dict:
+    return {str(id): employee for id, employee in Employee.objects.in_bulk(ids).items()}
 
 
 class CanEmployeeUpdateProfileMixin:
@@ -44,19 +63,38 @@ class CanEmployeeUpdateProfileMixin:
             raise PermissionDenied
 
 
-class EmployeeViewSets(CanEmployeeUpdateProfileMixin, viewsets.ModelViewSet):
+class EmployeeViewSets(
+    ConditionalGetMixin, CanEmployeeUpdateProfileMixin, viewsets.ModelViewSet
+):
     queryset = Employee.objects.all()
     serializer_class = EmployeeListSerializer
     http_method_names = ["get", "post", "patch", "delete", "put"]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        EmployeeSearchFilter,
+        ReportingLineFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["invitation_status", "employment_status", "employee_status"]
-    # search_fields = ["name", "subdomain"]
+    reporting_line_field = "id"
     # ordering_fields = ["created_at", "name", "status"]
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsHRAdmin | IsEmployee]
+    conditional_actions = ("list", "retrieve", "me")
+    conditional_relations = ("job_grade", "organisation_nodes")
+
+    def get_validators(self):
+        if self.action != "me":
+            return super().get_validators()
+        profile = self.get_profile()
+        if profile is None:
+            return None, None
+        return profile["etag"], profile["updated_at"]
+
+    def get_profile(self):
+        """The cached me profile, read once per request."""
+        if not hasattr(self, "profile"):
+            self.profile = get_profile(self.request.user)
+        return self.profile
 
     def get_serializer_class(self):
         if self.action == "update":
@@ -75,12 +113,95 @@ class EmployeeViewSets(CanEmployeeUpdateProfileMixin, viewsets.ModelViewSet):
         permission_classes=[IsHRAdmin | IsEmployee],
     )
     def me(self, request, *args, **kwargs):
-        employee = get_object_or_404(Employee, user=request.user)
+        profile = self.get_profile()
+        if profile is None:
+            raise Http404
+        return Response(data=with_file_urls(profile["data"], request))
 
-        data = EmployeeDetailSerializer(
-            instance=employee, context={"request": request}
-        ).data
-        return Response(data=data)
+    def get_organisation_employee(self):
+        return get_object_or_404(
+            Employee, pk=self.kwargs["pk"], organisation=self.request.user.organisation
+        )
+
+    def get_reporting_line_response(self, ids, depths):
+        """Serializes the employees in the order of ids, a page at a time."""
+        page = self.paginate_queryset(ids)
+        employees = get_employees_by_id(page)
+        serializer = ReportingLineSerializer(
+            [employees[id] for id in page if id in employees],
+            many=True,
+            context={"depths": depths},
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsHRAdmin | IsEmployee],
+        url_path="direct-reports",
+    )
+    def direct_reports(self, request, *args, **kwargs):
+        employee = self.get_organisation_employee()
+        ids = [
+            str(id)
+            for id in Employee.objects.direct_reports(employee)
+            .order_by("firstname", "lastname")
+            .values_list("id", flat=True)
+        ]
+        return self.get_reporting_line_response(ids, dict.fromkeys(ids, 1))
+
+    @extend_schema(parameters=REPORTS_PARAMETERS)
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsHRAdmin | IsEmployee],
+    )
+    def reports(self, request, *args, **kwargs):
+        """Direct and indirect reports of the employee, closest first, with depth."""
+        serializer = ReportsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        depths = get_reporting_lines(
+            self.get_organisation_employee(),
+            "reports",
+            serializer.validated_data.get("max_depth"),
+        )
+        return self.get_reporting_line_response(sorted(depths, key=depths.get), depths)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsHRAdmin | IsEmployee],
+        url_path="chain-of-command",
+    )
+    def chain_of_command(self, request, *args, **kwargs):
+        """The employee's manager, their manager and so on, up to the top."""
+        depths = get_reporting_lines(self.get_organisation_employee(), "chain")
+        employees = get_employees_by_id(depths)
+        serializer = ReportingLineSerializer(
+            [employees[id] for id in sorted(depths, key=depths.get) if id in employees],
+            many=True,
+            context={"depths": depths},
+        )
+        return Response(
+            {"success": True, "data": serializer.data}, status=status.HTTP_200_OK
+        )
+
+    @extend_schema(parameters=TYPEAHEAD_PARAMETERS)
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsHRAdmin | IsEmployee],
+    )
+    def autocomplete(self, request, *args, **kwargs):
+        """Compact entries of the employees whose name starts with q, for pickers."""
+        serializer = TypeaheadQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = search_typeahead(
+            request.user.organisation_id,
+            serializer.validated_data["q"],
+            serializer.validated_data["limit"],
+        )
+        return Response({"success": True, "data": data}, status=status.HTTP_200_OK)
 
     @action(
         detail=True,
@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class LeaveConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "leave"
+
+    def ready(self):
+        from core.images import image_variants_generated
+        from employee.models import Employee
+        from organisation.models import OrganisationNode
+        from .models import LeaveTaken
+        from .signals import (
+            invalidate_employee_snapshots,
+            invalidate_leave_snapshots,
+            invalidate_membership_calendars,
+            invalidate_organisation_calendars,
+        )
+
+        post_save.connect(invalidate_leave_snapshots, sender=LeaveTaken)
+        post_delete.connect(invalidate_leave_snapshots, sender=LeaveTaken)
+        post_save.connect(invalidate_employee_snapshots, sender=Employee)
+        image_variants_generated.connect(invalidate_employee_snapshots, sender=Employee)
+        for model in (Employee, OrganisationNode):
+            post_save.connect(invalidate_organisation_calendars, sender=model)
+            post_delete.connect(invalidate_organisation_calendars, sender=model)
+        m2m_changed.connect(
+            invalidate_membership_calendars, sender=Employee.organisation_nodes.through
+        )
@@ -16,3 +16,29 @@
 #     class Meta:
 #         model = LeaveRequest
 #         fields = ('type', 'status')
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+WHOS_OUT_PARAMETERS = [
+    OpenApiParameter(
+        "date",
+        OpenApiTypes.DATE,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Day to list the employees on leave for, today by default",
+    ),
+]
+
+LEAVE_CALENDAR_PARAMETERS = [
+    OpenApiParameter(
+        "node",
+        OpenApiTypes.UUID,
+        OpenApiParameter.QUERY,
+        required=False,
+        description="Node whose subtree is listed, the whole organisation by default",
+    ),
+    OpenApiParameter("start_date", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+    OpenApiParameter("end_date", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+]
@@ -141,3 +141,7 @@ class LeaveTaken(models.Model):
     note = models.CharField(max_length=1000, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # range lookups of the who's out snapshots and the team calendar
+        indexes = [models.Index(fields=["end_date", "start_date"])]
@@ -13,6 +13,8 @@ from django.db.models import Q
 from .utils import approve_timeoff_request
 from employee.serializers import EmployeeListSerializer
 from django.utils import timezone
+from django.conf import settings
+from organisation.models import OrganisationNode
 
 
 def get_total_days_in_current_year():
@@ -35,6 +37,8 @@ def get_total_days_taken(leave):
 
 
 def validate_days_requested(timeoff, num_days_requested):
+    if timeoff.max_days_allowed is None:
+        return True
     total_days_taken = get_total_days_taken(timeoff)
     return total_days_taken + num_days_requested <= timeoff.max_days_allowed
 
@@ -197,8 +201,16 @@ class LeaveTakenCreateSerializer(serializers.Serializer):
 
     @transaction.atomic
     def save(self):
-        leave_request: LeaveRequest = self.validated_data["leave_request"]
+        # locked in the order of bulk approvals, the request then its leave, so the
+        # status and balance checks can't race another approval
+        leave_request: LeaveRequest = LeaveRequest.objects.select_for_update().get(
+            pk=self.validated_data["leave_request"].pk
+        )
         self.validate_leave_request_status(leave_request)
+        if leave_request.leave_id is not None:
+            leave_request.leave = Leave.objects.select_for_update().get(
+                pk=leave_request.leave_id
+            )
 
         data = {
             "leave": leave_request.leave,
@@ -230,6 +242,16 @@ class LeaveTakenCreateSerializer(serializers.Serializer):
         return timeoff_taken
 
 
+class BulkLeaveRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=500
+    )
+
+    def validate_ids(self, ids):
+        # keeps the order of the results
+        return list(dict.fromkeys(ids))
+
+
 class EmployeeLeaveListSerializer(serializers.ModelSerializer):
     title = serializers.CharField(source="leave_policy.title")
     is_paid = serializers.BooleanField(source="leave_policy.paid")
@@ -315,3 +337,36 @@ class LeaveTakenWidgetSerializer(LeaveTakenListSerializer):
     class Meta:
         model = Leave
         fields = ["id", "title", "employee"]
+
+
+class WhosOutQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+
+class LeaveCalendarQuerySerializer(serializers.Serializer):
+    node = serializers.UUIDField(required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate_node(self, node):
+        organisation = self.context["request"].user.organisation
+        if not OrganisationNode.objects.filter(
+            id=node, organisation=organisation
+        ).exists():
+            raise serializers.ValidationError("Organisation node not found.")
+        return node
+
+    def validate(self, attrs):
+        days = (attrs["end_date"] - attrs["start_date"]).days
+        if days < 0:
+            raise serializers.ValidationError(
+                {"end_date": "End date cannot be before start date."}
+            )
+        if days >= settings.LEAVE_CALENDAR_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "end_date": "The calendar cannot span more than "
+                    f"{settings.LEAVE_CALENDAR_MAX_DAYS} days."
+                }
+            )
+        return attrs
@@ -0,0 +1,32 @@
+from employee.models import Employee
+from .team_calendar import invalidate_calendar
+from .whos_out import invalidate_employee_whos_out, invalidate_whos_out
+
+
+def invalidate_leave_snapshots(sender, instance, **kwargs):
+    """Drops the cached who's out days and calendars a saved or deleted leave covers."""
+    organisation_id = (
+        Employee.objects.filter(leaves=instance.leave_id)
+        .values_list("organisation_id", flat=True)
+        .first()
+    )
+    if organisation_id:
+        invalidate_whos_out(organisation_id, instance.start_date, instance.end_date)
+        invalidate_calendar(organisation_id)
+
+
+def invalidate_employee_snapshots(sender, instance, **kwargs):
+    """Drops the cached who's out days showing a saved employee or its new images."""
+    invalidate_employee_whos_out(instance)
+
+
+def invalidate_organisation_calendars(sender, instance, **kwargs):
+    """Drops the cached calendars showing a saved or deleted employee or node."""
+    if instance.organisation_id:
+        invalidate_calendar(instance.organisation_id)
+
+
+def invalidate_membership_calendars(sender, instance, action, **kwargs):
+    """Drops the cached calendars whose node subtrees gained or lost employees."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_organisation_calendars(sender, instance)
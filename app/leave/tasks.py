@@ -0,0 +1,33 @@
+from datetime import date
+
+from core.celery import APP
+from core.db import route_reads_to_replicas
+from organisation.models import Organisation
+from .whos_out import get_snapshot_days, refresh_whos_out
+
+
+@APP.task(ignore_result=True)
+def refresh_whos_out_snapshots(
+    organisation_id=None, start_date=None, end_date=None, from_replica=False
+):
+    """
+    Recomputes an organisation's who's out snapshots between the given days (all the
+    precomputed ones by default). Without an organisation, as run at midnight, it is
+    queued for every active organisation on the reports queue, reading from the
+    replicas. Refreshes after a leave change read the primary to see the change.
+    """
+    if organisation_id is None:
+        organisation_ids = Organisation.objects.filter(status="ACTIVE").values_list(
+            "id", flat=True
+        )
+        for organisation_id in organisation_ids:
+            refresh_whos_out_snapshots.apply_async(
+                (str(organisation_id),), {"from_replica": True}, queue="reports"
+            )
+        return
+    days = get_snapshot_days(
+        date.fromisoformat(start_date) if start_date else None,
+        date.fromisoformat(end_date) if end_date else None,
+    )
+    with route_reads_to_replicas(use_primary=not from_replica):
+        refresh_whos_out(organisation_id, days)
@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from employee.models import Employee
+from organisation.models import OrganisationNode
+from .models import LeaveTaken
+
+CALENDAR_VERSION_KEY = "leave-calendar-version:{organisation_id}"
+CALENDAR_KEY = (
+    "leave-calendar:{organisation_id}:{version}:{node}:{start_date}:{end_date}"
+)
+
+ROW_FIELDS = (
+    "start_date",
+    "end_date",
+    "leave__employee__id",
+    "leave__employee__firstname",
+    "leave__employee__lastname",
+    "leave__employee__job_title",
+    "leave__leave_policy__id",
+    "leave__leave_policy__title",
+    "leave__leave_policy__color_tag",
+)
+
+
+def get_subtree(organisation_id, node_id) -> list:
+    """Returns the ids of the node and of every node below it."""
+    children = defaultdict(list)
+    nodes = OrganisationNode.objects.filter(organisation=organisation_id).values_list(
+        "id", "parent_id"
+    )
+    for id, parent_id in nodes:
+        children[parent_id].append(id)
+    subtree = [node_id]
+    for id in subtree:
+        subtree.extend(children[id])
+    return subtree
+
+
+def build_calendar(organisation_id, start_date, end_date, node_id=None) -> dict:
+    """
+    Returns the leaves of the organisation's (or the node subtree's) employees
+    overlapping the window as columns: employees and policies are listed once and
+    each interval points at them by index.
+    """
+    leaves_taken = LeaveTaken.objects.filter(
+        leave__employee__organisation=organisation_id,
+        leave__employee__is_active=True,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    )
+    if node_id is not None:
+        members = Employee.objects.filter(
+            organisation_nodes__in=get_subtree(organisation_id, node_id)
+        )
+        leaves_taken = leaves_taken.filter(leave__employee__in=members)
+    rows = leaves_taken.order_by(
+        "leave__employee__firstname", "leave__employee__lastname", "start_date"
+    ).values_list(*ROW_FIELDS)
+
+    employees = {"id": [], "firstname": [], "lastname": [], "job_title": []}
+    policies = {"id": [], "title": [], "color_tag": []}
+    intervals = {"employee": [], "policy": [], "start_date": [], "end_date": []}
+    employee_index = {}
+    policy_index = {}
+    for (
+        start,
+        end,
+        employee_id,
+        firstname,
+        lastname,
+        job_title,
+        policy_id,
+        title,
+        color_tag,
+    ) in rows:
+        if employee_id not in employee_index:
+            employee_index[employee_id] = len(employee_index)
+            employees["id"].append(str(employee_id))
+            employees["firstname"].append(firstname)
+            employees["lastname"].append(lastname)
+            employees["job_title"].append(job_title)
+        if policy_id not in policy_index:
+            policy_index[policy_id] = len(policy_index)
+            policies["id"].append(str(policy_id))
+            policies["title"].append(title)
+            policies["color_tag"].append(color_tag)
+        intervals["employee"].append(employee_index[employee_id])
+        intervals["policy"].append(policy_index[policy_id])
+        intervals["start_date"].append(start.isoformat())
+        intervals["end_date"].append(end.isoformat())
+    return {
+        "node": str(node_id) if node_id is not None else None,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "employees": employees,
+        "policies": policies,
+        "intervals": intervals,
+    }
+
+
+def get_calendar(organisation_id, start_date, end_date, node_id=None) -> dict:
+    """
+    Reads the calendar of the window from the cache. Keys embed the organisation's
+    calendar version so every cached window is dropped at once when it is bumped.
+    """
+    version = cache.get(CALENDAR_VERSION_KEY.format(organisation_id=organisation_id))
+    key = CALENDAR_KEY.format(
+        organisation_id=organisation_id,
+        version=version or 0,
+        node=node_id,
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat(),
+    )
+    calendar = cache.get(key)
+    if calendar is None:
+        calendar = build_calendar(organisation_id, start_date, end_date, node_id)
+        cache.set(key, calendar, settings.LEAVE_CALENDAR_CACHE_SECONDS)
+    return calendar
+
+
+def invalidate_calendar(organisation_id):
+    def invalidate():
+        key = CALENDAR_VERSION_KEY.format(organisation_id=organisation_id)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    transaction.on_commit(invalidate)
@@ -1,3 +1,414 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from employee.models import Employee
+from organisation.models import Organisation, OrganisationNode
+from .models import Leave, LeavePolicy, LeaveRequest, LeaveTaken
+from .tasks import refresh_whos_out_snapshots
+from .utils import get_current_year
+from .whos_out import get_key
 
-# Create your tests here.
+
+class LeaveRequestBulkApprovalTests(APITestCase):
+    def setUp(self):
+        org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        user = get_user_model().objects.create_user(
+            organisation=org,
+            email="ridwan.yusuf@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN", "EMPLOYEE"],
+        )
+        employee = Employee.objects.create(
+            user=user,
+            organisation=org,
+            firstname="Ray",
+            lastname="Inc",
+            work_email="ray@prunedge.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+        policy = LeavePolicy.objects.create(
+            organisation=org,
+            title="Annual",
+            description="Annual leave",
+            max_days_allowed=5,
+            min_employment_period=0,
+        )
+        leave = Leave.objects.create(
+            employee=employee,
+            leave_policy=policy,
+            year=get_current_year(),
+            initial_days=5,
+            max_days_allowed=5,
+        )
+        first_of_march = date(get_current_year(), 3, 1)
+        monday = first_of_march + timedelta(days=-first_of_march.weekday() % 7)
+        periods = [
+            (monday, monday + timedelta(days=2)),
+            (monday + timedelta(days=2), monday + timedelta(days=3)),
+            (monday + timedelta(days=7), monday + timedelta(days=9)),
+        ]
+        self.leave_requests = [
+            LeaveRequest.objects.create(
+                employee=employee,
+                leave=leave,
+                start_date=start_date,
+                end_date=end_date,
+                note="Leave",
+            )
+            for start_date, end_date in periods
+        ]
+        url = reverse("user:login")
+        data = {"email": "ridwan.yusuf@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_bulk_approve_validates_batch(self):
+        url = reverse("leave:leaverequest-bulk-approve")
+        ids = [str(leave_request.id) for leave_request in self.leave_requests]
+        response = self.client.post(url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]
+        self.assertEqual(
+            [result["success"] for result in results], [True, False, False]
+        )
+        self.assertEqual(
+            results[1]["detail"], "Timeoff has already been recorded for this period."
+        )
+        self.assertEqual(
+            results[2]["detail"], "Time off days is above time off balance."
+        )
+        self.assertEqual(LeaveTaken.objects.count(), 1)
+        self.assertEqual(
+            LeaveRequest.objects.filter(status="APPROVED").get(), self.leave_requests[0]
+        )
+
+    def test_approvals_of_leave_without_limit(self):
+        leave = self.leave_requests[0].leave
+        leave.max_days_allowed = None
+        leave.save()
+        url = reverse("leave:leaverequest-approve")
+        data = {"leave_request": str(self.leave_requests[0].id)}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        url = reverse("leave:leaverequest-bulk-approve")
+        response = self.client.post(
+            url, {"ids": [str(self.leave_requests[2].id)]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"][0]["success"], True)
+        self.assertEqual(LeaveTaken.objects.count(), 2)
+
+    def test_bulk_decline(self):
+        url = reverse("leave:leaverequest-bulk-decline")
+        ids = [str(self.leave_requests[0].id), str(self.leave_requests[0].employee_id)]
+        response = self.client.post(url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]
+        self.assertEqual([result["success"] for result in results], [True, False])
+        self.leave_requests[0].refresh_from_db()
+        self.assertEqual(self.leave_requests[0].status, "DECLINED")
+
+
+class WhosOutTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        other_org = Organisation.objects.create(
+            name="Other",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="other.hrms.com",
+            status="ACTIVE",
+        )
+        user = get_user_model().objects.create_user(
+            organisation=self.org,
+            email="ridwan.yusuf@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN", "EMPLOYEE"],
+        )
+        self.leaves = []
+        for org, email in [
+            (self.org, "ray@prunedge.com"),
+            (other_org, "ray@other.com"),
+        ]:
+            employee = Employee.objects.create(
+                user=user if org == self.org else None,
+                organisation=org,
+                firstname="Ray",
+                lastname="Inc",
+                work_email=email,
+                job_title="Engineer",
+                employment_status="FULL TIME",
+            )
+            policy = LeavePolicy.objects.create(
+                organisation=org,
+                title="Annual",
+                description="Annual leave",
+                max_days_allowed=5,
+                min_employment_period=0,
+                color_tag="#00FF00",
+            )
+            self.leaves.append(
+                Leave.objects.create(
+                    employee=employee,
+                    leave_policy=policy,
+                    year=get_current_year(),
+                    initial_days=5,
+                    max_days_allowed=5,
+                )
+            )
+        for leave in self.leaves:
+            LeaveTaken.objects.create(
+                leave=leave,
+                start_date=self.today,
+                end_date=self.today + timedelta(days=1),
+            )
+        url = reverse("user:login")
+        data = {"email": "ridwan.yusuf@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_whos_out_is_scoped_to_organisation(self):
+        url = reverse("leave:leave-whos-out")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [row] = response.json()["results"]
+        self.assertEqual(row["title"], "Annual")
+        self.assertEqual(row["color_tag"], "#00FF00")
+        self.assertEqual(row["employee"]["id"], str(self.leaves[0].employee_id))
+
+        later = (self.today + timedelta(days=2)).isoformat()
+        response = self.client.get(url, {"date": later})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_nightly_refresh_queued_on_reports_queue(self):
+        with mock.patch.object(
+            refresh_whos_out_snapshots, "apply_async"
+        ) as apply_async:
+            refresh_whos_out_snapshots()
+        apply_async.assert_any_call(
+            (str(self.org.id),), {"from_replica": True}, queue="reports"
+        )
+
+    def test_snapshot_served_from_cache_and_invalidated(self):
+        refresh_whos_out_snapshots(str(self.org.id))
+        self.assertIsNotNone(cache.get(get_key(self.org.id, self.today)))
+        url = reverse("leave:leave-whos-out")
+        with self.assertNumQueries(1):
+            # the user lookup of the authentication, the rows are read from the cache
+            self.client.get(url)
+
+        leave_taken = LeaveTaken.objects.get(leave=self.leaves[0])
+        with mock.patch.object(refresh_whos_out_snapshots, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                leave_taken.delete()
+        delay.assert_called_once_with(
+            str(self.org.id),
+            self.today.isoformat(),
+            (self.today + timedelta(days=1)).isoformat(),
+        )
+        self.assertIsNone(cache.get(get_key(self.org.id, self.today)))
+        response = self.client.get(url)
+        self.assertEqual(response.json()["results"], [])
+
+    @override_settings(
+        DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage"
+    )
+    def test_snapshot_invalidated_when_employee_changes(self):
+        refresh_whos_out_snapshots(str(self.org.id))
+        employee = self.leaves[0].employee
+        employee.firstname = "Renamed"
+        employee.image = "employee/avatar.png"
+        with mock.patch.object(refresh_whos_out_snapshots, "delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                employee.save()
+        self.assertIsNone(cache.get(get_key(self.org.id, self.today)))
+        url = reverse("leave:leave-whos-out")
+        [row] = self.client.get(url).json()["results"]
+        self.assertEqual(row["employee"]["firstname"], "Renamed")
+        self.assertTrue(row["employee"]["image"].endswith("employee/avatar.png"))
+        self.assertEqual(
+            cache.get(get_key(self.org.id, self.today))[0]["employee"]["image"],
+            "employee/avatar.png",
+        )
+
+        employee.is_active = False
+        with mock.patch.object(refresh_whos_out_snapshots, "delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                employee.save()
+        self.assertEqual(self.client.get(url).json()["results"], [])
+
+
+class LeaveCalendarTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        user = get_user_model().objects.create_user(
+            organisation=self.org,
+            email="ridwan.yusuf@prunedge.com",
+            password="passer",
+            verified=True,
+            roles=["HR_ADMIN", "EMPLOYEE"],
+        )
+        self.division = OrganisationNode.objects.create(
+            name="Engineering", organisation=self.org
+        )
+        team = OrganisationNode.objects.create(
+            name="Platform", organisation=self.org, parent=self.division, level=1
+        )
+        other_division = OrganisationNode.objects.create(
+            name="Sales", organisation=self.org
+        )
+        self.policy = LeavePolicy.objects.create(
+            organisation=self.org,
+            title="Annual",
+            description="Annual leave",
+            max_days_allowed=20,
+            min_employment_period=0,
+            color_tag="#00FF00",
+        )
+        self.leaves = []
+        for name, node in [
+            ("Ada", team),
+            ("Bola", self.division),
+            ("Chi", other_division),
+        ]:
+            employee = Employee.objects.create(
+                user=user if name == "Ada" else None,
+                organisation=self.org,
+                firstname=name,
+                lastname="Inc",
+                work_email=f"{name.lower()}@prunedge.com",
+                job_title="Engineer",
+                employment_status="FULL TIME",
+            )
+            employee.organisation_nodes.add(node)
+            self.leaves.append(
+                Leave.objects.create(
+                    employee=employee,
+                    leave_policy=self.policy,
+                    year=get_current_year(),
+                    initial_days=20,
+                    max_days_allowed=20,
+                )
+            )
+        self.start_date = date(get_current_year(), 3, 1)
+        for leave in self.leaves:
+            for days in (0, 10):
+                LeaveTaken.objects.create(
+                    leave=leave,
+                    start_date=self.start_date + timedelta(days=days),
+                    end_date=self.start_date + timedelta(days=days + 1),
+                )
+        url = reverse("user:login")
+        data = {"email": "ridwan.yusuf@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        self.url = reverse("leave:leave-calendar")
+
+    def test_calendar_of_node_subtree(self):
+        params = {
+            "node": str(self.division.id),
+            "start_date": self.start_date.isoformat(),
+            "end_date": (self.start_date + timedelta(days=5)).isoformat(),
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()["data"]
+        self.assertEqual(data["employees"]["firstname"], ["Ada", "Bola"])
+        self.assertEqual(data["policies"]["color_tag"], ["#00FF00"])
+        self.assertEqual(data["intervals"]["employee"], [0, 1])
+        self.assertEqual(data["intervals"]["policy"], [0, 0])
+        self.assertEqual(
+            data["intervals"]["start_date"], [self.start_date.isoformat()] * 2
+        )
+
+    def test_calendar_cached_until_leave_changes(self):
+        params = {
+            "start_date": self.start_date.isoformat(),
+            "end_date": (self.start_date + timedelta(days=30)).isoformat(),
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(len(response.json()["data"]["intervals"]["employee"]), 6)
+        with self.assertNumQueries(1):
+            # the user lookup of the authentication
+            self.client.get(self.url, params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LeaveTaken.objects.filter(leave=self.leaves[0]).first().delete()
+        response = self.client.get(self.url, params)
+        self.assertEqual(len(response.json()["data"]["intervals"]["employee"]), 5)
+
+    def test_calendar_cached_until_employees_or_nodes_change(self):
+        params = {
+            "node": str(self.division.id),
+            "start_date": self.start_date.isoformat(),
+            "end_date": (self.start_date + timedelta(days=5)).isoformat(),
+        }
+
+        def get_firstnames():
+            response = self.client.get(self.url, params)
+            return response.json()["data"]["employees"]["firstname"]
+
+        self.assertEqual(get_firstnames(), ["Ada", "Bola"])
+
+        employee = self.leaves[1].employee
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.firstname = "Bolu"
+            employee.save()
+        self.assertEqual(get_firstnames(), ["Ada", "Bolu"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.organisation_nodes.clear()
+        self.assertEqual(get_firstnames(), ["Ada"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OrganisationNode.objects.filter(parent=self.division).first().delete()
+        self.assertEqual(get_firstnames(), [])
+
+    def test_calendar_window_is_validated(self):
+        params = {
+            "start_date": self.start_date.isoformat(),
+            "end_date": (self.start_date - timedelta(days=1)).isoformat(),
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
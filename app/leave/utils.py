@@ -1,9 +1,15 @@
-from .models import Leave, LeavePolicy
+from collections import defaultdict
+from audit.recorder import record_bulk_update
+from organisation.config import get_leave_policies
+from workflow.engine import close_approvals
+from .models import Leave, LeaveRequest
 from django.utils import timezone
 from dateutil.rrule import DAILY, MONTHLY, WEEKLY, rrule
 from django.db import transaction
 from .models import LeaveTaken
 from django.db.models import Q
+from .team_calendar import invalidate_calendar
+from .whos_out import invalidate_whos_out
 
 
 def get_current_year():
@@ -11,10 +17,10 @@ def get_current_year():
 
 
 def assign_default_leave_policies_to_employees(employees):
-    policies = LeavePolicy.objects.filter(is_default=True)
     leave_objs = []
-    for leave_policy in policies:
-        for employee in employees:
+    for employee in employees:
+        policies = get_leave_policies(employee.organisation_id, is_default=True)
+        for leave_policy in policies:
             # min_period = leave_policy.min_employment_period
             # days_ago = timezone.now() - timezone.timedelta(days=min_period)
             # if employee.hire_date and employee.hire_date <= days_ago.date():
@@ -109,3 +115,151 @@ def get_active_timeoff_taken():
         )
         .order_by("end_date", "created_at")
     )
+
+
+def periods_overlap(start_date, end_date, other_start_date, other_end_date):
+    return start_date <= other_end_date and other_start_date <= end_date
+
+
+@transaction.atomic
+def bulk_approve_timeoff_requests(ids, organisation) -> list:
+    """
+    Approves the organisation's pending leave requests in one transaction. Balances
+    and overlaps are checked for the whole batch from two queries, requests of the
+    same leave being counted in the order they start. Requests locked by a
+    concurrent approval are skipped and reported as such.
+    Returns a result per id.
+    """
+    leave_requests = {
+        leave_request.id: leave_request
+        for leave_request in LeaveRequest.objects.select_for_update(
+            skip_locked=True, of=("self",)
+        )
+        .filter(id__in=ids, employee__organisation=organisation)
+        .select_related("leave")
+    }
+    leave_ids = {request.leave_id for request in leave_requests.values()}
+    # serializes balance checks with single approvals of the same leaves, locked in
+    # pk order so concurrent bulk approvals can't deadlock
+    list(Leave.objects.select_for_update().filter(id__in=leave_ids).order_by("pk"))
+
+    days_taken = defaultdict(int)
+    periods_taken = defaultdict(list)
+    if leave_requests:
+        employee_ids = {request.employee_id for request in leave_requests.values()}
+        batch_start = min(request.start_date for request in leave_requests.values())
+        batch_end = max(request.end_date for request in leave_requests.values())
+        leaves_taken = LeaveTaken.objects.filter(
+            Q(leave__in=leave_ids)
+            | Q(
+                leave__employee__in=employee_ids,
+                start_date__lte=batch_end,
+                end_date__gte=batch_start,
+            )
+        ).values_list("leave_id", "leave__employee_id", "start_date", "end_date")
+        for leave_id, employee_id, start_date, end_date in leaves_taken:
+            if leave_id in leave_ids:
+                days_taken[leave_id] += get_total_workings_days(start_date, end_date)
+            periods_taken[employee_id].append((start_date, end_date))
+
+    results = {}
+    approved = []
+    for leave_request in sorted(
+        leave_requests.values(), key=lambda request: request.start_date
+    ):
+        detail = None
+        days_requested = get_total_workings_days(
+            leave_request.start_date, leave_request.end_date
+        )
+        if leave_request.status != "PENDING":
+            detail = "Only a pending request can be approved."
+        elif leave_request.leave is None:
+            detail = "The leave of this request no longer exists."
+        elif days_requested == 0:
+            detail = "You cannot approve a time off request with zero days."
+        elif (
+            leave_request.leave.max_days_allowed is not None
+            and days_taken[leave_request.leave_id] + days_requested
+            > leave_request.leave.max_days_allowed
+        ):
+            detail = "Time off days is above time off balance."
+        elif any(
+            periods_overlap(leave_request.start_date, leave_request.end_date, *period)
+            for period in periods_taken[leave_request.employee_id]
+        ):
+            detail = "Timeoff has already been recorded for this period."
+        else:
+            days_taken[leave_request.leave_id] += days_requested
+            periods_taken[leave_request.employee_id].append(
+                (leave_request.start_date, leave_request.end_date)
+            )
+            approved.append(leave_request)
+        results[leave_request.id] = detail
+
+    now = timezone.now()
+    for leave_request in approved:
+        leave_request.status = "APPROVED"
+        leave_request.updated_at = now
+    LeaveRequest.objects.bulk_update(approved, ["status", "updated_at"])
+    record_bulk_update(approved)
+    close_approvals(
+        "leave", [leave_request.id for leave_request in approved], "APPROVED"
+    )
+    LeaveTaken.objects.bulk_create(
+        [
+            LeaveTaken(
+                leave=leave_request.leave,
+                start_date=leave_request.start_date,
+                end_date=leave_request.end_date,
+                note=leave_request.note,
+            )
+            for leave_request in approved
+        ]
+    )
+    if approved:
+        # bulk_create doesn't send the post_save the snapshots are invalidated from
+        invalidate_whos_out(
+            organisation.id,
+            min(leave_request.start_date for leave_request in approved),
+            max(leave_request.end_date for leave_request in approved),
+        )
+        invalidate_calendar(organisation.id)
+    return [
+        {
+            "id": id,
+            "success": id in results and results[id] is None,
+            "detail": results.get(id, "Leave request not found or being processed."),
+        }
+        for id in ids
+    ]
+
+
+@transaction.atomic
+def bulk_decline_timeoff_requests(ids, organisation) -> list:
+    leave_requests = {
+        leave_request.id: leave_request
+        for leave_request in LeaveRequest.objects.select_for_update(
+            skip_locked=True, of=("self",)
+        ).filter(id__in=ids, employee__organisation=organisation)
+    }
+    now = timezone.now()
+    results = []
+    declined = []
+    for id in ids:
+        leave_request = leave_requests.get(id)
+        if leave_request is None:
+            detail = "Leave request not found or being processed."
+        elif leave_request.status != "PENDING":
+            detail = "Only pending time off requests can be declined."
+        else:
+            leave_request.status = "DECLINED"
+            leave_request.updated_at = now
+            declined.append(leave_request)
+            detail = None
+        results.append({"id": id, "success": detail is None, "detail": detail})
+    LeaveRequest.objects.bulk_update(declined, ["status", "updated_at"])
+    record_bulk_update(declined)
+    close_approvals(
+        "leave", [leave_request.id for leave_request in declined], "DECLINED"
+    )
+    return results
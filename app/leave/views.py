@@ -1,3 +1,4 @@
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, filters, status
@@ -5,23 +6,35 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.mixins import ConditionalGetMixin
+from core.utils.etags import get_etag
+from employee.filters import ReportingLineFilter
+from organisation.config import get_leave_policies
 from user.permissions import IsHRAdmin, IsNotSuperAdmin, IsEmployee
 
 # from .filters import LeaveRequestFilter
+from .filters import LEAVE_CALENDAR_PARAMETERS, WHOS_OUT_PARAMETERS
 from .models import LeavePolicy, LeaveRequest, Leave
 from .serializers import (
     LeavePolicySerializer,
     EmployeeLeaveRequestCreateSerializer,
     LeaveTakenCreateSerializer,
     EmployeeLeaveListSerializer,
-    LeaveTakenWidgetSerializer,
     EmployeeLeaveTakenListSerializer,
     LeaveRequestListSerializer,
+    BulkLeaveRequestSerializer,
+    WhosOutQuerySerializer,
+    LeaveCalendarQuerySerializer,
+)
+from .team_calendar import get_calendar
+from .whos_out import get_whos_out, with_image_urls
+from .utils import (
+    bulk_approve_timeoff_requests,
+    bulk_decline_timeoff_requests,
 )
-from .utils import get_active_timeoff_taken
 
 
-class LeavePolicyViewSets(viewsets.ModelViewSet):
+class LeavePolicyViewSets(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = LeavePolicy.objects.all()
     serializer_class = LeavePolicySerializer
     permission_classes = [IsAuthenticated, IsHRAdmin]
@@ -34,6 +47,17 @@ class LeavePolicyViewSets(viewsets.ModelViewSet):
     def get_queryset(self):
         return LeavePolicy.objects.filter(organisation=self.request.user.organisation)
 
+    def get_validators(self):
+        if self.action == "list":
+            policies = get_leave_policies(self.request.user.organisation_id)
+            updated_at = max((policy.updated_at for policy in policies), default=None)
+            return get_etag(updated_at, len(policies)), updated_at
+        return super().get_validators()
+
+    def list(self, request, *args, **kwargs):
+        # policies change a few times a year, they are read from the cached config
+        return self.paginate_results(get_leave_policies(request.user.organisation_id))
+
     def perform_create(self, serializer):
         serializer.save(
             created_by=self.request.user, organisation=self.request.user.organisation
@@ -59,6 +83,7 @@ class EmployeeLeaveRequestViewSets(viewsets.ModelViewSet):
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
+        ReportingLineFilter,
         filters.OrderingFilter,
     ]
     # filterset_fields = ['organisation']
@@ -80,11 +105,13 @@ class EmployeeLeaveRequestViewSets(viewsets.ModelViewSet):
             return EmployeeLeaveRequestCreateSerializer
         elif self.action == "approve":
             return LeaveTakenCreateSerializer
+        elif self.action in ["bulk_approve", "bulk_decline"]:
+            return BulkLeaveRequestSerializer
         return self.serializer_class
 
     def get_permissions(self):
         permission_classes = self.permission_classes
-        if self.action in ["approve", "decline"]:
+        if self.action in ["approve", "decline", "bulk_approve", "bulk_decline"]:
             permission_classes = [IsHRAdmin]
         elif self.action == "list":
             permission_classes = [IsEmployee | IsHRAdmin]
@@ -111,6 +138,24 @@ class EmployeeLeaveRequestViewSets(viewsets.ModelViewSet):
 
         return Response()
 
+    @action(methods=["POST"], detail=False, url_path="bulk-approve")
+    def bulk_approve(self, request, pk=None):
+        serializer = BulkLeaveRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_approve_timeoff_requests(
+            serializer.validated_data["ids"], request.user.organisation
+        )
+        return Response({"success": True, "data": results}, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=False, url_path="bulk-decline")
+    def bulk_decline(self, request, pk=None):
+        serializer = BulkLeaveRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_decline_timeoff_requests(
+            serializer.validated_data["ids"], request.user.organisation
+        )
+        return Response({"success": True, "data": results}, status=status.HTTP_200_OK)
+
 
 class EmployeeLeaveViewSets(viewsets.ModelViewSet):
     queryset = Leave.objects.all()
@@ -133,13 +178,41 @@ class EmployeeLeaveViewSets(viewsets.ModelViewSet):
             .order_by("leave_policy__title")
         )
 
+    @extend_schema(parameters=WHOS_OUT_PARAMETERS)
     @action(
         detail=False,
         methods=["get"],
         permission_classes=[IsEmployee | IsHRAdmin],
     )
     def whos_out(self, request, *args, **kwargs):
-        qs = get_active_timeoff_taken()
-        paginated_queryset = self.paginate_queryset(qs)
-        data = LeaveTakenWidgetSerializer(instance=paginated_queryset, many=True).data
-        return self.get_paginated_response(data)
+        """The organisation's employees on leave on a day, served from its snapshot."""
+        serializer = WhosOutQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        day = serializer.validated_data.get("date") or timezone.now().date()
+        rows = get_whos_out(request.user.organisation_id, day)
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(with_image_urls(page))
+
+    @extend_schema(parameters=LEAVE_CALENDAR_PARAMETERS)
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsEmployee | IsHRAdmin],
+        url_path="calendar",
+    )
+    def calendar(self, request, *args, **kwargs):
+        """
+        Leaves of a node subtree's employees over a window, as columns: intervals
+        reference the employees and policies lists by index.
+        """
+        serializer = LeaveCalendarQuerySerializer(
+            data=request.query_params, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        data = get_calendar(
+            request.user.organisation_id,
+            serializer.validated_data["start_date"],
+            serializer.validated_data["end_date"],
+            serializer.validated_data.get("node"),
+        )
+        return Response({"success": True, "data": data}, status=status.HTTP_200_OK)
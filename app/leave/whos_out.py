@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from core.storage_backends import get_urls
+from .models import LeaveTaken
+
+WHOS_OUT_KEY = "whos-out:{organisation_id}:{day}"
+
+ROW_FIELDS = (
+    "id",
+    "start_date",
+    "end_date",
+    "leave__leave_policy__title",
+    "leave__leave_policy__color_tag",
+    "leave__employee__id",
+    "leave__employee__firstname",
+    "leave__employee__lastname",
+    "leave__employee__job_title",
+    "leave__employee__image",
+    "leave__employee__image_variants",
+)
+
+
+def get_key(organisation_id, day):
+    return WHOS_OUT_KEY.format(organisation_id=organisation_id, day=day.isoformat())
+
+
+def get_days(start_date, end_date):
+    return [
+        start_date + timedelta(days=days)
+        for days in range((end_date - start_date).days + 1)
+    ]
+
+
+def get_snapshot_days(start_date=None, end_date=None):
+    """
+    Returns the days between start_date and end_date that are kept precomputed,
+    today and the next WHOS_OUT_DAYS_AHEAD days.
+    """
+    today = timezone.now().date()
+    last_day = today + timedelta(days=settings.WHOS_OUT_DAYS_AHEAD)
+    return get_days(
+        max(start_date or today, today), min(end_date or last_day, last_day)
+    )
+
+
+def to_row(leave_taken) -> dict:
+    (
+        id,
+        start_date,
+        end_date,
+        title,
+        color_tag,
+        employee_id,
+        firstname,
+        lastname,
+        job_title,
+        image,
+        image_variants,
+    ) = leave_taken
+    return {
+        "id": id,
+        "title": title,
+        "color_tag": color_tag,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "employee": {
+            "id": str(employee_id),
+            "firstname": firstname,
+            "lastname": lastname,
+            "job_title": job_title,
+            "image": image or None,
+            "image_thumb": image_variants.get("thumb"),
+        },
+    }
+
+
+def build_whos_out(organisation_id, days) -> dict:
+    """
+    Returns the compact rows of the organisation's employees on leave on each day,
+    read with a single query over the days. Images are kept as storage names,
+    resolved by with_image_urls when served.
+    """
+    if not days:
+        return {}
+    leaves_taken = list(
+        LeaveTaken.objects.filter(
+            leave__employee__organisation=organisation_id,
+            leave__employee__is_active=True,
+            start_date__lte=max(days),
+            end_date__gte=min(days),
+        )
+        .order_by("end_date", "created_at")
+        .values_list(*ROW_FIELDS)
+    )
+    rows = [to_row(leave_taken) for leave_taken in leaves_taken]
+    return {
+        day: [
+            row
+            for leave_taken, row in zip(leaves_taken, rows)
+            if leave_taken[1] <= day <= leave_taken[2]
+        ]
+        for day in days
+    }
+
+
+def refresh_whos_out(organisation_id, days):
+    cache.set_many(
+        {
+            get_key(organisation_id, day): rows
+            for day, rows in build_whos_out(organisation_id, days).items()
+        },
+        settings.WHOS_OUT_CACHE_SECONDS,
+    )
+
+
+def get_whos_out(organisation_id, day) -> list:
+    """Reads the day's snapshot, computing it if it isn't cached yet."""
+    key = get_key(organisation_id, day)
+    rows = cache.get(key)
+    if rows is None:
+        rows = build_whos_out(organisation_id, [day])[day]
+        cache.set(key, rows, settings.WHOS_OUT_CACHE_SECONDS)
+    return rows
+
+
+def with_image_urls(rows) -> list:
+    """Copies of the rows with the employees' image names resolved to urls."""
+    names = set()
+    for row in rows:
+        names.update(
+            name
+            for name in (row["employee"]["image"], row["employee"]["image_thumb"])
+            if name
+        )
+    urls = get_urls(default_storage, names)
+    return [
+        {
+            **row,
+            "employee": {
+                **row["employee"],
+                "image": urls.get(row["employee"]["image"]),
+                "image_thumb": urls.get(row["employee"]["image_thumb"]),
+            },
+        }
+        for row in rows
+    ]
+
+
+def invalidate_whos_out(organisation_id, start_date, end_date):
+    """
+    Drops the snapshots of the days a leave covers once the transaction commits and
+    queues the recomputation of the precomputed ones.
+    """
+    from .tasks import refresh_whos_out_snapshots
+
+    def invalidate():
+        cache.delete_many(
+            [get_key(organisation_id, day) for day in get_days(start_date, end_date)]
+        )
+        days = get_snapshot_days(start_date, end_date)
+        if days:
+            refresh_whos_out_snapshots.delay(
+                str(organisation_id), days[0].isoformat(), days[-1].isoformat()
+            )
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_employee_whos_out(employee):
+    """
+    Drops the snapshots of the days the employee's leaves cover, which show their
+    name and image and only list them while they are active.
+    """
+    periods = LeaveTaken.objects.filter(leave__employee=employee).aggregate(
+        start_date=Min("start_date"), end_date=Max("end_date")
+    )
+    if employee.organisation_id and periods["start_date"]:
+        invalidate_whos_out(
+            employee.organisation_id, periods["start_date"], periods["end_date"]
+        )
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NotificationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notification"
+
+    def ready(self):
+        from .signals import create_partitioned_tables
+
+        post_migrate.connect(create_partitioned_tables, sender=self)
@@ -1,9 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from core.models import AuditableModel
 from .enums import NOTIFICATION_TYPES, NOTIFICATION_ACTIONS, NOTIFICATION_RECIPIENT
 
 
+class NotificationQuerySet(models.QuerySet):
+    def recent(self, days=None):
+        """Notifications of the last NOTIFICATION_RECENT_DAYS, older partitions are skipped."""
+        days = settings.NOTIFICATION_RECENT_DAYS if days is None else days
+        return self.filter(created_at__gte=timezone.now() - timedelta(days=days))
+
+
 class Notification(AuditableModel):
+    """
+    Range partitioned by month on created_at, the tables are created outside of the
+    migrations (see notification/partitions.py).
+    """
     organisation = models.ForeignKey('organisation.Organisation', on_delete=models.CASCADE,
                                      related_name='org_notifications')
     actor = models.ForeignKey('user.User', on_delete=models.CASCADE,
@@ -14,10 +29,29 @@ class Notification(AuditableModel):
     action = models.CharField(max_length=255, choices=NOTIFICATION_ACTIONS)
     notif_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
-    read_users = models.ManyToManyField("user.User")
+    read_users = models.ManyToManyField("user.User", through="NotificationRead")
+
+    objects = NotificationQuerySet.as_manager()
 
     class Meta:
+        managed = False
+        db_table = 'notification_notification'
         ordering = ('-created_at',)
 
     def __str__(self):
         return f"{str(self.actor)} {self.action}"
+
+
+class NotificationRead(models.Model):
+    """A user having read a notification, partitioned by month on when it was read."""
+    id = models.BigAutoField(primary_key=True)
+    # a partitioned table can't be referenced, the constraint is kept by Django
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE,
+                                     db_constraint=False, related_name='reads')
+    user = models.ForeignKey('user.User', on_delete=models.CASCADE,
+                             related_name='notification_reads')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        managed = False
+        db_table = 'notification_notificationread'
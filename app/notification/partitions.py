@@ -0,0 +1,154 @@
+import logging
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.partitions import (
+    add_months,
+    create_monthly_partitions,
+    drop_monthly_partitions,
+    get_month,
+)
+from .models import Notification, NotificationRead
+
+logger = logging.getLogger(__name__)
+
+TABLE = Notification._meta.db_table
+READ_TABLE = NotificationRead._meta.db_table
+# the tables of the notification model before it was partitioned
+LEGACY_TABLE = f"{TABLE}_legacy"
+LEGACY_READ_TABLE = "notification_notification_read_users"
+
+# the partition key has to be part of the primary key
+TABLE_SQL = """
+CREATE TABLE {table} (
+    id uuid NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    organisation_id uuid NOT NULL REFERENCES {organisation_table} (id)
+        DEFERRABLE INITIALLY DEFERRED,
+    actor_id uuid NOT NULL REFERENCES {user_table} (id) DEFERRABLE INITIALLY DEFERRED,
+    recipient_level varchar(255) NOT NULL,
+    description text NULL,
+    action varchar(255) NOT NULL,
+    notif_type varchar(20) NOT NULL,
+    CONSTRAINT {table}_partitioned_pkey PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+READ_TABLE_SQL = """
+CREATE TABLE {table} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    notification_id uuid NOT NULL,
+    user_id uuid NOT NULL REFERENCES {user_table} (id) DEFERRABLE INITIALLY DEFERRED,
+    created_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+# created on every partition, present and future. Lists filter on the organisation
+# or the actor, or on the recipient level alone for super admins, newest first.
+INDEX_SQL = (
+    f"CREATE INDEX IF NOT EXISTS notification_organisation ON {TABLE} "
+    "(organisation_id, created_at DESC)",
+    f"CREATE INDEX IF NOT EXISTS notification_actor ON {TABLE} "
+    "(actor_id, created_at DESC)",
+    f"CREATE INDEX IF NOT EXISTS notification_recipient_level ON {TABLE} "
+    "(recipient_level, created_at DESC)",
+    f"CREATE INDEX IF NOT EXISTS notification_read_user ON {READ_TABLE} "
+    "(user_id, notification_id)",
+    f"CREATE INDEX IF NOT EXISTS notification_read_notification ON {READ_TABLE} "
+    "(notification_id)",
+)
+
+COPY_SQL = f"""
+INSERT INTO {TABLE} (id, created_at, updated_at, organisation_id, actor_id,
+                     recipient_level, description, action, notif_type)
+SELECT id, created_at, updated_at, organisation_id, actor_id,
+       recipient_level, description, action, notif_type
+FROM {LEGACY_TABLE}
+"""
+
+# when a notification was read wasn't kept, it counts as read when it was sent
+COPY_READS_SQL = f"""
+INSERT INTO {READ_TABLE} (notification_id, user_id, created_at)
+SELECT reads.notification_id, reads.user_id, notification.created_at
+FROM {LEGACY_READ_TABLE} reads
+JOIN {LEGACY_TABLE} notification ON notification.id = reads.notification_id
+"""
+
+
+def get_relkind(cursor, table):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def create_notification_partitions(start=None, using="default") -> list:
+    """
+    Creates the partitions of both tables from the month of start (this month by
+    default) to NOTIFICATION_PARTITION_MONTHS_AHEAD months from now where missing.
+    """
+    end = add_months(
+        get_month(timezone.now()), settings.NOTIFICATION_PARTITION_MONTHS_AHEAD
+    )
+    start = start or timezone.now()
+    return create_monthly_partitions(
+        TABLE, start, end, using
+    ) + create_monthly_partitions(READ_TABLE, start, end, using)
+
+
+def drop_notification_partitions(using="default") -> list:
+    """
+    Removes the partitions of both tables older than NOTIFICATION_RETENTION_MONTHS,
+    moving them to NOTIFICATION_ARCHIVE_SCHEMA when it is set.
+    """
+    before = add_months(
+        get_month(timezone.now()), -settings.NOTIFICATION_RETENTION_MONTHS
+    )
+    return [
+        partition
+        for table in (TABLE, READ_TABLE)
+        for partition in drop_monthly_partitions(
+            table, before, using, settings.NOTIFICATION_ARCHIVE_SCHEMA
+        )
+    ]
+
+
+def create_notification_tables(using="default"):
+    """
+    Creates the partitioned tables. Notifications of a table created before they were
+    partitioned are copied into them, the old tables are kept as *_legacy until they
+    are dropped by hand.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    tables = {
+        "organisation_table": Notification._meta.get_field(
+            "organisation"
+        ).related_model._meta.db_table,
+        "user_table": Notification._meta.get_field(
+            "actor"
+        ).related_model._meta.db_table,
+    }
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        legacy = get_relkind(cursor, TABLE) == "r"
+        start = None
+        if legacy:
+            cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+            cursor.execute(f"SELECT min(created_at) FROM {LEGACY_TABLE}")
+            start = cursor.fetchone()[0]
+        if get_relkind(cursor, TABLE) is None:
+            cursor.execute(TABLE_SQL.format(table=TABLE, **tables))
+        if get_relkind(cursor, READ_TABLE) is None:
+            cursor.execute(READ_TABLE_SQL.format(table=READ_TABLE, **tables))
+        for sql in INDEX_SQL:
+            cursor.execute(sql)
+        create_notification_partitions(start, using)
+        if legacy:
+            cursor.execute(COPY_SQL)
+            if get_relkind(cursor, LEGACY_READ_TABLE) == "r":
+                cursor.execute(COPY_READS_SQL)
+            logger.info("Copied the notifications into %s", TABLE)
@@ -0,0 +1,5 @@
+from .partitions import create_notification_tables
+
+
+def create_partitioned_tables(sender, using="default", **kwargs):
+    create_notification_tables(using)
@@ -0,0 +1,12 @@
+from core.celery import APP
+from .partitions import create_notification_partitions, drop_notification_partitions
+
+
+@APP.task(ignore_result=True)
+def manage_notification_partitions():
+    """
+    Creates the coming months' partitions and drops (or archives) the ones past
+    NOTIFICATION_RETENTION_MONTHS, old notifications are never deleted row by row.
+    """
+    create_notification_partitions()
+    drop_notification_partitions()
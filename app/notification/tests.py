@@ -1,9 +1,21 @@
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from notification.models import Notification
+from core.partitions import add_months, get_month, get_partition_name
+from notification.models import Notification, NotificationRead
+from notification.partitions import (
+    create_notification_partitions,
+    create_notification_tables,
+    drop_notification_partitions,
+)
 from organisation.models import Organisation
 from user.models import User
 from .enums import NOTIFICATION_TYPES, NOTIFICATION_ACTIONS
@@ -277,3 +289,135 @@ class RetrieveNotificationTests(APITestCase):
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()["data"]["is_read"], True)
+
+
+class NotificationPartitionTests(TestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        self.user = get_user_model().objects.create_user(
+            organisation=self.org,
+            email="hr@org.com",
+            password="hr",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+
+    def create_notification(self, created_at=None):
+        notification = Notification.objects.create(
+            organisation=self.org,
+            actor=self.user,
+            action="APPLIED",
+            notif_type="LEAVE",
+            recipient_level="HR_ADMIN",
+        )
+        if created_at is not None:
+            create_notification_partitions(created_at)
+            Notification.objects.filter(pk=notification.pk).update(
+                created_at=created_at
+            )
+        return notification
+
+    def get_partition(self, table, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {table} WHERE id = %s", [pk]
+            )
+            return cursor.fetchone()[0]
+
+    def test_notifications_and_reads_are_stored_in_monthly_partitions(self):
+        notification = self.create_notification()
+        notification.read_users.add(self.user)
+        month = get_month(timezone.now())
+        self.assertEqual(
+            self.get_partition("notification_notification", notification.pk),
+            get_partition_name("notification_notification", month),
+        )
+        read = NotificationRead.objects.get(notification=notification)
+        self.assertEqual(
+            self.get_partition("notification_notificationread", read.pk),
+            get_partition_name("notification_notificationread", month),
+        )
+
+    def test_recent_skips_old_notifications(self):
+        notification = self.create_notification()
+        self.create_notification(
+            timezone.now()
+            - timedelta(days=settings.NOTIFICATION_RECENT_DAYS + 31)
+        )
+        self.assertEqual(
+            list(Notification.objects.recent().values_list("id", flat=True)),
+            [notification.id],
+        )
+
+    def test_partitions_past_retention_are_dropped(self):
+        old = add_months(
+            get_month(timezone.now()), -settings.NOTIFICATION_RETENTION_MONTHS - 1
+        )
+        self.create_notification(timezone.make_aware(datetime(old.year, old.month, 2)))
+        notification = self.create_notification()
+        with connection.cursor() as cursor:
+            # the retention job runs in its own transaction, without deferred checks
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        dropped = drop_notification_partitions()
+        self.assertIn(get_partition_name("notification_notification", old), dropped)
+        self.assertEqual(
+            list(Notification.objects.values_list("id", flat=True)),
+            [notification.id],
+        )
+
+    def test_existing_table_is_copied_into_partitions(self):
+        created_at = timezone.now() - timedelta(days=40)
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE notification_notification CASCADE")
+            cursor.execute("DROP TABLE notification_notificationread CASCADE")
+            cursor.execute(LEGACY_SQL)
+            cursor.execute(
+                "INSERT INTO notification_notification VALUES "
+                "(%s, %s, %s, %s, %s, 'ALL', NULL, 'APPLIED', 'LEAVE')",
+                [uuid.uuid4(), created_at, created_at, self.org.id, self.user.id],
+            )
+            cursor.execute(
+                "INSERT INTO notification_notification_read_users "
+                "(notification_id, user_id) "
+                "SELECT id, %s FROM notification_notification",
+                [self.user.id],
+            )
+
+        create_notification_tables()
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.created_at, created_at)
+        self.assertEqual(list(notification.read_users.all()), [self.user])
+        self.assertEqual(
+            self.get_partition("notification_notification", notification.pk),
+            get_partition_name("notification_notification", get_month(created_at)),
+        )
+
+
+LEGACY_SQL = """
+CREATE TABLE notification_notification (
+    id uuid PRIMARY KEY,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    organisation_id uuid NOT NULL,
+    actor_id uuid NOT NULL,
+    recipient_level varchar(255) NOT NULL,
+    description text NULL,
+    action varchar(255) NOT NULL,
+    notif_type varchar(20) NOT NULL
+);
+CREATE TABLE notification_notification_read_users (
+    id serial PRIMARY KEY,
+    notification_id uuid NOT NULL REFERENCES notification_notification (id),
+    user_id uuid NOT NULL
+);
+"""
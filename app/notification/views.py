@@ -3,7 +3,7 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated
 from user.permissions import IsSuperAdmin, IsHRAdmin, IsEmployee
-from .models import Notification
+from .models import Notification, NotificationRead
 from .serializers import NotificationSerializer, UpdateReadStatusSerializer
 from django.db.models import Q
 from rest_framework.decorators import action
@@ -22,16 +22,18 @@ class NotificationViewSets(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user_role = self.request.user.roles
-        read_qs = Notification.read_users.through.objects.filter(
-            notification_id=OuterRef('pk'))
+        # a notification is read after it is sent, older read partitions are skipped
+        read_qs = NotificationRead.objects.filter(
+            notification_id=OuterRef('pk'), user=self.request.user,
+            created_at__gte=OuterRef('created_at'))
         if "SUPERADMIN" in user_role:
-            return self.queryset.select_related('actor').filter(
-                recipient_level__in=["SUPERADMIN", "ALL"]).annotate(is_read=Exists(read_qs, user_id=self.request.user))
+            return self.queryset.recent().select_related('actor').filter(
+                recipient_level__in=["SUPERADMIN", "ALL"]).annotate(is_read=Exists(read_qs))
         elif "HR_ADMIN" in user_role:
-            return self.queryset.select_related('actor').filter(
-                Q(organisation=self.request.user.organisation) & Q(recipient_level__in=["HR_ADMIN", "ALL", "HR_ADMIN & ACTOR"]) | Q(actor=self.request.user)).annotate(is_read=Exists(read_qs, user_id=self.request.user))
+            return self.queryset.recent().select_related('actor').filter(
+                Q(organisation=self.request.user.organisation) & Q(recipient_level__in=["HR_ADMIN", "ALL", "HR_ADMIN & ACTOR"]) | Q(actor=self.request.user)).annotate(is_read=Exists(read_qs))
         elif "EMPLOYEE" in user_role:
-            return self.queryset.select_related('actor').filter(Q(organisation=self.request.user.organisation) & Q(recipient_level__in=["ALL"]) | Q(actor=self.request.user)).annotate(is_read=Exists(read_qs, user_id=self.request.user))
+            return self.queryset.recent().select_related('actor').filter(Q(organisation=self.request.user.organisation) & Q(recipient_level__in=["ALL"]) | Q(actor=self.request.user)).annotate(is_read=Exists(read_qs))
         return Notification.objects.none()
 
     @action(methods=['put'], detail=True, serializer_class=UpdateReadStatusSerializer,url_path="update-read-status")
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class OrganisationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "organisation"
+
+    def ready(self):
+        from employee.models import Employee
+        from leave.models import LeavePolicy
+        from .models import JobGrade, Organisation
+        from .signals import refresh_tenant_config, touch_organisation_nodes
+
+        m2m_changed.connect(
+            touch_organisation_nodes, sender=Employee.organisation_nodes.through
+        )
+        for model in (Organisation, LeavePolicy, JobGrade):
+            post_save.connect(refresh_tenant_config, sender=model)
+            post_delete.connect(refresh_tenant_config, sender=model)
@@ -0,0 +1,102 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CONFIG_VERSION_KEY = "tenant-config-version:{organisation_id}"
+CONFIG_KEY = "tenant-config:{organisation_id}:{version}"
+
+# {organisation id: (version, expires, config)} of the configurations read by this
+# process, checked against the version in Redis on every read
+_configs = {}
+
+
+def load_config(organisation_id) -> dict:
+    Organisation = apps.get_model("organisation", "Organisation")
+    JobGrade = apps.get_model("organisation", "JobGrade")
+    LeavePolicy = apps.get_model("leave", "LeavePolicy")
+    levels = (
+        Organisation.objects.filter(pk=organisation_id)
+        .values_list("levels", flat=True)
+        .first()
+    )
+    job_grades = JobGrade.objects.filter(
+        organisation_node__organisation=organisation_id
+    )
+    return {
+        "levels": levels or {},
+        "leave_policies": list(
+            LeavePolicy.objects.filter(organisation=organisation_id)
+        ),
+        "job_grades": {str(job_grade.pk): job_grade for job_grade in job_grades},
+    }
+
+
+def get_config(organisation_id) -> dict:
+    """
+    Returns the levels, leave policies and job grades of the organisation, which
+    change a few times a year. A configuration is kept by each process and in Redis
+    under its version, which is bumped when any of them is saved or deleted: a read
+    is one cache GET of the version unless it changed. The objects are shared
+    between requests and must not be changed.
+    """
+    if not settings.TENANT_CONFIG_CACHE_SECONDS:
+        return load_config(organisation_id)
+    organisation_id = str(organisation_id)
+    version = cache.get(CONFIG_VERSION_KEY.format(organisation_id=organisation_id))
+    version = version or 0
+    local = _configs.get(organisation_id)
+    if local is not None and local[0] == version and local[1] > time.monotonic():
+        return local[2]
+
+    key = CONFIG_KEY.format(organisation_id=organisation_id, version=version)
+    config = cache.get(key)
+    if config is None:
+        config = load_config(organisation_id)
+        cache.set(key, config, settings.TENANT_CONFIG_CACHE_SECONDS)
+    # the local copy expires too, in case the versions were lost with Redis
+    expires = time.monotonic() + settings.TENANT_CONFIG_CACHE_SECONDS
+    _configs[organisation_id] = (version, expires, config)
+    return config
+
+
+def get_levels(organisation_id) -> dict:
+    """{level: name} of the organisation's structure."""
+    return get_config(organisation_id)["levels"]
+
+
+def get_leave_policies(organisation_id, is_default=None) -> list:
+    policies = get_config(organisation_id)["leave_policies"]
+    if is_default is None:
+        return policies
+    return [policy for policy in policies if policy.is_default == is_default]
+
+
+def get_job_grade(organisation_id, pk):
+    """The organisation's job grade with the pk, None when there is none."""
+    return get_config(organisation_id)["job_grades"].get(str(pk))
+
+
+def get_config_organisation_id(instance):
+    """The organisation of an Organisation, LeavePolicy or JobGrade."""
+    if instance._meta.label == "organisation.Organisation":
+        return instance.pk
+    if instance._meta.label == "organisation.JobGrade":
+        OrganisationNode = apps.get_model("organisation", "OrganisationNode")
+        return (
+            OrganisationNode.objects.filter(pk=instance.organisation_node_id)
+            .values_list("organisation_id", flat=True)
+            .first()
+        )
+    return instance.organisation_id
+
+
+def invalidate_config(organisation_id):
+    def invalidate():
+        key = CONFIG_VERSION_KEY.format(organisation_id=organisation_id)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    transaction.on_commit(invalidate)
@@ -19,6 +19,7 @@ class Organisation(AuditableModel):
     levels = models.JSONField(default=dict)
     is_self_onboarded = models.BooleanField(default=False)
     logo = models.ImageField(upload_to="logos/", null=True, blank=True)
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ("created_at",)
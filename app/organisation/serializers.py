@@ -10,14 +10,28 @@ from .models import (
 from user.models import User
 from rest_framework import status
 from user.serializers import ListUserSerializer
-from .utils import get_all_children_nodes
+from .config import get_job_grade, get_levels
+from .utils import add_organisation_level, get_all_children_nodes
 from django.db import transaction
 from employee.models import Employee
+from core.images import ImageVariantsField
+
+
+def update_organisation(instance, validated_data):
+    """
+    Saves only the submitted fields: levels are written by organisation.utils and
+    a full save would put back the copy loaded with this instance.
+    """
+    for attr, value in validated_data.items():
+        setattr(instance, attr, value)
+    instance.save(update_fields=[*validated_data, "updated_at"])
+    return instance
 
 
 class OrganisationSerializer(serializers.ModelSerializer):
     employee_count = serializers.SerializerMethodField()
     admin_email = serializers.SerializerMethodField()
+    logo_variants = ImageVariantsField()
 
     @staticmethod
     def get_employee_count(obj):
@@ -40,6 +54,9 @@ class OrganisationSerializer(serializers.ModelSerializer):
             "subdomain": {"read_only": True},
         }
 
+    def update(self, instance, validated_data):
+        return update_organisation(instance, validated_data)
+
 
 class CreateOrganizationSerializerBase(serializers.Serializer):
     name = serializers.CharField(max_length=300, required=True)
@@ -82,7 +99,7 @@ class CreateOrganizationSerializer(CreateOrganizationSerializerBase):
             firstname=admin_user.firstname, lastname=admin_user.lastname
         )
         org.admin = admin_user
-        org.save()
+        org.save(update_fields=["admin", "updated_at"])
         admin_user.organisation = org
         admin_user.save()
         OrganisationNode.objects.create(
@@ -138,7 +155,7 @@ class UpdateOrganisationSerializer(
                 roles=["CEO"],
             )
 
-        return super().update(instance, validated_data)
+        return update_organisation(instance, validated_data)
 
 
 class SelfCreateOrganizationSerializer(CreateOrganizationSerializerBase):
@@ -168,7 +185,7 @@ class SelfCreateOrganizationSerializer(CreateOrganizationSerializerBase):
         admin_user.organisation = organisation
         admin_user.save()
         organisation.admin = admin_user
-        organisation.save()
+        organisation.save(update_fields=["admin", "updated_at"])
         Employee.objects.create(user=admin_user,invitation_status="COMPLETED",organisation=organisation,
             firstname=admin_user.firstname,lastname=admin_user.lastname
         )
@@ -206,7 +223,7 @@ class OrganisationNodeSerializer(serializers.ModelSerializer):
                 {"organisation": "No organisation associated with this user"}
             )
 
-        levels: dict = organisation.levels
+        levels: dict = get_levels(organisation.pk)
 
         if not levels:
             raise serializers.ValidationError({"Levels": "No Levels created"})
@@ -289,6 +306,22 @@ class JobGradeSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class JobGradeField(serializers.PrimaryKeyRelatedField):
+    """A job grade of the user's organisation, read from its cached configuration."""
+
+    def get_queryset(self):
+        return JobGrade.objects.filter(
+            organisation_node__organisation=self.context["request"].user.organisation_id
+        )
+
+    def to_internal_value(self, data):
+        organisation_id = self.context["request"].user.organisation_id
+        job_grade = get_job_grade(organisation_id, data)
+        if job_grade is None:
+            self.fail("does_not_exist", pk_value=data)
+        return job_grade
+
+
 class JobGradeListSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobGrade
@@ -314,7 +347,8 @@ class OrganisationStructureCreateSerializer(serializers.Serializer):
             )
 
         levels: dict = {
-            key.lower(): value.lower() for key, value in organisation.levels.items()
+            key.lower(): value.lower()
+            for key, value in get_levels(organisation.pk).items()
         }
         if name.lower() in levels.values():
             raise serializers.ValidationError({"name": "This name is taken"})
@@ -323,16 +357,9 @@ class OrganisationStructureCreateSerializer(serializers.Serializer):
     def create(self, validated_data):
         organisation: Organisation = self.context["request"].user.organisation
         name: str = validated_data.get("name")
-        levels: dict = organisation.levels
-        if not levels:
-            organisation.levels[1] = name
-            organisation.save()
-        else:
-            last_level: int = int(list(levels.keys())[-1])
-            levels[last_level + 1] = name
-            organisation.levels = levels
-            organisation.save()
-
+        if add_organisation_level(organisation, name) is None:
+            # taken by a level added since the check of the cached ones
+            raise serializers.ValidationError({"name": "This name is taken"})
         return validated_data
 
     def to_representation(self, instance):
@@ -351,7 +378,7 @@ class UpdateOrganizationStatusSerializer(serializers.Serializer):
     def create(self, validated_data):
         organisation: Organisation = validated_data.get("organisation")
         organisation.status = validated_data.get("status")
-        organisation.save()
+        organisation.save(update_fields=["status", "updated_at"])
         return validated_data
 
     def to_representation(self, instance):
@@ -0,0 +1,26 @@
+from django.utils import timezone
+
+from .config import get_config_organisation_id, invalidate_config
+from .models import OrganisationNode
+
+
+def touch_organisation_nodes(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bumps updated_at of the nodes employees join or leave, their headcount is part of
+    the organisation chart the ETag is derived from.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if reverse:
+        nodes = OrganisationNode.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        nodes = OrganisationNode.objects.filter(org_nodes=instance)
+    else:
+        nodes = OrganisationNode.objects.filter(pk__in=pk_set)
+    nodes.update(updated_at=timezone.now())
+
+
+def refresh_tenant_config(sender, instance, **kwargs):
+    organisation_id = get_config_organisation_id(instance)
+    if organisation_id is not None:
+        invalidate_config(organisation_id)
@@ -5,7 +5,11 @@ from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from employee.models import Employee
-from organisation.models import Organisation, OrganisationNode, Location
+from leave.models import LeavePolicy
+from organisation.config import get_job_grade, get_leave_policies, get_levels
+from organisation.models import Organisation, OrganisationNode, Location, JobGrade
+from organisation.serializers import UpdateOrganizationStatusSerializer
+from organisation.utils import add_organisation_level, rename_organisation_level
 from user.tasks import send_new_user_email
 from unittest import mock
 from user.models import Token, User
@@ -145,10 +149,12 @@ class OrganisationCreateTests(APITestCase):
             "subdomain": "org_sub_domain",
             "status":"ACTIVE"
         }
+        mock_send_email.name = "user.tasks.send_new_user_email"
         mock_send_email.delay.side_effect = print(
             "Sent to celery task:New User Email!!!"
         )
-        response = self.client.post(url, new_org_data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, new_org_data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.json()["name"], "New Org")
         self.assertEqual(response.json()["subdomain"], "org_sub_domain")
@@ -1425,6 +1431,67 @@ class RetrieveOrgNodeRootAndLeafTests(APITestCase):
         result = all(elem in returned_leafs for elem in expected_leaf_nodes)
         self.assertEqual(result, True)
 
+    def test_can_retrieve_org_chart(self):
+        self.authenticator()
+        url = reverse("organization:organisationnode-chart")
+        with self.assertNumQueries(6):
+            # user, the three ETag aggregates, nodes and job grades
+            response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [root] = response.json()["data"]
+        self.assertEqual(root["id"], str(self.created_root_node_id))
+        self.assertEqual(
+            [node["name"] for node in root["children"]], ["Sales", "Software", "Talent"]
+        )
+        software = root["children"][1]
+        self.assertEqual(
+            [node["name"] for node in software["children"]], ["BACK END", "FRONT END"]
+        )
+        self.assertEqual(software["children"][0]["children"][0]["name"], "DotNet")
+
+    def test_org_chart_not_modified(self):
+        self.authenticator()
+        url = reverse("organization:organisationnode-chart")
+        etag = self.client.get(url, format="json")["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        node = OrganisationNode.objects.get(name="Python")
+        employee = Employee.objects.create(
+            organisation=node.organisation,
+            firstname="Ray",
+            lastname="Inc",
+            work_email="ray@org.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+        employee.organisation_nodes.add(node)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        software = response.json()["data"][0]["children"][1]
+        self.assertEqual(software["children"][0]["children"][1]["headcount"], 1)
+
+        etag = response["ETag"]
+        employee.is_active = False
+        employee.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        software = response.json()["data"][0]["children"][1]
+        self.assertEqual(software["children"][0]["children"][1]["headcount"], 0)
+
+        etag = response["ETag"]
+        employee.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        node.head = get_user_model().objects.get(email="org@org.com")
+        node.save()
+        etag = self.client.get(url)["ETag"]
+        node.head.firstname = "Renamed"
+        node.head.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class RetrievePackageStatsTests(APITestCase):
     def setUp(self):
@@ -1718,4 +1785,142 @@ class OrganisationLocationRetrieveTestCases(APITestCase):
         self.assertEqual(response.json()["branch"], "Updated Branch")
         self.assertEqual(response.json()["street"], "Updated Street")
         self.assertEqual(response.json()["branch_code"], "Updated Code")
-        self.assertEqual(response.json()["country"], "NG")
\ No newline at end of file
+        self.assertEqual(response.json()["country"], "NG")
+
+class TenantConfigTests(APITestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(
+            name="Prunedge",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+            levels={"1": "Division", "2": "Department"},
+        )
+        self.other_org = Organisation.objects.create(
+            name="Other",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="other.hrms.com",
+            status="ACTIVE",
+        )
+        get_user_model().objects.create_user(
+            organisation=self.org,
+            email="hradmin@org.com",
+            password="admin",
+            verified=True,
+            roles=["HR_ADMIN"],
+        )
+        self.policy = LeavePolicy.objects.create(
+            organisation=self.org,
+            title="Annual",
+            description="Annual leave",
+            max_days_allowed=20,
+            min_employment_period=0,
+            is_default=True,
+        )
+
+    def hr_admin_authenticator(self):
+        url = reverse("user:login")
+        data = {"email": "hradmin@org.com", "password": "admin"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_config_is_read_once_until_it_changes(self):
+        self.assertEqual(get_levels(self.org.id), {"1": "Division", "2": "Department"})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_leave_policies(self.org.id), [self.policy])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.org.levels = {"1": "Division"}
+            self.org.save()
+        self.assertEqual(get_levels(self.org.id), {"1": "Division"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy.delete()
+        self.assertEqual(get_leave_policies(self.org.id), [])
+
+    def test_job_grades_are_scoped_to_the_organisation(self):
+        node = OrganisationNode.objects.create(organisation=self.org, name="Backend")
+        other_node = OrganisationNode.objects.create(
+            organisation=self.other_org, name="Backend"
+        )
+        get_levels(self.org.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            job_grade = JobGrade.objects.create(name="L1", organisation_node=node)
+            other_job_grade = JobGrade.objects.create(
+                name="L1", organisation_node=other_node
+            )
+        self.assertEqual(get_job_grade(self.org.id, job_grade.id), job_grade)
+        self.assertIsNone(get_job_grade(self.org.id, other_job_grade.id))
+
+    def test_leave_policies_are_listed_from_the_config(self):
+        self.hr_admin_authenticator()
+        url = reverse("leave:leavepolicy-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["total"], 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LeavePolicy.objects.create(
+                organisation=self.org,
+                title="Sick",
+                description="Sick leave",
+                max_days_allowed=10,
+                min_employment_period=0,
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [policy["title"] for policy in response.json()["results"]],
+            ["Annual", "Sick"],
+        )
+
+    def test_level_changes_do_not_overwrite_each_other(self):
+        # both copies were read before either change
+        first, second = Organisation.objects.get(pk=self.org.pk), self.org
+        with self.captureOnCommitCallbacks(execute=True):
+            add_organisation_level(first, "Unit")
+            self.assertEqual(
+                add_organisation_level(second, "Team"),
+                {"1": "Division", "2": "Department", "3": "Unit", "4": "Team"},
+            )
+            rename_organisation_level(first, 1, "Group")
+        self.assertEqual(
+            get_levels(self.org.id),
+            {"1": "Group", "2": "Department", "3": "Unit", "4": "Team"},
+        )
+        self.assertIsNone(rename_organisation_level(first, 5, "Squad"))
+
+    def test_level_names_are_checked_against_the_saved_levels(self):
+        # a concurrent request added "Unit" after this copy was read
+        stale = Organisation.objects.get(pk=self.org.pk)
+        add_organisation_level(self.org, "Unit")
+        self.assertIsNone(add_organisation_level(stale, "unit"))
+        self.assertIsNone(rename_organisation_level(stale, 1, "UNIT"))
+        self.assertEqual(
+            rename_organisation_level(stale, 1, "DIVISION"),
+            {"1": "DIVISION", "2": "Department", "3": "Unit"},
+        )
+
+    def test_status_changes_keep_concurrent_levels(self):
+        stale = Organisation.objects.get(pk=self.org.pk)
+        add_organisation_level(self.org, "Unit")
+        serializer = UpdateOrganizationStatusSerializer(
+            data={"status": "INACTIVE", "organisation": str(self.org.pk)}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.validated_data["organisation"] = stale
+        serializer.save()
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.status, "INACTIVE")
+        self.assertEqual(
+            self.org.levels, {"1": "Division", "2": "Department", "3": "Unit"}
+        )
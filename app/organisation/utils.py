@@ -1,5 +1,12 @@
-from .models import OrganisationNode, Organisation
+import json
+
+from .models import OrganisationNode, Organisation, JobGrade
 from uuid import UUID
+from django.db import connection
+from django.db.models import Count, Max, Q
+from audit.recorder import record_save
+from core.utils.etags import get_etag
+from .config import invalidate_config
 
 
 def get_all_children_nodes(parent_id: UUID) -> list:
@@ -54,3 +61,164 @@ def get_org_levels_sublevels(level_id: (int, str)):
         parent__level=level_id, level=level_id + 1
     )
     return level_objs
+
+
+def get_org_chart_etag(organisation: Organisation) -> str:
+    """
+    ETag of the organisation chart, derived from the latest updated_at and the number
+    of its nodes and job grades, of the node members behind the headcounts and of
+    the heads. Membership changes touch the nodes' updated_at; deleted employees and
+    heads are caught by the counts.
+    """
+    nodes = OrganisationNode.objects.filter(organisation=organisation).aggregate(
+        updated_at=Max("updated_at"),
+        count=Count("id"),
+        heads=Count("head"),
+        head_updated_at=Max("head__updated_at"),
+    )
+    members = OrganisationNode.org_nodes.through.objects.filter(
+        organisationnode__organisation=organisation
+    ).aggregate(
+        updated_at=Max("employee__updated_at"),
+        count=Count("id"),
+        active=Count("id", filter=Q(employee__is_active=True)),
+    )
+    job_grades = JobGrade.objects.filter(
+        organisation_node__organisation=organisation
+    ).aggregate(updated_at=Max("updated_at"), count=Count("id"))
+    return get_etag(
+        nodes["updated_at"],
+        nodes["count"],
+        nodes["heads"],
+        nodes["head_updated_at"],
+        members["updated_at"],
+        members["count"],
+        members["active"],
+        job_grades["updated_at"],
+        job_grades["count"],
+    )
+
+
+def get_org_chart(organisation: Organisation) -> list:
+    """
+    Returns the organisation's nodes as a nested tree, with each node's head, number
+    of active employees and job grades. Nodes are read in one query and linked to
+    their parent in a single pass.
+    """
+    nodes = (
+        OrganisationNode.objects.filter(organisation=organisation)
+        .annotate(
+            headcount=Count(
+                "org_nodes", filter=Q(org_nodes__is_active=True), distinct=True
+            )
+        )
+        .values(
+            "id",
+            "parent_id",
+            "name",
+            "description",
+            "level",
+            "headcount",
+            "head__id",
+            "head__firstname",
+            "head__lastname",
+            "head__email",
+        )
+        .order_by("level", "name")
+    )
+    job_grades = JobGrade.objects.filter(
+        organisation_node__organisation=organisation
+    ).values_list("organisation_node_id", "id", "name")
+
+    chart = {}
+    for node in nodes:
+        head_id = node.pop("head__id")
+        head = {
+            "id": head_id,
+            "firstname": node.pop("head__firstname"),
+            "lastname": node.pop("head__lastname"),
+            "email": node.pop("head__email"),
+        }
+        chart[node["id"]] = {
+            **node,
+            "head": head if head_id else None,
+            "job_grades": [],
+            "children": [],
+        }
+    for node_id, id, name in job_grades.order_by("name"):
+        chart[node_id]["job_grades"].append({"id": id, "name": name})
+
+    roots = []
+    for node in chart.values():
+        parent_id = node.pop("parent_id")
+        if parent_id in chart:
+            chart[parent_id]["children"].append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+# Levels are changed in the database with a single UPDATE rather than rewritten from
+# a copy read earlier, so concurrent changes wait on the row lock and build on each
+# other instead of dropping one another's levels. The name is checked to be free in
+# the same UPDATE, against the levels it applies to.
+ADD_LEVEL_SQL = """
+UPDATE {table}
+SET levels = levels || jsonb_build_object(
+        (SELECT coalesce(max(key::int), 0) + 1 FROM jsonb_object_keys(levels) key)::text,
+        %s::text
+    ),
+    updated_at = now()
+WHERE id = %s AND NOT EXISTS (
+    SELECT 1 FROM jsonb_each_text(levels) WHERE lower(value) = lower(%s)
+)
+RETURNING levels, updated_at
+"""
+
+RENAME_LEVEL_SQL = """
+UPDATE {table}
+SET levels = jsonb_set(levels, ARRAY[%s], to_jsonb(%s::text)), updated_at = now()
+WHERE id = %s AND levels ? %s AND NOT EXISTS (
+    SELECT 1 FROM jsonb_each_text(levels) WHERE key <> %s AND lower(value) = lower(%s)
+)
+RETURNING levels, updated_at
+"""
+
+
+def update_levels(organisation: Organisation, sql: str, params: list):
+    """
+    Runs the levels UPDATE and applies its result to the organisation, returns the
+    new levels or None when no row matched.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(table=Organisation._meta.db_table), params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    levels, organisation.updated_at = row
+    organisation.levels = json.loads(levels) if isinstance(levels, str) else levels
+    # the UPDATE sends no signals
+    record_save(organisation)
+    invalidate_config(organisation.pk)
+    return organisation.levels
+
+
+def add_organisation_level(organisation: Organisation, name: str):
+    """
+    Adds a level after the organisation's last one, returns the levels or None when
+    another level has the name.
+    """
+    return update_levels(organisation, ADD_LEVEL_SQL, [name, organisation.pk, name])
+
+
+def rename_organisation_level(organisation: Organisation, level, name: str):
+    """
+    Renames the level of the organisation, returns the levels or None without it or
+    when another level has the name.
+    """
+    level = str(level)
+    return update_levels(
+        organisation,
+        RENAME_LEVEL_SQL,
+        [level, name, organisation.pk, level, level, name],
+    )
@@ -20,7 +20,7 @@ from .serializers import (
     UpdateOrganizationStatusSerializer,
 )
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from user.permissions import IsSuperAdmin, IsHRAdmin
+from user.permissions import IsSuperAdmin, IsHRAdmin, IsEmployee
 from rest_framework.decorators import action
 from django.db.models import Count
 from django.db.models.functions import Coalesce
@@ -32,8 +32,15 @@ from drf_spectacular.utils import (
     OpenApiResponse,
 )
 from rest_framework import serializers
-from django.db import transaction
-from .utils import get_all_children_nodes, get_leaf_node_ids
+from core.mixins import ConditionalGetMixin
+from .config import get_levels
+from .utils import (
+    get_all_children_nodes,
+    get_leaf_node_ids,
+    get_org_chart,
+    get_org_chart_etag,
+    rename_organisation_level,
+)
 from .filters import VERIFY_TENANT_PARAMETERS,DEPARTMENT_PARAMETERS
 
 
@@ -213,24 +220,25 @@ class OrganisationStructureViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
     def list(self, request):
-        levels = request.user.organisation.levels
+        levels = get_levels(request.user.organisation_id)
         return Response({"success": True, "data": levels}, status=status.HTTP_200_OK)
 
-    @transaction.atomic
     def update(self, request, pk=None):
         organisation = request.user.organisation
-        levels = organisation.levels
         serializer = OrganisationStructureCreateSerializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
 
-        if not str(pk) in levels.keys():
+        levels = rename_organisation_level(
+            organisation, pk, serializer.validated_data["name"]
+        )
+        if levels is None:
+            if Organisation.objects.filter(
+                pk=organisation.pk, levels__has_key=str(pk)
+            ).exists():
+                raise serializers.ValidationError({"name": "This name is taken"})
             raise serializers.ValidationError({"level": f"Level {pk} not found"})
-        name = request.data["name"]
-        levels[pk] = name
-        organisation.levels = levels
-        organisation.save()
         return Response(levels)
 
 
@@ -257,7 +265,7 @@ class LocationViewSet(viewsets.ModelViewSet):
         ).order_by("-created_at")
 
 
-class OrganisationNodeViewSets(viewsets.ModelViewSet):
+class OrganisationNodeViewSets(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = OrganisationNode.objects.all()
     serializer_class = OrganisationNodeSerializer
     http_method_names = ["get", "post", "patch", "delete", "put"]
@@ -268,6 +276,12 @@ class OrganisationNodeViewSets(viewsets.ModelViewSet):
     ]
     filterset_fields = ["parent"]
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsHRAdmin]
+    conditional_actions = ("list", "retrieve", "chart")
+
+    def get_validators(self):
+        if self.action == "chart":
+            return get_org_chart_etag(self.request.user.organisation_id), None
+        return super().get_validators()
 
     def destroy(self, request, *args, **kwargs):
         node = self.get_object()
@@ -312,6 +326,21 @@ class OrganisationNodeViewSets(viewsets.ModelViewSet):
         )
         return self.get_paginated_response(serializer.data)
 
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAuthenticated, IsEmployee | IsHRAdmin],
+    )
+    def chart(self, request):
+        """
+        The organisation's nodes as a nested tree with their head, headcount and job
+        grades. Answers 304 when the If-None-Match ETag is still current.
+        """
+        return Response(
+            {"success": True, "data": get_org_chart(request.user.organisation_id)},
+            status=status.HTTP_200_OK,
+        )
+
 
 class JobGradeViewSets(viewsets.ModelViewSet):
     queryset = JobGrade.objects.all()
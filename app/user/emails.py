@@ -0,0 +1,171 @@
+import json
+import logging
+import smtplib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django_redis import get_redis_connection
+from redis.exceptions import LockError
+
+logger = logging.getLogger(__name__)
+
+# one delivery list per email route, each drained by the tasks of its Celery queue
+# so a bulk backlog never holds back a password reset
+TRANSACTIONAL_EMAIL_QUEUE_KEY = "emails:transactional"
+BULK_EMAIL_QUEUE_KEY = "emails:bulk"
+# the drain lock, the emails being sent and the dead letter list of a queue are
+# kept next to it
+EMAIL_DRAIN_LOCK_KEY = "{queue}:drain-lock"
+EMAIL_PROCESSING_KEY = "{queue}:processing"
+EMAIL_DEAD_LETTER_KEY = "{queue}:dead"
+EMAIL_DRAIN_LOCK_TIMEOUT = 5 * 60
+
+# rejections of a message by the server, as opposed to a failed connection
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+
+
+@lru_cache(maxsize=None)
+def get_email_templates(template_name):
+    """Returns the compiled html and text templates, loaded once per worker process."""
+    return (
+        get_template(f"emails/{template_name}.html"),
+        get_template(f"emails/{template_name}.txt"),
+    )
+
+
+def build_email(subject, recipient, template_name, context) -> dict:
+    html_template, text_template = get_email_templates(template_name)
+    return {
+        "subject": subject,
+        "to": recipient,
+        "text": text_template.render(context),
+        "html": html_template.render(context),
+    }
+
+
+def to_email_message(email, connection=None) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(
+        email["subject"],
+        email["text"],
+        settings.EMAIL_FROM,
+        [email["to"]],
+        connection=connection,
+    )
+    msg.attach_alternative(email["html"], "text/html")
+    return msg
+
+
+def queue_emails(emails, queue_key=BULK_EMAIL_QUEUE_KEY):
+    """Adds rendered emails (see build_email) to the delivery queue."""
+    if not emails:
+        return
+    get_redis_connection("default").rpush(
+        cache.make_key(queue_key), *[json.dumps(email) for email in emails]
+    )
+
+
+def get_processing_key(queue_key):
+    return cache.make_key(EMAIL_PROCESSING_KEY.format(queue=queue_key))
+
+
+def pop_email_batch(redis, batch_size, queue_key=BULK_EMAIL_QUEUE_KEY) -> list:
+    """
+    Moves up to batch_size emails to the processing list of the queue, where they
+    stay until send_email_batch acknowledges them.
+    """
+    key, processing_key = cache.make_key(queue_key), get_processing_key(queue_key)
+    pipeline = redis.pipeline()
+    for _ in range(batch_size):
+        pipeline.lmove(key, processing_key, "LEFT", "RIGHT")
+    return [raw for raw in pipeline.execute() if raw is not None]
+
+
+def restore_unacknowledged_emails(redis, queue_key=BULK_EMAIL_QUEUE_KEY):
+    """Puts the emails left in the processing list back at the head of the queue."""
+    key, processing_key = cache.make_key(queue_key), get_processing_key(queue_key)
+    while redis.lmove(processing_key, key, "RIGHT", "LEFT") is not None:
+        pass
+
+
+def send_email_batch(redis, connection, batch, queue_key=BULK_EMAIL_QUEUE_KEY) -> int:
+    """
+    Sends the batch message by message, each is acknowledged (removed from the
+    processing list) once sent. A message the server rejects goes back to the queue
+    until it failed EMAIL_MAX_ATTEMPTS times, then to the dead letter list.
+    When the connection fails the unsent messages are restored and the error raised,
+    messages already delivered are never sent again.
+    Returns the number of emails sent.
+    """
+    processing_key = get_processing_key(queue_key)
+    sent = 0
+    try:
+        for raw in batch:
+            email = json.loads(raw)
+            try:
+                sent += connection.send_messages([to_email_message(email, connection)])
+            except MESSAGE_ERRORS:
+                email["attempts"] = email.get("attempts", 0) + 1
+                logger.warning(
+                    "Email to %s rejected (attempt %s)",
+                    email["to"],
+                    email["attempts"],
+                    exc_info=True,
+                )
+                if email["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+                    target = EMAIL_DEAD_LETTER_KEY.format(queue=queue_key)
+                else:
+                    target = queue_key
+                pipeline = redis.pipeline()
+                pipeline.lpop(processing_key)
+                pipeline.rpush(cache.make_key(target), json.dumps(email))
+                pipeline.execute()
+            else:
+                redis.lpop(processing_key)
+    except Exception:
+        restore_unacknowledged_emails(redis, queue_key)
+        raise
+    return sent
+
+
+def send_queued_emails(connection=None, queue_key=BULK_EMAIL_QUEUE_KEY) -> int:
+    """
+    Drains the delivery queue in batches of EMAIL_BATCH_SIZE over a single SMTP
+    connection. Only one worker drains at a time, the others return straight away
+    since their emails are picked up by the running drain.
+    Returns the number of emails sent.
+    """
+    redis = get_redis_connection("default")
+    key = cache.make_key(queue_key)
+    connection = connection or get_connection(fail_silently=False)
+    sent = 0
+
+    while True:
+        # the lock holds a token, a drain outliving the timeout can't release the
+        # lock another drain acquired since
+        lock = redis.lock(
+            cache.make_key(EMAIL_DRAIN_LOCK_KEY.format(queue=queue_key)),
+            timeout=EMAIL_DRAIN_LOCK_TIMEOUT,
+        )
+        if not lock.acquire(blocking=False):
+            break
+        try:
+            # emails of a drain killed while sending them
+            restore_unacknowledged_emails(redis, queue_key)
+            with connection:
+                while True:
+                    batch = pop_email_batch(redis, settings.EMAIL_BATCH_SIZE, queue_key)
+                    if not batch:
+                        break
+                    sent += send_email_batch(redis, connection, batch, queue_key)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning("Email drain lock expired before the drain ended")
+        # emails queued while the lock was being released would be left behind
+        if not redis.llen(key):
+            break
+    return sent
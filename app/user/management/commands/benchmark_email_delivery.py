@@ -0,0 +1,121 @@
+import socketserver
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from user.emails import build_email, queue_emails, send_queued_emails, to_email_message
+
+# kept apart from the delivery queue, whose pending emails must not be drained here
+BENCHMARK_QUEUE_KEY = "emails:benchmark"
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Accepts every message without delivering it."""
+
+    def write(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        # stands in for the TCP/TLS/AUTH setup cost of a real SMTP server
+        time.sleep(self.server.connect_latency)
+        self.server.connections += 1
+        self.write("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.write("250-stub")
+                self.write("250 OK")
+            elif command == b"DATA":
+                self.write("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages += 1
+                self.write("250 OK")
+            elif command == b"QUIT":
+                self.write("221 Bye")
+                break
+            else:
+                self.write("250 OK")
+
+
+class SMTPStubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_latency):
+        super().__init__(("127.0.0.1", 0), SMTPStubHandler)
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.messages = 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends emails to a local SMTP stub, once with a connection per message and "
+        "once through the batched delivery queue, and reports messages/second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument(
+            "--connect-latency",
+            type=float,
+            default=0.05,
+            help="Seconds the stub waits before greeting a new connection",
+        )
+
+    def handle(self, *args, **options):
+        server = SMTPStubServer(options["connect_latency"])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+        def connection_factory():
+            return get_connection(
+                "django.core.mail.backends.smtp.EmailBackend",
+                host=host,
+                port=port,
+                username="",
+                password="",
+                use_tls=False,
+                use_ssl=False,
+            )
+
+        emails = [
+            build_email(
+                "Verify Email",
+                f"user{index}@example.com",
+                "new_user_welcome_template",
+                {"fullname": f"User {index}", "url": "https://example.com"},
+            )
+            for index in range(options["messages"])
+        ]
+
+        try:
+            start = time.perf_counter()
+            for email in emails:
+                to_email_message(email, connection_factory()).send()
+            self.report("connection per message", server, start)
+
+            server.connections = server.messages = 0
+            start = time.perf_counter()
+            queue_emails(emails, BENCHMARK_QUEUE_KEY)
+            send_queued_emails(connection_factory(), BENCHMARK_QUEUE_KEY)
+            self.report("batched delivery queue", server, start)
+        finally:
+            get_redis_connection("default").delete(cache.make_key(BENCHMARK_QUEUE_KEY))
+            server.shutdown()
+            server.server_close()
+
+    def report(self, label, server, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label}: {server.messages} messages over {server.connections} "
+            f"connections, {server.messages / elapsed:.1f} messages/s"
+        )
@@ -29,6 +29,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     firstname = models.CharField(max_length=255, blank=True, null=True)
     lastname = models.CharField(max_length=255, blank=True, null=True)
     image = models.FileField(upload_to="users/", blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone = models.CharField(max_length=17, blank=True, null=True)
     roles = ArrayField(
         models.CharField(max_length=20, blank=True, choices=USER_ROLE),
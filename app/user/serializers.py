@@ -14,9 +14,13 @@ from .models import Token, User
 from .tasks import send_new_user_email, send_password_reset_email
 from .utils import create_token_and_send_user_email
 from django.contrib.auth.hashers import make_password
+from core.uploads import UploadedFileField
+from core.images import ImageVariantsField
 
 
 class ListUserSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = get_user_model()
         fields = [
@@ -26,6 +30,7 @@ class ListUserSerializer(serializers.ModelSerializer):
             "email",
             "roles",
             "image",
+            "image_variants",
             "verified",
             "last_login",
             "created_at",
@@ -35,6 +40,8 @@ class ListUserSerializer(serializers.ModelSerializer):
 class CreateUserSerializer(serializers.ModelSerializer):
     """Serializer for user object"""
 
+    image = UploadedFileField(kind="user_image", required=False, allow_null=True)
+
     class Meta:
         model = get_user_model()
         fields = (
@@ -1,38 +1,59 @@
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
-from django.conf import settings
-from django.template.loader import get_template
 from django.core.management import call_command
-from .utils import send_email
+from .emails import (
+    BULK_EMAIL_QUEUE_KEY,
+    TRANSACTIONAL_EMAIL_QUEUE_KEY,
+    build_email,
+    queue_emails,
+    send_queued_emails,
+)
 from core.celery import APP
 
 
-@APP.task()
+def send_template_email(subject, template_name, email_data, queue_key):
+    """Queues the email on the list of the task's route and drains only that list."""
+    queue_emails(
+        [build_email(subject, email_data["email"], template_name, email_data)],
+        queue_key,
+    )
+    send_queued_emails(queue_key=queue_key)
+
+
+@APP.task(ignore_result=True)
 def send_new_user_email(email_data):
-    html_template = get_template("emails/new_user_welcome_template.html")
-    text_template = get_template("emails/new_user_welcome_template.txt")
-    html_alternative = html_template.render(email_data)
-    text_alternative = text_template.render(email_data)
-    send_email("Verify Email", email_data["email"], html_alternative, text_alternative)
+    # invitations are sent by the batch when employees are added
+    send_template_email(
+        "Verify Email", "new_user_welcome_template", email_data, BULK_EMAIL_QUEUE_KEY
+    )
 
 
-@APP.task()
+@APP.task(ignore_result=True)
 def send_registration_email(email_data):
-    html_template = get_template("emails/account_verification_template.html")
-    text_template = get_template("emails/account_verification_template.txt")
-    html_alternative = html_template.render(email_data)
-    text_alternative = text_template.render(email_data)
-    send_email(
-        "Account Verification", email_data["email"], html_alternative, text_alternative
+    send_template_email(
+        "Account Verification",
+        "account_verification_template",
+        email_data,
+        TRANSACTIONAL_EMAIL_QUEUE_KEY,
     )
 
 
-@APP.task()
+@APP.task(ignore_result=True, priority=0)
 def send_password_reset_email(email_data):
-    html_template = get_template("emails/password_reset_template.html")
-    text_template = get_template("emails/password_reset_template.txt")
-    html_alternative = html_template.render(email_data)
-    text_alternative = text_template.render(email_data)
-    send_email(
-        "Password Reset", email_data["email"], html_alternative, text_alternative
+    send_template_email(
+        "Password Reset",
+        "password_reset_template",
+        email_data,
+        TRANSACTIONAL_EMAIL_QUEUE_KEY,
     )
+
+
+@APP.task(ignore_result=True, acks_late=True)
+def drain_email_queue():
+    """Sends the emails left in the bulk delivery queue, e.g. after an SMTP failure."""
+    return send_queued_emails(queue_key=BULK_EMAIL_QUEUE_KEY)
+
+
+@APP.task(ignore_result=True, acks_late=True)
+def drain_transactional_email_queue():
+    """Sends the emails left in the transactional delivery queue."""
+    return send_queued_emails(queue_key=TRANSACTIONAL_EMAIL_QUEUE_KEY)
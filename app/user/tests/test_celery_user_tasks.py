@@ -4,7 +4,25 @@ from django.contrib.auth import get_user_model
 from organisation.models import Organisation
 from django.core import mail
 from user.tasks import send_new_user_email, send_registration_email, send_password_reset_email
-from django.test import override_settings
+import json
+import smtplib
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django_redis import get_redis_connection
+from user.emails import (
+    BULK_EMAIL_QUEUE_KEY,
+    EMAIL_DEAD_LETTER_KEY,
+    EMAIL_DRAIN_LOCK_KEY,
+    EMAIL_PROCESSING_KEY,
+    TRANSACTIONAL_EMAIL_QUEUE_KEY,
+    build_email,
+    pop_email_batch,
+    queue_emails,
+    send_queued_emails,
+)
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from core.celery import APP
 
 overriden_settings_value = {
     "STATIC_URL" :'/static/',
@@ -72,3 +90,123 @@ class CeleryUtilsTests(APITestCase):
         self.assertEqual(mail.outbox[0].from_email,
                          os.environ.get("SENDER_EMAIL"))
         self.assertEqual(mail.outbox[0].to[0], self.user_info["email"])
+
+    @override_settings(EMAIL_BATCH_SIZE=2, **overriden_settings_value)
+    def test_queued_emails_sent_in_batches(self):
+        emails = [
+            build_email("Verify Email", f"user{index}@prunedge.com",
+                        "new_user_welcome_template", self.user_info)
+            for index in range(5)
+        ]
+        queue_emails(emails)
+        self.assertEqual(send_queued_emails(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[4].to[0], "user4@prunedge.com")
+
+    @override_settings(**overriden_settings_value)
+    def test_transactional_emails_skip_the_bulk_queue(self):
+        redis = get_redis_connection("default")
+        bulk_key = cache.make_key(BULK_EMAIL_QUEUE_KEY)
+        self.addCleanup(redis.delete, bulk_key)
+        queue_emails([
+            build_email("Verify Email", "invitee@prunedge.com",
+                        "new_user_welcome_template", self.user_info)
+        ], BULK_EMAIL_QUEUE_KEY)
+        send_password_reset_email(self.user_info)
+        self.assertEqual([message.subject for message in mail.outbox], ["Password Reset"])
+        self.assertEqual(redis.llen(bulk_key), 1)
+        self.assertEqual(redis.llen(cache.make_key(TRANSACTIONAL_EMAIL_QUEUE_KEY)), 0)
+
+
+class EmailRoutingTests(SimpleTestCase):
+    def test_scheduled_drains_run_on_their_email_queues(self):
+        for name, queue in [
+            ("drain_email_queue", "bulk_email"),
+            ("drain_transactional_email_queue", "transactional_email"),
+        ]:
+            entry = settings.CELERY_BEAT_SCHEDULE[name]
+            route = APP.amqp.router.route(dict(entry.get("options", {})), entry["task"])
+            self.assertEqual(route["queue"].name, queue)
+
+
+class RejectingEmailBackend(EmailBackend):
+    """Refuses the recipients in rejected, delivers the other messages."""
+
+    rejected = ()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.rejected:
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BATCH_SIZE=10, EMAIL_MAX_ATTEMPTS=2, **overriden_settings_value)
+class EmailQueueFailureTests(APITestCase):
+    queue_key = "emails:test-failures"
+
+    def setUp(self):
+        self.redis = get_redis_connection("default")
+        self.keys = [cache.make_key(self.queue_key),
+                     cache.make_key(EMAIL_DEAD_LETTER_KEY.format(queue=self.queue_key)),
+                     cache.make_key(EMAIL_PROCESSING_KEY.format(queue=self.queue_key))]
+        self.redis.delete(*self.keys)
+        self.addCleanup(self.redis.delete, *self.keys)
+        queue_emails([
+            build_email("Verify Email", recipient, "new_user_welcome_template", {})
+            for recipient in ["one@prunedge.com", "bad@prunedge.com", "two@prunedge.com"]
+        ], self.queue_key)
+
+    def test_rejected_message_is_retried_alone_then_parked(self):
+        connection = RejectingEmailBackend()
+        connection.rejected = ("bad@prunedge.com",)
+        self.assertEqual(send_queued_emails(connection, self.queue_key), 2)
+        self.assertEqual(send_queued_emails(connection, self.queue_key), 0)
+        # the delivered messages were not sent again
+        self.assertEqual([message.to[0] for message in mail.outbox],
+                         ["one@prunedge.com", "two@prunedge.com"])
+        queue_key, dead_letter_key, processing_key = self.keys
+        self.assertEqual(self.redis.llen(processing_key), 0)
+        self.assertEqual(self.redis.llen(queue_key), 0)
+        dead = [json.loads(email) for email in self.redis.lrange(dead_letter_key, 0, -1)]
+        self.assertEqual([(email["to"], email["attempts"]) for email in dead],
+                         [("bad@prunedge.com", 2)])
+
+    def test_unsent_messages_requeued_when_the_connection_fails(self):
+        connection = RejectingEmailBackend()
+        sent = []
+
+        def send_messages(messages):
+            if sent:
+                raise smtplib.SMTPServerDisconnected("Connection lost")
+            sent.extend(messages)
+            return 1
+
+        connection.send_messages = send_messages
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            send_queued_emails(connection, self.queue_key)
+        queued = [json.loads(email)["to"] for email in self.redis.lrange(self.keys[0], 0, -1)]
+        self.assertEqual(queued, ["bad@prunedge.com", "two@prunedge.com"])
+
+    def test_expired_drain_leaves_the_next_drains_lock(self):
+        lock_key = cache.make_key(EMAIL_DRAIN_LOCK_KEY.format(queue=self.queue_key))
+        self.addCleanup(self.redis.delete, lock_key)
+        connection = RejectingEmailBackend()
+
+        def send_messages(messages):
+            # the lock expired and another drain took it
+            self.redis.set(lock_key, "another-drain")
+            return 1
+
+        connection.send_messages = send_messages
+        send_queued_emails(connection, self.queue_key)
+        self.assertEqual(self.redis.get(lock_key), b"another-drain")
+
+    def test_batch_of_a_killed_drain_is_sent_by_the_next(self):
+        # the worker died after taking the batch, before sending it
+        pop_email_batch(self.redis, 2, self.queue_key)
+        self.assertEqual(self.redis.llen(self.keys[2]), 2)
+        self.assertEqual(send_queued_emails(EmailBackend(), self.queue_key), 3)
+        self.assertEqual([message.to[0] for message in mail.outbox],
+                         ["one@prunedge.com", "bad@prunedge.com", "two@prunedge.com"])
+        self.assertEqual(self.redis.llen(self.keys[2]), 0)
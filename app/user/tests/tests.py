@@ -332,10 +332,12 @@ class UserInviteTests(APITestCase):
             "lastname": "Invited",
 
         }
+        mock_send_email.name = "user.tasks.send_new_user_email"
         mock_send_email.delay.side_effect = print(
             "Sent to celery task:HR Admin Invite User Email!!!"
         )
-        response = self.client.post(url, data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # check the user with the email has been created and role
         invited_user = get_user_model().objects.get(email="invitedhr@prdunedge.com")
@@ -1,18 +1,9 @@
-from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.template.loader import get_template
 from django.core.files import File
 from urllib.request import urlretrieve
 from .models import Token, User
 from django.utils.crypto import get_random_string
-
-
-def send_email(subject, email_from, html_alternative, text_alternative):
-    msg = EmailMultiAlternatives(
-        subject, text_alternative, settings.EMAIL_FROM, [email_from]
-    )
-    msg.attach_alternative(html_alternative, "text/html")
-    msg.send(fail_silently=False)
+from core.outbox import dispatch_on_commit
 
 
 async def create_file_from_image(url):
@@ -41,4 +32,4 @@ def create_token_and_send_user_email(user, organisation=None):
         if organisation
         else f"https://{settings.CLIENT_URL}/user-signup/?token={token.token}",
     }
-    send_new_user_email.delay(user_data)
+    dispatch_on_commit(send_new_user_email, user_data)
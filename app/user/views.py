@@ -223,7 +223,7 @@ class AuthViewsets(viewsets.ModelViewSet):
                 if "HR_ADMIN" in user.roles:
                     organisation = user.organisation
                     organisation.status = "ACTIVE"
-                    organisation.save()
+                    organisation.save(update_fields=["status", "updated_at"])
                 token.delete()
                 return Response(
                     {"success": True, "message": "Password successfully reset"},
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class WorkflowConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "workflow"
+
+    def ready(self):
+        from claim.models import Expense
+        from leave.models import LeaveRequest
+        from .signals import (
+            cancel_claim_approval,
+            cancel_leave_approval,
+            sync_claim_approval,
+            sync_leave_approval,
+        )
+
+        post_save.connect(sync_leave_approval, sender=LeaveRequest)
+        post_save.connect(sync_claim_approval, sender=Expense)
+        post_delete.connect(cancel_leave_approval, sender=LeaveRequest)
+        post_delete.connect(cancel_claim_approval, sender=Expense)
@@ -0,0 +1,245 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from organisation.models import Organisation, OrganisationNode
+from .exceptions import InvalidTransition, NotAnApprover
+from .models import ApprovalAction, ApprovalRequest, PendingApproval
+
+logger = logging.getLogger(__name__)
+
+
+def get_manager(employee) -> list:
+    return [employee.manager_id] if employee.manager_id else []
+
+
+def get_node_heads(employee) -> list:
+    """
+    Heads of the employee's organisation nodes. A node without a head, or headed by
+    the employee, is approved by the closest head above it.
+    """
+    node_ids = list(employee.organisation_nodes.values_list("id", flat=True))
+    if not node_ids:
+        return []
+    nodes = {
+        id: (parent_id, head_id)
+        for id, parent_id, head_id in OrganisationNode.objects.filter(
+            organisation=employee.organisation_id
+        ).values_list("id", "parent_id", "head_id")
+    }
+    heads = []
+    for node_id in node_ids:
+        # the path is bounded by the number of nodes in case of a cycle
+        for _ in range(len(nodes)):
+            if node_id not in nodes:
+                break
+            parent_id, head_id = nodes[node_id]
+            if head_id and head_id != employee.user_id:
+                heads.append(head_id)
+                break
+            node_id = parent_id
+    return heads
+
+
+def get_hr_admins(employee) -> list:
+    return list(
+        get_user_model()
+        .objects.filter(
+            organisation=employee.organisation_id,
+            roles__contains=["HR_ADMIN"],
+            is_active=True,
+        )
+        .values_list("id", flat=True)
+    )
+
+
+STEP_RESOLVERS = {
+    "manager": get_manager,
+    "node_head": get_node_heads,
+    "hr_admin": get_hr_admins,
+}
+
+
+def resolve_steps(step_names, employee) -> list:
+    """
+    Returns the steps with their approvers. Requesters never approve their own
+    requests, steps left without approvers are skipped and a step with the same
+    approvers as the one before it is merged into it. HR admins approve requests no
+    step applies to, and the organisation's admin those no one else can approve,
+    e.g. when the requester is its only HR admin.
+    """
+    steps = []
+    for name in step_names:
+        approvers = sorted(
+            {
+                str(user_id)
+                for user_id in STEP_RESOLVERS[name](employee)
+                if user_id != employee.user_id
+            }
+        )
+        if approvers and (not steps or steps[-1]["approvers"] != approvers):
+            steps.append({"name": name, "approvers": approvers})
+    if not steps and "hr_admin" not in step_names:
+        return resolve_steps(["hr_admin"], employee)
+    if not steps:
+        admin_id = (
+            Organisation.objects.filter(pk=employee.organisation_id)
+            .values_list("admin_id", flat=True)
+            .first()
+        )
+        if admin_id is None:
+            logger.warning("No approver for a request of employee %s", employee.pk)
+        else:
+            steps.append({"name": "organisation_admin", "approvers": [str(admin_id)]})
+    return steps
+
+
+def get_workflow(request_type):
+    from .workflows import WORKFLOWS
+
+    return WORKFLOWS[request_type]
+
+
+def queue_current_step(approval_request):
+    """Replaces the request's inbox rows with the approvers of its current step."""
+    PendingApproval.objects.filter(approval_request=approval_request).delete()
+    step = approval_request.current_step
+    if step is None:
+        return
+    now = timezone.now()
+    PendingApproval.objects.bulk_create(
+        [
+            PendingApproval(
+                approver_id=approver,
+                approval_request=approval_request,
+                request_type=approval_request.request_type,
+                object_id=approval_request.object_id,
+                step_name=step["name"],
+                summary=approval_request.summary,
+                created_at=now,
+            )
+            for approver in step["approvers"]
+        ]
+    )
+
+
+@transaction.atomic
+def start_approval(request_type, obj) -> ApprovalRequest:
+    workflow = get_workflow(request_type)
+    employee = workflow.get_requester(obj)
+    approval_request = ApprovalRequest.objects.create(
+        organisation_id=employee.organisation_id,
+        requester=employee,
+        request_type=request_type,
+        object_id=obj.pk,
+        steps=resolve_steps(workflow.get_steps(), employee),
+        summary=workflow.get_summary(obj),
+    )
+    queue_current_step(approval_request)
+    return approval_request
+
+
+def refresh_summary(request_type, obj):
+    """Rewrites the summary of a pending request and its inbox rows once edited."""
+    summary = get_workflow(request_type).get_summary(obj)
+    updated = ApprovalRequest.objects.filter(
+        request_type=request_type, object_id=obj.pk, state="PENDING"
+    ).update(summary=summary, updated_at=timezone.now())
+    if updated:
+        PendingApproval.objects.filter(
+            request_type=request_type, object_id=obj.pk
+        ).update(summary=summary)
+
+
+@transaction.atomic
+def act(approval_request, user, decision, note="") -> ApprovalRequest:
+    """
+    Applies a decision to the request. Approving the last step or declining ends the
+    workflow and runs the request type's handler for the new state, whose validation
+    errors roll everything back.
+    """
+    approval_request = ApprovalRequest.objects.select_for_update().get(
+        pk=approval_request.pk
+    )
+    workflow = get_workflow(approval_request.request_type)
+    state = workflow.get_next_state(approval_request, decision)
+    if not workflow.can_act(approval_request, user, decision):
+        raise NotAnApprover("You are not an approver of this step.")
+
+    ApprovalAction.objects.create(
+        approval_request=approval_request,
+        step=approval_request.step,
+        decision=decision,
+        actor=user,
+        note=note,
+    )
+    if decision == "approve" and state == "PENDING":
+        approval_request.step += 1
+        if approval_request.step >= len(approval_request.steps):
+            state = "APPROVED"
+    previous_state, approval_request.state = approval_request.state, state
+    approval_request.save(update_fields=["state", "step", "updated_at"])
+    queue_current_step(approval_request)
+    if state != previous_state:
+        obj = workflow.model.objects.select_for_update().get(
+            pk=approval_request.object_id
+        )
+        workflow.on_state_changed(obj, state, user)
+    return approval_request
+
+
+def close_approvals(request_type, object_ids, state):
+    """
+    Ends the pending workflows of requests decided outside of the engine, as the HR
+    admin endpoints do, and removes them from the inboxes.
+    """
+    approval_requests = ApprovalRequest.objects.filter(
+        request_type=request_type, object_id__in=object_ids, state="PENDING"
+    )
+    PendingApproval.objects.filter(approval_request__in=approval_requests).delete()
+    approval_requests.update(state=state, updated_at=timezone.now())
+
+
+class Workflow:
+    """
+    The state machine of a request type: transitions maps (state, decision) to the
+    next state, "approve" moving to the next step until the last one.
+    """
+
+    model = None
+    transitions = {
+        ("PENDING", "approve"): "PENDING",
+        ("PENDING", "decline"): "DECLINED",
+    }
+    # the request's status -> the workflow state it ends in when set directly
+    statuses = {}
+
+    def get_steps(self) -> list:
+        raise NotImplementedError
+
+    def get_requester(self, obj):
+        return obj.employee
+
+    def get_summary(self, obj) -> dict:
+        raise NotImplementedError
+
+    def on_state_changed(self, obj, state, user):
+        """Applies the new state to the request."""
+        raise NotImplementedError
+
+    def get_next_state(self, approval_request, decision):
+        try:
+            return self.transitions[(approval_request.state, decision)]
+        except KeyError:
+            raise InvalidTransition(
+                f"Cannot {decision} a {approval_request.state.lower()} request."
+            )
+
+    def can_act(self, approval_request, user, decision) -> bool:
+        if decision in ("approve", "decline"):
+            step = approval_request.current_step
+            return step is not None and str(user.pk) in step["approvers"]
+        # decisions after the approval are taken by HR admins
+        return "HR_ADMIN" in user.roles
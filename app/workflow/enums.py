@@ -0,0 +1,25 @@
+REQUEST_TYPES = (
+    ("leave", "leave"),
+    ("claim", "claim"),
+)
+
+APPROVAL_STATES = (
+    ("PENDING", "PENDING"),
+    ("APPROVED", "APPROVED"),
+    ("DECLINED", "DECLINED"),
+    ("CANCELLED", "CANCELLED"),
+    ("PAID", "PAID"),
+)
+
+APPROVAL_DECISIONS = (
+    ("approve", "approve"),
+    ("decline", "decline"),
+    ("pay", "pay"),
+)
+
+STEP_OPTIONS = (
+    ("manager", "manager"),
+    ("node_head", "node_head"),
+    ("hr_admin", "hr_admin"),
+    ("organisation_admin", "organisation_admin"),
+)
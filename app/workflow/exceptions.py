@@ -0,0 +1,6 @@
+class InvalidTransition(Exception):
+    pass
+
+
+class NotAnApprover(Exception):
+    pass
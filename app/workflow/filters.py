@@ -0,0 +1,14 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+INBOX_PARAMETERS = [
+    OpenApiParameter(
+        "request_type",
+        OpenApiTypes.STR,
+        OpenApiParameter.QUERY,
+        required=False,
+        enum=["leave", "claim"],
+        description="Only list the pending requests of this type",
+    ),
+]
@@ -1,3 +1,87 @@
 from django.db import models
 
-# Create your models here.
+from core.models import AuditableModel
+from .enums import APPROVAL_DECISIONS, APPROVAL_STATES, REQUEST_TYPES
+
+
+class ApprovalRequest(AuditableModel):
+    """The approval of a leave request or claim, moved through its steps by the engine."""
+
+    organisation = models.ForeignKey(
+        "organisation.Organisation", on_delete=models.CASCADE, related_name="+"
+    )
+    requester = models.ForeignKey(
+        "employee.Employee", on_delete=models.CASCADE, related_name="approval_requests"
+    )
+    request_type = models.CharField(max_length=20, choices=REQUEST_TYPES)
+    object_id = models.UUIDField()
+    state = models.CharField(max_length=20, choices=APPROVAL_STATES, default="PENDING")
+    step = models.PositiveSmallIntegerField(default=0)
+    # [{"name": "manager", "approvers": [user ids]}], resolved when it starts
+    steps = models.JSONField(default=list)
+    # what inboxes show of the request, see Workflow.get_summary
+    summary = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ("-created_at",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["request_type", "object_id"], name="unique_approval_request"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.request_type} {self.object_id} {self.state}"
+
+    @property
+    def current_step(self):
+        if self.state == "PENDING" and self.step < len(self.steps):
+            return self.steps[self.step]
+        return None
+
+
+class ApprovalAction(AuditableModel):
+    approval_request = models.ForeignKey(
+        ApprovalRequest, on_delete=models.CASCADE, related_name="actions"
+    )
+    step = models.PositiveSmallIntegerField()
+    decision = models.CharField(max_length=10, choices=APPROVAL_DECISIONS)
+    actor = models.ForeignKey(
+        "user.User", on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    note = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ("created_at",)
+
+
+class PendingApproval(models.Model):
+    """
+    One row per approver of the current step of every pending request, copied from
+    the request so an approver's inbox is read from one index without joins.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    approver = models.ForeignKey(
+        "user.User", on_delete=models.CASCADE, related_name="pending_approvals"
+    )
+    approval_request = models.ForeignKey(
+        ApprovalRequest, on_delete=models.CASCADE, related_name="pending_approvals"
+    )
+    request_type = models.CharField(max_length=20, choices=REQUEST_TYPES)
+    object_id = models.UUIDField()
+    step_name = models.CharField(max_length=20)
+    summary = models.JSONField(default=dict)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["approver", "-created_at"], name="pending_approval_inbox"
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["approval_request", "approver"], name="unique_pending_approval"
+            )
+        ]
@@ -0,0 +1,53 @@
+from rest_framework import serializers
+
+from .enums import APPROVAL_DECISIONS, REQUEST_TYPES
+from .models import ApprovalAction, ApprovalRequest, PendingApproval
+
+
+class PendingApprovalSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="approval_request_id")
+
+    class Meta:
+        model = PendingApproval
+        fields = [
+            "id",
+            "request_type",
+            "object_id",
+            "step_name",
+            "summary",
+            "created_at",
+        ]
+
+
+class ApprovalActionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ApprovalAction
+        fields = ["step", "decision", "actor", "note", "created_at"]
+
+
+class ApprovalRequestSerializer(serializers.ModelSerializer):
+    actions = ApprovalActionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ApprovalRequest
+        fields = [
+            "id",
+            "request_type",
+            "object_id",
+            "requester",
+            "state",
+            "step",
+            "steps",
+            "summary",
+            "actions",
+            "created_at",
+        ]
+
+
+class ApprovalDecisionSerializer(serializers.Serializer):
+    decision = serializers.ChoiceField(choices=APPROVAL_DECISIONS)
+    note = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class InboxQuerySerializer(serializers.Serializer):
+    request_type = serializers.ChoiceField(choices=REQUEST_TYPES, required=False)
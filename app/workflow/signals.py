@@ -0,0 +1,36 @@
+from .engine import close_approvals, get_workflow, refresh_summary, start_approval
+
+
+def sync_leave_approval(sender, instance, created, raw=False, **kwargs):
+    sync_approval("leave", instance, created, raw)
+
+
+def sync_claim_approval(sender, instance, created, raw=False, **kwargs):
+    sync_approval("claim", instance, created, raw)
+
+
+def sync_approval(request_type, instance, created, raw):
+    """
+    Starts the approval of new requests, keeps what approvers see of them current
+    while they are edited and ends it when they are decided directly.
+    """
+    if raw:
+        return
+    if created:
+        if instance.status == "PENDING":
+            start_approval(request_type, instance)
+        return
+    if instance.status == "PENDING":
+        refresh_summary(request_type, instance)
+        return
+    state = get_workflow(request_type).statuses.get(instance.status)
+    if state is not None:
+        close_approvals(request_type, [instance.pk], state)
+
+
+def cancel_leave_approval(sender, instance, **kwargs):
+    close_approvals("leave", [instance.pk], "CANCELLED")
+
+
+def cancel_claim_approval(sender, instance, **kwargs):
+    close_approvals("claim", [instance.pk], "CANCELLED")
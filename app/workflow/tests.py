@@ -1,3 +1,211 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from claim.models import Expense
+from claim.utils import bulk_review_expenses
+from employee.models import Employee
+from leave.models import Leave, LeavePolicy, LeaveRequest
+from leave.utils import get_current_year
+from organisation.models import Organisation, OrganisationNode
+from .models import ApprovalRequest, PendingApproval
+
+
+class ApprovalWorkflowTests(APITestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(
+            name="Prun",
+            sector="PRIVATE",
+            type="MULTIPLE",
+            size=10,
+            package="CORE HR",
+            subdomain="edge.hrms.com",
+            status="ACTIVE",
+        )
+        self.users = {}
+        for name, roles in [
+            ("hr", ["HR_ADMIN"]),
+            ("head", ["EMPLOYEE"]),
+            ("manager", ["EMPLOYEE"]),
+            ("employee", ["EMPLOYEE"]),
+        ]:
+            self.users[name] = get_user_model().objects.create_user(
+                organisation=self.org,
+                email=f"{name}@prunedge.com",
+                password="passer",
+                verified=True,
+                roles=roles,
+            )
+        self.employee = Employee.objects.create(
+            user=self.users["employee"],
+            manager=self.users["manager"],
+            organisation=self.org,
+            firstname="Ray",
+            lastname="Inc",
+            work_email="ray@prunedge.com",
+            job_title="Engineer",
+            employment_status="FULL TIME",
+        )
+        # the employee's node has no head, its parent's head approves
+        parent = OrganisationNode.objects.create(
+            organisation=self.org, name="Engineering", head=self.users["head"]
+        )
+        node = OrganisationNode.objects.create(
+            organisation=self.org, name="Backend", parent=parent, level=1
+        )
+        self.employee.organisation_nodes.add(node)
+
+    def login(self, name):
+        url = reverse("user:login")
+        data = {"email": f"{name}@prunedge.com", "password": "passer"}
+        response = self.client.post(url, data, format="json")
+        token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def create_claim(self):
+        return Expense.objects.create(
+            employee=self.employee,
+            title="Taxi",
+            description="Client visit",
+            start_date=date(2022, 5, 2),
+            end_date=date(2022, 5, 2),
+            total_amount="25.00",
+        )
+
+    def inbox(self, name):
+        self.login(name)
+        response = self.client.get(reverse("workflow:approvalrequest-inbox"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"]
+
+    def decide(self, name, approval_request, decision):
+        self.login(name)
+        url = reverse("workflow:approvalrequest-decide", args=[approval_request.id])
+        return self.client.post(url, {"decision": decision}, format="json")
+
+    def test_claim_moves_through_each_approver(self):
+        expense = self.create_claim()
+        approval_request = ApprovalRequest.objects.get(object_id=expense.id)
+        self.assertEqual(
+            [step["name"] for step in approval_request.steps],
+            ["manager", "node_head", "hr_admin"],
+        )
+
+        inbox = self.inbox("manager")
+        self.assertEqual(len(inbox), 1)
+        self.assertEqual(inbox[0]["id"], str(approval_request.id))
+        self.assertEqual(inbox[0]["summary"]["title"], "Taxi")
+        self.assertEqual(self.inbox("hr"), [])
+
+        for name in ["manager", "head", "hr"]:
+            response = self.decide(name, approval_request, "approve")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(self.inbox(name), [])
+
+        expense.refresh_from_db()
+        self.assertEqual(expense.status, "APPROVED")
+        self.assertEqual(expense.reviewed_by, self.users["hr"])
+        self.assertEqual(response.json()["data"]["state"], "APPROVED")
+        self.assertEqual(len(response.json()["data"]["actions"]), 3)
+
+        response = self.decide("hr", approval_request, "pay")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expense.refresh_from_db()
+        self.assertEqual(expense.status, "PAID")
+
+    def test_only_approvers_of_the_current_step_decide(self):
+        approval_request = ApprovalRequest.objects.get(
+            object_id=self.create_claim().id
+        )
+        response = self.decide("employee", approval_request, "approve")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.decide("hr", approval_request, "approve")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.decide("hr", approval_request, "pay")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_edited_claim_updates_the_inbox(self):
+        expense = Expense.objects.get(pk=self.create_claim().pk)
+        expense.total_amount = Decimal("40.00")
+        expense.end_date = date(2022, 5, 3)
+        expense.save()
+        summary = self.inbox("manager")[0]["summary"]
+        self.assertEqual(summary["total_amount"], "40.00")
+        self.assertEqual(summary["end_date"], "2022-05-03")
+        self.assertEqual(
+            ApprovalRequest.objects.get(object_id=expense.id).summary, summary
+        )
+
+    def test_request_no_one_else_can_approve_goes_to_the_admin(self):
+        self.org.admin = self.users["hr"]
+        self.org.save()
+        hr_employee = Employee.objects.create(
+            user=self.users["hr"],
+            organisation=self.org,
+            firstname="Hr",
+            lastname="Inc",
+            work_email="hr@prunedge.com",
+            job_title="HR",
+            employment_status="FULL TIME",
+        )
+        expense = Expense.objects.create(
+            employee=hr_employee,
+            title="Taxi",
+            description="Client visit",
+            start_date=date(2022, 5, 2),
+            end_date=date(2022, 5, 2),
+            total_amount="25.00",
+        )
+        approval_request = ApprovalRequest.objects.get(object_id=expense.id)
+        self.assertEqual(
+            approval_request.steps,
+            [{"name": "organisation_admin", "approvers": [str(self.users["hr"].id)]}],
+        )
+        self.assertEqual(len(self.inbox("hr")), 1)
+
+    def test_direct_hr_review_closes_the_workflow(self):
+        expense = self.create_claim()
+        bulk_review_expenses([expense.id], "DENIED", self.users["hr"])
+        self.assertEqual(
+            ApprovalRequest.objects.get(object_id=expense.id).state, "DECLINED"
+        )
+        self.assertFalse(PendingApproval.objects.exists())
+
+    def test_declined_leave_request(self):
+        policy = LeavePolicy.objects.create(
+            organisation=self.org,
+            title="Annual",
+            description="Annual leave",
+            max_days_allowed=5,
+            min_employment_period=0,
+        )
+        leave = Leave.objects.create(
+            employee=self.employee,
+            leave_policy=policy,
+            year=get_current_year(),
+            initial_days=5,
+            max_days_allowed=5,
+        )
+        start_date = date(get_current_year(), 3, 2)
+        leave_request = LeaveRequest.objects.create(
+            employee=self.employee,
+            leave=leave,
+            start_date=start_date,
+            end_date=start_date + timedelta(days=1),
+            note="Leave",
+        )
+        approval_request = ApprovalRequest.objects.get(object_id=leave_request.id)
+        self.assertEqual(
+            [step["name"] for step in approval_request.steps], ["manager", "hr_admin"]
+        )
+        self.assertEqual(self.inbox("manager")[0]["summary"]["title"], "Annual")
+
+        response = self.decide("manager", approval_request, "decline")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        leave_request.refresh_from_db()
+        self.assertEqual(leave_request.status, "DECLINED")
+        self.assertEqual(self.inbox("manager"), [])
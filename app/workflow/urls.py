@@ -0,0 +1,13 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from .views import ApprovalViewSets
+
+app_name = "workflow"
+
+router = DefaultRouter()
+
+router.register("approvals", ApprovalViewSets)
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -1,3 +1,84 @@
-from django.shortcuts import render
+from django.db.models import Q
+from drf_spectacular.utils import extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from user.permissions import IsEmployee, IsHRAdmin
+from .engine import act
+from .exceptions import InvalidTransition, NotAnApprover
+from .filters import INBOX_PARAMETERS
+from .models import ApprovalRequest, PendingApproval
+from .serializers import (
+    ApprovalDecisionSerializer,
+    ApprovalRequestSerializer,
+    InboxQuerySerializer,
+    PendingApprovalSerializer,
+)
+
+
+class ApprovalViewSets(viewsets.ModelViewSet):
+    queryset = ApprovalRequest.objects.all()
+    serializer_class = ApprovalRequestSerializer
+    permission_classes = [IsAuthenticated, IsHRAdmin | IsEmployee]
+    http_method_names = ["get", "post"]
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = self.queryset.filter(
+            organisation=user.organisation
+        ).prefetch_related("actions")
+        if "HR_ADMIN" in user.roles:
+            return queryset
+        # their own requests and the ones waiting for them
+        return queryset.filter(
+            Q(requester__user=user)
+            | Q(
+                pk__in=PendingApproval.objects.filter(approver=user).values(
+                    "approval_request"
+                )
+            )
+        )
+
+    def create(self, request, *args, **kwargs):
+        # requests are started when a leave request or claim is created
+        return self.http_method_not_allowed(request, *args, **kwargs)
+
+    @extend_schema(parameters=INBOX_PARAMETERS)
+    @action(detail=False, methods=["get"], serializer_class=PendingApprovalSerializer)
+    def inbox(self, request, *args, **kwargs):
+        """The leave requests and claims waiting for the user's approval, newest first."""
+        serializer = InboxQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        pending_approvals = PendingApproval.objects.filter(approver=request.user)
+        if "request_type" in serializer.validated_data:
+            pending_approvals = pending_approvals.filter(
+                request_type=serializer.validated_data["request_type"]
+            )
+        page = self.paginate_queryset(pending_approvals.order_by("-created_at"))
+        return self.get_paginated_response(
+            PendingApprovalSerializer(page, many=True).data
+        )
+
+    @action(detail=True, methods=["post"], serializer_class=ApprovalDecisionSerializer)
+    def decide(self, request, *args, **kwargs):
+        """Approves the current step (or declines the request) as one of its approvers."""
+        serializer = ApprovalDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            approval_request = act(
+                self.get_object(),
+                request.user,
+                serializer.validated_data["decision"],
+                serializer.validated_data["note"],
+            )
+        except InvalidTransition as e:
+            raise ValidationError({"detail": str(e)})
+        except NotAnApprover as e:
+            raise PermissionDenied(str(e))
+        return Response(
+            {"success": True, "data": ApprovalRequestSerializer(approval_request).data},
+            status=status.HTTP_200_OK,
+        )
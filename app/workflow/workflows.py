@@ -0,0 +1,71 @@
+from django.conf import settings
+
+from claim.models import Expense
+from leave.models import LeaveRequest
+from leave.serializers import LeaveTakenCreateSerializer
+from .engine import Workflow
+
+
+class LeaveWorkflow(Workflow):
+    model = LeaveRequest
+    statuses = {"APPROVED": "APPROVED", "DECLINED": "DECLINED", "DENIED": "DECLINED"}
+
+    def get_steps(self):
+        return settings.WORKFLOW_STEPS["leave"]
+
+    def get_summary(self, leave_request):
+        employee = leave_request.employee
+        return {
+            "employee": f"{employee.firstname} {employee.lastname}",
+            "title": leave_request.leave.leave_policy.title
+            if leave_request.leave
+            else None,
+            "start_date": str(leave_request.start_date),
+            "end_date": str(leave_request.end_date),
+        }
+
+    def on_state_changed(self, leave_request, state, user):
+        if state == "APPROVED":
+            # the balance and overlap checks of the HR admin approval
+            serializer = LeaveTakenCreateSerializer(
+                data={"leave_request": leave_request.pk}
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        elif state == "DECLINED":
+            leave_request.decline()
+
+
+class ClaimWorkflow(Workflow):
+    model = Expense
+    transitions = {
+        **Workflow.transitions,
+        ("APPROVED", "pay"): "PAID",
+    }
+    statuses = {"APPROVED": "APPROVED", "DENIED": "DECLINED", "PAID": "PAID"}
+
+    def get_steps(self):
+        return settings.WORKFLOW_STEPS["claim"]
+
+    def get_summary(self, expense):
+        employee = expense.employee
+        return {
+            "employee": f"{employee.firstname} {employee.lastname}",
+            "title": expense.title,
+            "total_amount": str(expense.total_amount),
+            "start_date": str(expense.start_date),
+            "end_date": str(expense.end_date),
+        }
+
+    def on_state_changed(self, expense, state, user):
+        expense.status = {"APPROVED": "APPROVED", "DECLINED": "DENIED", "PAID": "PAID"}[
+            state
+        ]
+        expense.reviewed_by = user
+        expense.save(update_fields=["status", "reviewed_by", "updated_at"])
+
+
+WORKFLOWS = {
+    "leave": LeaveWorkflow(),
+    "claim": ClaimWorkflow(),
+}